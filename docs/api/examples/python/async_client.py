@@ -0,0 +1,670 @@
+"""
+Bodyweight Training API - Async Python Client
+asyncio client mirroring BodyweightTrainingClient over a shared keep-alive connection pool
+"""
+
+import asyncio
+import contextlib
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from bodyweight_client import (
+    BULK_ANALYSES,
+    CONDITIONAL_ENDPOINTS,
+    MAX_HISTORY_PAGE_SIZE,
+    APIError,
+    BiometricData,
+    PerformanceRows,
+    PreparedSession,
+    SessionFeedback,
+    _api_error_for_status,
+    apply_routine_delta,
+    feedback_payload,
+    logger,
+    routine_delta_payload,
+)
+from cache import ValidatorCache, token_fingerprint
+from codec import JSONCodec, RequestCompression, get_codec
+from instrumentation import Instrumentation
+from tracing import NOOP_TRACER, SPAN_KIND_CLIENT, Tracer
+
+
+def create_connector(max_connections: int = 100, keepalive_timeout: float = 30.0) -> aiohttp.TCPConnector:
+    """
+    Create a bounded keep-alive connection pool
+
+    A single connector can be shared by many AsyncBodyweightTrainingClient
+    instances (one per athlete) so they all reuse the same TCP connections.
+
+    Args:
+        max_connections: Maximum number of simultaneous connections
+        keepalive_timeout: Seconds an idle connection is kept open for reuse
+
+    Returns:
+        aiohttp connector to pass to AsyncBodyweightTrainingClient
+    """
+    return aiohttp.TCPConnector(limit=max_connections, keepalive_timeout=keepalive_timeout)
+
+
+class AsyncBodyweightTrainingClient:
+    """
+    asyncio client for the Bodyweight Adaptive Training API
+
+    Exposes the same methods as BodyweightTrainingClient as coroutines, so a
+    single event loop can keep hundreds of requests in flight. Errors are
+    mapped onto the same APIError messages and status codes.
+
+    Usage:
+        async with AsyncBodyweightTrainingClient(url, token) as client:
+            ica, routine = await asyncio.gather(
+                client.calculate_ica(),
+                client.get_current_routine(),
+            )
+    """
+
+    def __init__(self, supabase_url: str, jwt_token: str, timeout: int = 30,
+                 max_connections: int = 100, keepalive_timeout: float = 30.0,
+                 connector: Optional[aiohttp.BaseConnector] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 codec: Optional[JSONCodec] = None,
+                 request_compression: Optional[RequestCompression] = None,
+                 validators: Optional[ValidatorCache] = None,
+                 tracer: Optional[Tracer] = None,
+                 user_id: Optional[str] = None):
+        """
+        Initialize the async client
+
+        Args:
+            supabase_url: Base Supabase URL (e.g., https://your-project.supabase.co)
+            jwt_token: JWT authentication token
+            timeout: Request timeout in seconds
+            max_connections: Size of the connection pool (ignored if connector is given)
+            keepalive_timeout: Idle keep-alive time in seconds (ignored if connector is given)
+            connector: Optional shared connector; the client will not close it
+            instrumentation: Optional per-endpoint metrics and request hooks
+            codec: JSON codec for payloads and responses (defaults to the fastest installed)
+            request_compression: Optional gzip compression of large request bodies
+            validators: ETags and bodies of the polled endpoints, for conditional
+                requests (defaults to a private one)
+            tracer: Optional tracer recording spans for each request phase
+                (defaults to the no-op NOOP_TRACER)
+            user_id: Verified ID of the token's user, namespacing shared
+                validators (defaults to the token's fingerprint)
+        """
+        self.base_url = f"{supabase_url.rstrip('/')}/functions/v1"
+        self.timeout = timeout
+        self.headers = {
+            'Authorization': f'Bearer {jwt_token}',
+            'Content-Type': 'application/json',
+            'User-Agent': 'BodyweightTraining-Python-Client/1.0'
+        }
+        # An owned connector is created on first use, inside the running loop
+        self._owns_connector = connector is None
+        self._connector = connector
+        self._max_connections = max_connections
+        self._keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.instrumentation = instrumentation
+        self.codec = codec if codec is not None else get_codec()
+        self.request_compression = request_compression
+        self.user_id = user_id if user_id is not None else token_fingerprint(jwt_token)
+        self.validators = validators if validators is not None else ValidatorCache()
+        self.tracer = tracer if tracer is not None else NOOP_TRACER
+        # Blocks of the last delta-mode routine, by block tag
+        self._routine_blocks: Dict[str, Dict] = {}
+
+        logger.info(f"Initialized async client for {supabase_url}")
+
+    async def __aenter__(self) -> 'AsyncBodyweightTrainingClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Lazily create the HTTP session (must be called inside a running loop)
+
+        An owned connection pool is created here too, and created again if a
+        previous close() shut it down.
+        """
+        if self._session is None or self._session.closed:
+            if self._owns_connector and (self._connector is None or self._connector.closed):
+                self._connector = create_connector(self._max_connections, self._keepalive_timeout)
+            self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                connector_owner=self._owns_connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session (and the connection pool if this client owns it)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        elif self._owns_connector and self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+
+    async def _send(self, session: aiohttp.ClientSession, method: str, url: str, headers: Dict[str, str],
+                    data: Optional[bytes]) -> Tuple[aiohttp.ClientResponse, bytes]:
+        """Send one HTTP request under a 'send' span, with a 'wait' child until the response headers"""
+        with self.tracer.span('send') as span:
+            started_ns = time.time_ns()
+            async with session.request(method, url, headers=headers, data=data) as response:
+                self.tracer.record_span('wait', started_ns, time.time_ns())
+                content = await response.read()
+            span.set_attribute('status_code', response.status)
+            span.set_attribute('response_bytes', len(content))
+        return response, content
+
+    async def _make_request(self, endpoint: str, method: str = 'POST', data: Dict = None) -> Dict:
+        """
+        Make HTTP request with error handling
+
+        Requests to CONDITIONAL_ENDPOINTS carry the last ETag received as
+        If-None-Match; on 304 Not Modified the stored body is decoded instead.
+
+        Args:
+            endpoint: API endpoint (without base URL)
+            method: HTTP method
+            data: Request payload
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            APIError: On HTTP errors or invalid responses
+        """
+        url = f"{self.base_url}{endpoint}"
+        session = self._get_session()
+        probe = (self.instrumentation.track(endpoint, method, data)
+                 if self.instrumentation is not None else contextlib.nullcontext())
+
+        conditional = endpoint in CONDITIONAL_ENDPOINTS
+        validator = self.validators.get(self.user_id, endpoint) if conditional else None
+        headers = {**self.headers, 'If-None-Match': validator[0]} if validator is not None else self.headers
+
+        with probe, self.tracer.span('request', SPAN_KIND_CLIENT, endpoint=endpoint,
+                                     method=method.upper()) as span:
+            try:
+                logger.debug(f"Making async {method} request to {endpoint}")
+
+                with self.tracer.span('encode') as encode_span:
+                    body = self.codec.encode_payload(data) if data is not None and method.upper() != 'GET' else None
+                    sent, extra_headers = body, {}
+                    if body is not None and self.request_compression is not None:
+                        sent, extra_headers = self.request_compression.encode(endpoint, body)
+                    encode_span.set_attribute('bytes', len(sent or b''))
+
+                response, content = await self._send(session, method.upper(), url,
+                                                     {**headers, **extra_headers}, sent)
+
+                if extra_headers and response.status == 415:
+                    logger.info(f"🗜️ {endpoint} does not accept compressed bodies, sending uncompressed")
+                    self.request_compression.mark_unsupported(endpoint)
+                    sent = body
+                    response, content = await self._send(session, method.upper(), url, headers, sent)
+
+                if self.instrumentation is not None:
+                    probe.record_response(response.status, len(sent or b''), len(content))
+
+                if response.status >= 400:
+                    try:
+                        error_data = self.codec.loads(content)
+                    except ValueError:
+                        error_data = None
+                    raise _api_error_for_status(response.status, response.reason or '', error_data,
+                                                response.headers.get('Retry-After'))
+
+                if response.status == 304 and validator is not None:
+                    logger.debug(f"♻️ {endpoint} not modified")
+                    span.set_attribute('not_modified', True)
+                    content = validator[1]
+                elif conditional and response.headers.get('ETag'):
+                    self.validators.set(self.user_id, endpoint, response.headers['ETag'], content)
+
+                try:
+                    with self.tracer.span('decode', bytes=len(content)):
+                        return self.codec.loads(content)
+                except ValueError as e:
+                    raise APIError(f"Request failed: {str(e)}")
+
+            except asyncio.TimeoutError:
+                raise APIError(f"Request timed out after {self.timeout}s")
+            except aiohttp.ClientConnectionError:
+                raise APIError("Failed to connect to API server")
+            except aiohttp.ClientError as e:
+                raise APIError(f"Request failed: {str(e)}")
+
+    async def generate_routine(self, days_to_generate: int = 1, biometric_data: Optional[BiometricData] = None) -> Dict:
+        """
+        Generate a personalized training routine
+
+        Args:
+            days_to_generate: Number of days to generate (1-7)
+            biometric_data: Current biometric data for personalization
+
+        Returns:
+            Training plan with generated session
+        """
+        payload = {"daysToGenerate": days_to_generate}
+
+        if biometric_data:
+            payload["biometricData"] = biometric_data.to_dict()
+
+        response = await self._make_request("/generate-routine", data=payload)
+
+        logger.info("✅ Routine generated successfully")
+        return response
+
+    async def calculate_ica(self) -> Dict:
+        """
+        Calculate current ICA (Index of Current Ability) score
+
+        Returns:
+            ICA data with score, factors, and recommendations
+        """
+        response = await self._make_request("/calculate-ica")
+
+        ica_score = response.get('ica_score', 'N/A')
+        logger.info(f"🧠 Current ICA score: {ica_score}")
+
+        return response
+
+    async def get_latest_biometrics(self) -> BiometricData:
+        """
+        Get latest biometric data for the user
+
+        Returns:
+            BiometricData object with latest measurements
+        """
+        response = await self._make_request("/get-latest-biometrics")
+
+        logger.info("📊 Retrieved latest biometric data")
+        return BiometricData(**{k: v for k, v in response.items() if k in BiometricData.__dataclass_fields__})
+
+    async def get_current_routine(self, delta: bool = False) -> Optional[Dict]:
+        """
+        Get current active routine
+
+        Args:
+            delta: Request the routine in delta mode (see
+                BodyweightTrainingClient.get_current_routine)
+
+        Returns:
+            Current routine data or None if no active routine
+        """
+        endpoint = "/get-current-routine"
+        payload = routine_delta_payload(self._routine_blocks) if delta else None
+        response = await self._make_request(endpoint, data=payload)
+        try:
+            routine, blocks = apply_routine_delta(response.get('routine'), self._routine_blocks)
+        except KeyError:
+            self.validators.invalidate_user(self.user_id)
+            response = await self._make_request(endpoint, data=routine_delta_payload(()) if delta else None)
+            routine, blocks = apply_routine_delta(response.get('routine'), {})
+        if delta:
+            self._routine_blocks = blocks
+
+        if routine:
+            logger.info("🏋️ Retrieved current active routine")
+        else:
+            logger.info("No active routine found")
+
+        return routine
+
+    async def save_session_feedback(self,
+                                    session_id: str,
+                                    feedback: SessionFeedback,
+                                    exercise_performance: Optional[PerformanceRows] = None) -> Dict:
+        """
+        Save session feedback after workout completion
+
+        Args:
+            session_id: ID of the completed session
+            feedback: Session feedback data
+            exercise_performance: Detailed exercise performance data, as a list of
+                records or an ExercisePerformanceColumns container
+
+        Returns:
+            Response with updated progressions and session data
+        """
+        payload = feedback_payload(session_id, feedback, exercise_performance)
+        response = await self._make_request("/save-session-feedback", data=payload)
+
+        # Log progression updates
+        with self.tracer.span('postprocess', endpoint="/save-session-feedback"):
+            progressions = response.get('session', {}).get('updated_progressions', [])
+            for progression in progressions:
+                status = "🚀 LEVEL UP!" if progression.get('progression_triggered') else "📊 Maintained"
+                logger.info(f"{status} Exercise {progression.get('exercise_id', '')[:8]}...")
+
+            logger.info("💾 Session feedback saved successfully")
+        return response
+
+    async def analyze_muscle_groups(self) -> Dict:
+        """
+        Analyze muscle group balance and performance
+
+        Returns:
+            Muscle group analysis with balance scores and recommendations
+        """
+        response = await self._make_request("/analyze-muscle-groups")
+
+        # Log significant imbalances
+        for analysis in response.get('muscle_group_analyses', []):
+            imbalance = analysis.get('imbalance_score', 0)
+            if imbalance > 30:
+                muscle_group = analysis.get('muscle_group', 'Unknown')
+                logger.warning(f"⚠️ Imbalance detected in {muscle_group}: {imbalance:.1f}%")
+
+        logger.info("💪 Muscle group analysis completed")
+        return response
+
+    async def analyze_evolution(self) -> Dict:
+        """
+        Analyze training evolution and progress over time
+
+        Returns:
+            Evolution analysis with trends and predictions
+        """
+        response = await self._make_request("/analyze-evolution")
+
+        # Log key insights
+        with self.tracer.span('postprocess', endpoint="/analyze-evolution"):
+            ica_evolution = response.get('ica_evolution', {})
+            overall_progress = response.get('overall_progress', {})
+
+            logger.info(f"📈 Current ICA: {ica_evolution.get('current_ica', 'N/A')} ({ica_evolution.get('trend', 'unknown')})")
+            logger.info(f"🏆 Overall progress: {overall_progress.get('score', 0):.2f} - {overall_progress.get('classification', 'Unknown')}")
+
+        return response
+
+    async def update_progressions(self, session_id: str, exercise_blocks: List[Dict]) -> Dict:
+        """
+        Update exercise progressions based on performance
+
+        Args:
+            session_id: Session ID for tracking
+            exercise_blocks: List of exercise performance data
+
+        Returns:
+            Updated progression information
+        """
+        payload = {
+            "sessionId": session_id,
+            "exerciseBlocks": exercise_blocks
+        }
+
+        response = await self._make_request("/update-progressions", data=payload)
+
+        progressions = response.get('progressions_updated', [])
+        logger.info(f"📊 Updated {len(progressions)} exercise progressions")
+
+        return response
+
+    async def get_training_history(self,
+                                   limit: int = 10,
+                                   offset: int = 0,
+                                   status: str = 'completed',
+                                   start_date: Optional[str] = None,
+                                   end_date: Optional[str] = None,
+                                   include_exercises: bool = True,
+                                   include_performance: bool = False) -> Dict:
+        """
+        Get one page of training history, newest sessions first
+
+        Args:
+            limit: Page size (the server caps it at 100)
+            offset: Number of sessions to skip
+            status: Session status filter ('planned', 'in_progress', 'completed', 'skipped' or 'all')
+            start_date: Only sessions on or after this date (YYYY-MM-DD)
+            end_date: Only sessions on or before this date (YYYY-MM-DD)
+            include_exercises: Include session exercises in each session
+            include_performance: Include per-set exercise performance (requires exercises)
+
+        Returns:
+            Training history page with pagination and summary data
+        """
+        payload = {
+            "limit": limit,
+            "offset": offset,
+            "status": status,
+            "include_exercises": include_exercises,
+            "include_performance": include_performance
+        }
+
+        if start_date:
+            payload["start_date"] = start_date
+        if end_date:
+            payload["end_date"] = end_date
+
+        response = await self._make_request("/get-training-history", data=payload)
+
+        logger.debug(f"📚 Retrieved {len(response.get('training_history', []))} sessions at offset {offset}")
+        return response
+
+    async def iter_training_history(self,
+                                    page_size: int = MAX_HISTORY_PAGE_SIZE,
+                                    prefetch: bool = True,
+                                    **filters) -> AsyncIterator[Dict]:
+        """
+        Lazily iterate over the full training history, one session at a time
+
+        With prefetch enabled the next page is requested as a background task
+        while the caller processes the current one.
+
+        Args:
+            page_size: Sessions per request (capped at 100 by the server)
+            prefetch: Fetch the next page in the background
+            **filters: status, start_date, end_date, include_exercises and
+                include_performance, as for get_training_history
+
+        Yields:
+            Training session dicts, newest first
+        """
+        page_size = min(page_size, MAX_HISTORY_PAGE_SIZE)
+
+        async def fetch(offset: int) -> List[Dict]:
+            page = await self.get_training_history(limit=page_size, offset=offset, **filters)
+            return page.get('training_history', [])
+
+        offset = 0
+        pending = asyncio.ensure_future(fetch(offset)) if prefetch else None
+        try:
+            while True:
+                sessions = await pending if prefetch else await fetch(offset)
+                offset += len(sessions)
+                has_more = len(sessions) == page_size
+
+                if prefetch and has_more:
+                    pending = asyncio.ensure_future(fetch(offset))
+
+                for session in sessions:
+                    yield session
+                del sessions
+
+                if not has_more:
+                    break
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+    async def update_biometrics(self, biometric_data: BiometricData) -> Dict:
+        """
+        Record a new biometric measurement
+
+        Args:
+            biometric_data: Biometric values to record
+
+        Returns:
+            Updated biometric snapshot
+        """
+        response = await self._make_request("/update-biometrics", data=biometric_data.to_dict())
+
+        logger.info("📊 Biometric data updated successfully")
+        return response
+
+    async def prefetch_session(self, biometric_data: Optional[BiometricData] = None, include_ica: bool = True,
+                               call_timeout: Optional[float] = None) -> PreparedSession:
+        """
+        Prepare today's session for the app-open path
+
+        Same as BodyweightTrainingClient.prefetch_session: biometrics and ICA
+        are fetched as tasks while the active routine is read, and a routine
+        is generated straight away if none is active.
+
+        Args:
+            biometric_data: Today's check-in, sent with the routine generation
+                if one is needed
+            include_ica: Also fetch the ICA speculatively
+            call_timeout: Maximum seconds for each speculative read
+
+        Returns:
+            PreparedSession; biometrics or ica are None if their read failed
+
+        Raises:
+            APIError: If the routine could not be read or generated
+        """
+        started = time.monotonic()
+        speculative = {'biometrics': asyncio.ensure_future(
+            self._bulk_call('get_latest_biometrics', 'Biometrics prefetch', call_timeout, None))}
+        if include_ica:
+            speculative['ica'] = asyncio.ensure_future(
+                self._bulk_call('calculate_ica', 'ICA prefetch', call_timeout, None))
+
+        try:
+            routine = await self.get_current_routine()
+            generated = not routine
+            if generated:
+                response = await self.generate_routine(days_to_generate=1, biometric_data=biometric_data)
+                routine = response['trainingPlan']['current_session']
+        except BaseException:
+            for task in speculative.values():
+                task.cancel()
+            raise
+
+        results = dict(zip(speculative, await asyncio.gather(*speculative.values())))
+        elapsed = time.monotonic() - started
+        logger.info(f"⚡ Session ready in {elapsed:.2f}s ({'generated' if generated else 'active'} routine)")
+        return PreparedSession(routine=routine, generated=generated, biometrics=results.get('biometrics'),
+                               ica=results.get('ica'), elapsed=elapsed)
+
+    async def bulk_analyze(self, call_timeout: Optional[float] = None,
+                           semaphore: Optional[asyncio.Semaphore] = None) -> Dict:
+        """
+        Perform bulk analysis (ICA, muscle groups, evolution) concurrently
+
+        A failed or timed out analysis is reported as None without affecting
+        the others.
+
+        Args:
+            call_timeout: Maximum seconds for each analysis once it starts
+            semaphore: Optional semaphore shared across clients to cap concurrency
+
+        Returns:
+            Combined analysis results
+        """
+        logger.info("🔄 Performing bulk analysis...")
+
+        outcomes = await asyncio.gather(*(
+            self._bulk_call(method, label, call_timeout, semaphore)
+            for _, method, label in BULK_ANALYSES
+        ))
+        results = {key: outcome for (key, _, _), outcome in zip(BULK_ANALYSES, outcomes)}
+
+        logger.info("📊 Bulk analysis completed")
+        return results
+
+    async def _bulk_call(self, method: str, label: str, call_timeout: Optional[float],
+                         semaphore: Optional[asyncio.Semaphore]) -> Optional[Dict]:
+        """Run one bulk analysis call, isolating its failure"""
+        try:
+            if semaphore is None:
+                return await asyncio.wait_for(getattr(self, method)(), call_timeout)
+            async with semaphore:
+                return await asyncio.wait_for(getattr(self, method)(), call_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"{label} timed out after {call_timeout}s")
+        except APIError as e:
+            logger.error(f"{label} failed: {e}")
+        return None
+
+
+async def bulk_analyze_users(supabase_url: str, jwt_tokens: List[str], max_concurrency: int = 16,
+                             call_timeout: Optional[float] = None, **client_kwargs) -> List[Dict]:
+    """
+    Run bulk_analyze for many users at once with a global concurrency cap
+
+    All users share one connection pool and one semaphore, so at most
+    max_concurrency requests are in flight across all users.
+
+    Args:
+        supabase_url: Base Supabase URL
+        jwt_tokens: One JWT per user to analyze
+        max_concurrency: Maximum number of requests in flight across all users
+        call_timeout: Maximum seconds for each analysis once it starts
+        **client_kwargs: Extra arguments for AsyncBodyweightTrainingClient
+
+    Returns:
+        One bulk_analyze result dict per token, in the same order
+    """
+    logger.info(f"🔄 Performing bulk analysis for {len(jwt_tokens)} users...")
+
+    connector = create_connector(max_connections=max_concurrency)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    clients = [
+        AsyncBodyweightTrainingClient(supabase_url, token, connector=connector, **client_kwargs)
+        for token in jwt_tokens
+    ]
+
+    try:
+        results = await asyncio.gather(*(
+            client.bulk_analyze(call_timeout=call_timeout, semaphore=semaphore)
+            for client in clients
+        ))
+    finally:
+        for client in clients:
+            await client.close()
+        await connector.close()
+
+    logger.info(f"📊 Bulk analysis completed for {len(jwt_tokens)} users")
+    return list(results)
+
+
+# Example usage
+async def example_many_athletes(supabase_url: str, jwt_tokens: List[str]) -> List[Optional[Dict]]:
+    """Example of scoring many athletes concurrently over one shared connection pool"""
+
+    connector = create_connector(max_connections=100)
+    clients = [
+        AsyncBodyweightTrainingClient(supabase_url, token, connector=connector)
+        for token in jwt_tokens
+    ]
+
+    async def score(client: AsyncBodyweightTrainingClient) -> Optional[Dict]:
+        try:
+            return await client.calculate_ica()
+        except APIError as e:
+            logger.error(f"ICA calculation failed: {e}")
+            return None
+
+    try:
+        return await asyncio.gather(*(score(client) for client in clients))
+    finally:
+        for client in clients:
+            await client.close()
+        await connector.close()
+
+
+if __name__ == "__main__":
+    SUPABASE_URL = "https://your-project.supabase.co"
+    JWT_TOKENS = ["your-jwt-token"]
+
+    if JWT_TOKENS == ["your-jwt-token"]:
+        print("❌ Please update SUPABASE_URL and JWT_TOKENS variables before running examples")
+    else:
+        results = asyncio.run(example_many_athletes(SUPABASE_URL, JWT_TOKENS))
+        print(f"✅ Scored {sum(r is not None for r in results)}/{len(results)} athletes")
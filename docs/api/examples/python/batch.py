@@ -0,0 +1,158 @@
+"""
+Bodyweight Training API - Batch Helpers
+Ordered bounded-concurrency batch execution with resumable checkpoints
+"""
+
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional, Set, Tuple, Type
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of one item in a batch, reported in input order"""
+    index: int
+    key: str
+    response: Optional[Any] = None
+    error: Optional[Exception] = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchReport:
+    """Ordered per-item results plus success/failure counts"""
+    results: List[BatchItemResult] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for r in self.results if r.ok and not r.skipped)
+
+    @property
+    def failed(self) -> List[BatchItemResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def skipped(self) -> int:
+        return sum(1 for r in self.results if r.skipped)
+
+
+# Checkpoint line holding the batch ID
+_BATCH_ID_PREFIX = '#batch '
+
+
+def item_idempotency_key(batch_id: str, key: str) -> str:
+    """Idempotency key of one batch item, the same every time the batch is resumed"""
+    return str(uuid.uuid5(uuid.UUID(batch_id), key))
+
+
+class FileCheckpoint:
+    """
+    Append-only file of completed item keys
+
+    Each key is flushed and fsynced as soon as its item succeeds, so a batch
+    restarted after a crash skips everything that was already submitted.
+    Items in flight during the crash were not recorded and are resent; the
+    file also keeps a batch ID so those resends can carry the same
+    idempotency key as the first attempt (see item_idempotency_key).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done: Set[str] = set()
+        batch_id = None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith(_BATCH_ID_PREFIX):
+                        batch_id = line[len(_BATCH_ID_PREFIX):]
+                    elif line:
+                        self._done.add(line)
+        self._file = open(path, 'a', encoding='utf-8')
+        if batch_id is None:
+            batch_id = str(uuid.uuid4())
+            self._write(_BATCH_ID_PREFIX + batch_id)
+        self.batch_id = batch_id
+
+    def _write(self, line: str) -> None:
+        self._file.write(line + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._done
+
+    def mark_done(self, key: str) -> None:
+        with self._lock:
+            if key in self._done:
+                return
+            self._write(key)
+            self._done.add(key)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def run_ordered_batch(fn: Callable[..., Any],
+                      items: Iterable[Tuple[str, tuple]],
+                      max_workers: int = 4,
+                      checkpoint: Optional[FileCheckpoint] = None,
+                      catch: Tuple[Type[Exception], ...] = (Exception,)) -> BatchReport:
+    """
+    Run fn over items on a bounded thread pool, reporting results in order
+
+    Items are pulled from the iterable lazily: no more than 2 * max_workers
+    are submitted ahead of the oldest unfinished one, so arbitrarily long
+    streams use constant memory (apart from the report itself).
+
+    Args:
+        fn: Callable invoked as fn(*args) for each item
+        items: Iterable of (key, args) pairs; key identifies the item in the checkpoint
+        max_workers: Number of worker threads
+        checkpoint: Optional checkpoint; keys already in it are skipped
+        catch: Exception types recorded as item failures instead of aborting the batch
+
+    Returns:
+        BatchReport with one result per item, in input order
+    """
+    report = BatchReport()
+    window = 2 * max_workers
+
+    def run(index: int, key: str, args: tuple) -> BatchItemResult:
+        try:
+            response = fn(*args)
+        except catch as e:
+            return BatchItemResult(index, key, error=e)
+        if checkpoint is not None:
+            checkpoint.mark_done(key)
+        return BatchItemResult(index, key, response=response)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending: deque = deque()
+
+        for index, (key, args) in enumerate(items):
+            if checkpoint is not None and key in checkpoint:
+                pending.append(BatchItemResult(index, key, skipped=True))
+            else:
+                pending.append(pool.submit(run, index, key, args))
+
+            while len(pending) >= window:
+                head = pending.popleft()
+                report.results.append(head if isinstance(head, BatchItemResult) else head.result())
+
+        while pending:
+            head = pending.popleft()
+            report.results.append(head if isinstance(head, BatchItemResult) else head.result())
+
+    return report
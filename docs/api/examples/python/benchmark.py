@@ -0,0 +1,589 @@
+"""
+Bodyweight Training API - Client Benchmarks
+Drives the sync, advanced and async clients against the local stub server
+
+Usage:
+    python benchmark.py                          # every scenario, default settings
+    python benchmark.py --latency 20 --jitter 30 --error-rate 0.02 --payload-scale 10
+    python benchmark.py --stall-rate 0.02 --stall-ms 500 --scenarios app-open-advanced,app-open-hedged
+    python benchmark.py --scenarios workflow-sync,workflow-async --json results.json
+    python benchmark.py --baseline results.json  # exit 1 if throughput/p95 regressed
+    python benchmark.py --startup --json startup.json   # cold import and first-request latency
+    python benchmark.py --verify-retries         # check the advanced client's retry behavior
+
+Each scenario reports throughput (operations per second), latency
+percentiles per operation, failed operations and peak traced memory.
+--startup instead runs each startup probe in fresh interpreters and
+reports how long the import (or import + first request) took.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+from bodyweight_client import (
+    AdvancedBodyweightClient,
+    APIError,
+    BiometricData,
+    BodyweightTrainingClient,
+    ExercisePerformance,
+    SessionFeedback,
+)
+from cache import ResponseCache
+from circuit import CircuitBreaker
+from hedging import HedgePolicy
+from ratelimit import RetryBudget
+from stub_server import EndpointBehavior, StubProcess, StubServer, synthetic_token
+
+
+@dataclass
+class BenchmarkConfig:
+    operations: int = 200
+    concurrency: int = 8
+    latency_ms: float = 5.0
+    jitter_ms: float = 5.0
+    error_rate: float = 0.0
+    stall_rate: float = 0.0
+    stall_ms: float = 0.0
+    payload_scale: int = 1
+    measure_memory: bool = True
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    operations: int
+    failures: int
+    duration_s: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    peak_memory_kib: Optional[float] = None
+
+
+@dataclass
+class StartupResult:
+    scenario: str
+    runs: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+# ---------------------------------------------------------------------------
+# Workflows (mirroring example_complete_workflow / example_analytics)
+# ---------------------------------------------------------------------------
+
+def complete_workflow(client: BodyweightTrainingClient) -> None:
+    """Routine generation, workout feedback and progress analysis for one athlete"""
+    client.get_current_routine()
+    biometrics = client.get_latest_biometrics()
+    routine_response = client.generate_routine(
+        days_to_generate=1,
+        biometric_data=BiometricData(weight=biometrics.weight, sleep_hours=7.5, sleep_quality=4, fatigue_level=2),
+    )
+    routine = routine_response['trainingPlan']['current_session']
+
+    performance = [
+        ExercisePerformance(
+            sessionExerciseId=block.get('session_exercise_id', f'bench-{i}'),
+            exerciseId=block['exercise']['id'],
+            setNumber=1,
+            repsCompleted=int(block['reps'] * 0.9),
+            rpeReported=7,
+            techniqueQuality=4,
+            restTimeActual=block.get('rest_seconds', 60) + 10,
+        )
+        for i, block in enumerate(routine.get('exercise_blocks', [])[:2])
+    ]
+    client.save_session_feedback(
+        session_id=routine['id'],
+        feedback=SessionFeedback(rpe_reported=7, completion_rate=0.9, technical_quality=4,
+                                 enjoyment_level=4, recovery_feeling=3, actual_duration=35),
+        exercise_performance=performance,
+    )
+    client.calculate_ica()
+    client.analyze_muscle_groups()
+
+
+def analytics(client: AdvancedBodyweightClient) -> None:
+    """bulk_analyze, failing the operation if any analysis failed"""
+    results = client.bulk_analyze()
+    if any(value is None for value in results.values()):
+        raise APIError("bulk_analyze returned a partial result")
+
+
+def app_open(client: BodyweightTrainingClient) -> None:
+    """The sequential app-open reads of example_complete_workflow"""
+    routine = client.get_current_routine()
+    client.get_latest_biometrics()
+    if not routine:
+        client.generate_routine(days_to_generate=1, biometric_data=BiometricData(sleep_hours=7.5))
+    client.calculate_ica()
+
+
+def app_open_prefetch(client: BodyweightTrainingClient) -> None:
+    client.prefetch_session(biometric_data=BiometricData(sleep_hours=7.5))
+
+
+async def analytics_async(client) -> None:
+    results = await client.bulk_analyze()
+    if any(value is None for value in results.values()):
+        raise APIError("bulk_analyze returned a partial result")
+
+
+def history_scan(client: BodyweightTrainingClient, prefetch: bool) -> None:
+    for _ in client.iter_training_history(page_size=50, prefetch=prefetch):
+        pass
+
+
+async def complete_workflow_async(client) -> None:
+    await client.get_current_routine()
+    biometrics = await client.get_latest_biometrics()
+    routine_response = await client.generate_routine(
+        days_to_generate=1,
+        biometric_data=BiometricData(weight=biometrics.weight, sleep_hours=7.5, sleep_quality=4, fatigue_level=2),
+    )
+    routine = routine_response['trainingPlan']['current_session']
+    await client.save_session_feedback(
+        session_id=routine['id'],
+        feedback=SessionFeedback(rpe_reported=7, completion_rate=0.9, technical_quality=4),
+    )
+    await asyncio.gather(client.calculate_ica(), client.analyze_muscle_groups())
+
+
+# ---------------------------------------------------------------------------
+# Runners
+# ---------------------------------------------------------------------------
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _summarize(name: str, latencies: List[float], failures: int, duration: float) -> ScenarioResult:
+    latencies.sort()
+    operations = len(latencies) + failures
+    return ScenarioResult(
+        scenario=name,
+        operations=operations,
+        failures=failures,
+        duration_s=duration,
+        throughput=operations / duration if duration else 0.0,
+        p50_ms=_percentile(latencies, 50) * 1000,
+        p95_ms=_percentile(latencies, 95) * 1000,
+        p99_ms=_percentile(latencies, 99) * 1000,
+        max_ms=(latencies[-1] if latencies else 0.0) * 1000,
+    )
+
+
+def run_threaded(name: str, make_client: Callable[[int], object], operation: Callable[[object], None],
+                 config: BenchmarkConfig) -> ScenarioResult:
+    """Run `operations` calls of operation on `concurrency` threads, one client per thread"""
+    latencies: List[float] = []
+    failures = [0]
+    lock = threading.Lock()
+    counter = iter(range(config.operations))
+
+    def worker(worker_index: int) -> None:
+        client = make_client(worker_index)
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            started = time.perf_counter()
+            try:
+                operation(client)
+            except APIError:
+                with lock:
+                    failures[0] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config.concurrency) as pool:
+        list(pool.map(worker, range(config.concurrency)))
+    return _summarize(name, latencies, failures[0], time.perf_counter() - started)
+
+
+def run_async(name: str, base_url: str, operation, config: BenchmarkConfig) -> ScenarioResult:
+    """Run `operations` async calls with at most `concurrency` in flight over one shared pool"""
+    from async_client import AsyncBodyweightTrainingClient, create_connector
+
+    async def main() -> ScenarioResult:
+        latencies: List[float] = []
+        failures = 0
+        connector = create_connector(max_connections=config.concurrency)
+        clients = [AsyncBodyweightTrainingClient(base_url, synthetic_token(i), connector=connector)
+                   for i in range(config.concurrency)]
+        semaphore = asyncio.Semaphore(config.concurrency)
+
+        async def one(index: int) -> None:
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await operation(clients[index % len(clients)])
+                except APIError:
+                    failures += 1
+                    return
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(one(i) for i in range(config.operations)))
+        finally:
+            for client in clients:
+                await client.close()
+            await connector.close()
+        return _summarize(name, latencies, failures, time.perf_counter() - started)
+
+    return asyncio.run(main())
+
+
+def uncached_client(base_url: str, index: int, hedging: Optional[HedgePolicy] = None) -> AdvancedBodyweightClient:
+    """Advanced client without a response cache, so every read is a request"""
+    return AdvancedBodyweightClient(base_url, synthetic_token(index), cache=ResponseCache(ttls={}), hedging=hedging)
+
+
+def run_hedged(name: str, base_url: str, operation: Callable[[object], None],
+               config: BenchmarkConfig) -> ScenarioResult:
+    """run_threaded with uncached clients sharing one HedgePolicy"""
+    hedging = HedgePolicy()
+    try:
+        return run_threaded(name, lambda i: uncached_client(base_url, i, hedging), operation, config)
+    finally:
+        hedging.close()
+
+
+def scenarios(base_url: str) -> Dict[str, Callable[[BenchmarkConfig], ScenarioResult]]:
+    return {
+        "workflow-sync": lambda c: run_threaded(
+            "workflow-sync", lambda i: BodyweightTrainingClient(base_url, synthetic_token(i)), complete_workflow, c),
+        "workflow-advanced": lambda c: run_threaded(
+            "workflow-advanced", lambda i: AdvancedBodyweightClient(base_url, synthetic_token(i)), complete_workflow, c),
+        "workflow-async": lambda c: run_async("workflow-async", base_url, complete_workflow_async, c),
+        "analytics-advanced": lambda c: run_threaded(
+            "analytics-advanced",
+            # A fresh cache per operation so bulk_analyze measures requests, not cache hits
+            lambda i: AdvancedBodyweightClient(base_url, synthetic_token(i)),
+            lambda client: (client.response_cache.clear(), analytics(client)), c),
+        "analytics-async": lambda c: run_async(
+            "analytics-async", base_url, analytics_async, c),
+        "app-open-sequential": lambda c: run_threaded(
+            "app-open-sequential", lambda i: BodyweightTrainingClient(base_url, synthetic_token(i)), app_open, c),
+        "app-open-prefetch": lambda c: run_threaded(
+            "app-open-prefetch", lambda i: BodyweightTrainingClient(base_url, synthetic_token(i)), app_open_prefetch, c),
+        "app-open-advanced": lambda c: run_threaded(
+            "app-open-advanced", lambda i: uncached_client(base_url, i), app_open, c),
+        "app-open-hedged": lambda c: run_hedged("app-open-hedged", base_url, app_open, c),
+        "history-prefetch": lambda c: run_threaded(
+            "history-prefetch", lambda i: BodyweightTrainingClient(base_url, synthetic_token(i)),
+            lambda client: history_scan(client, prefetch=True), c),
+        "history-sequential": lambda c: run_threaded(
+            "history-sequential", lambda i: BodyweightTrainingClient(base_url, synthetic_token(i)),
+            lambda client: history_scan(client, prefetch=False), c),
+    }
+
+
+def run_benchmarks(config: BenchmarkConfig, selected: Optional[List[str]] = None) -> List[ScenarioResult]:
+    """
+    Start a stub server in a child process and run the selected scenarios against it
+
+    Args:
+        config: Load and stub settings
+        selected: Scenario names to run (None runs all)
+
+    Returns:
+        One ScenarioResult per scenario, in run order
+    """
+    behavior = EndpointBehavior(
+        latency=config.latency_ms / 1000,
+        jitter=config.jitter_ms / 1000,
+        error_rate=config.error_rate,
+        payload_scale=config.payload_scale,
+        stall_rate=config.stall_rate,
+        stall_latency=config.stall_ms / 1000,
+    )
+    results = []
+
+    with StubProcess(default=behavior, history_size=200, seed=1234) as stub:
+        available = scenarios(stub.url)
+        for name in selected or list(available):
+            if name not in available:
+                raise ValueError(f"Unknown scenario '{name}' (available: {', '.join(available)})")
+            result = available[name](config)
+
+            if config.measure_memory:
+                # Separate pass: tracemalloc slows allocation-heavy code, so it
+                # must not distort the timed run above
+                tracemalloc.start()
+                available[name](config)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                result.peak_memory_kib = peak / 1024
+
+            results.append(result)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Startup
+# ---------------------------------------------------------------------------
+
+# Code timed in a fresh interpreter; URL and TOKEN are defined for the probe
+STARTUP_PROBES = {
+    "import-package": "import bodyweight_client",
+    "import-data": "from bodyweight_client import APIError, BiometricData, SessionFeedback",
+    "import-client": "from bodyweight_client import BodyweightTrainingClient",
+    "import-async": "import async_client",
+    "first-request": (
+        "from bodyweight_client import BodyweightTrainingClient\n"
+        "BodyweightTrainingClient(URL, TOKEN).get_current_routine()"
+    ),
+}
+
+_PROBE_TEMPLATE = """
+import time
+URL, TOKEN = {url!r}, {token!r}
+start = time.perf_counter()
+{body}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def measure_startup(runs: int = 20, selected: Optional[List[str]] = None) -> List[StartupResult]:
+    """
+    Time each startup probe in fresh interpreters
+
+    Only the probe's own code is timed, not interpreter startup, so the
+    numbers track what the client modules add. first-request runs against
+    a stub server started once for all runs.
+
+    Args:
+        runs: Interpreters started per probe
+        selected: Probe names to run (None runs all)
+
+    Returns:
+        One StartupResult per probe, in run order
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+
+    with StubProcess(default=EndpointBehavior(latency=0, jitter=0), seed=1234) as stub:
+        for name in selected or list(STARTUP_PROBES):
+            if name not in STARTUP_PROBES:
+                raise ValueError(f"Unknown startup probe '{name}' (available: {', '.join(STARTUP_PROBES)})")
+            code = _PROBE_TEMPLATE.format(url=stub.url, token=synthetic_token(0), body=STARTUP_PROBES[name])
+            timings = []
+            for _ in range(runs):
+                completed = subprocess.run([sys.executable, "-c", code], cwd=here,
+                                           capture_output=True, text=True, check=True)
+                timings.append(float(completed.stdout.strip().splitlines()[-1]))
+            timings.sort()
+            results.append(StartupResult(
+                scenario=f"startup:{name}",
+                runs=runs,
+                p50_ms=_percentile(timings, 50),
+                p95_ms=_percentile(timings, 95),
+                max_ms=timings[-1],
+            ))
+    return results
+
+
+def print_startup_results(results: List[StartupResult]) -> None:
+    header = f"{'probe':28s} {'runs':>5s} {'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r.scenario:28s} {r.runs:5d} {r.p50_ms:8.1f} {r.p95_ms:8.1f} {r.max_ms:8.1f}")
+
+
+def print_results(results: List[ScenarioResult]) -> None:
+    header = (f"{'scenario':22s} {'ops':>6s} {'fail':>5s} {'ops/s':>9s} {'p50 ms':>8s} "
+              f"{'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s} {'peak KiB':>9s}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        memory = f"{r.peak_memory_kib:9.0f}" if r.peak_memory_kib is not None else f"{'-':>9s}"
+        print(f"{r.scenario:22s} {r.operations:6d} {r.failures:5d} {r.throughput:9.1f} {r.p50_ms:8.1f} "
+              f"{r.p95_ms:8.1f} {r.p99_ms:8.1f} {r.max_ms:8.1f} {memory}")
+
+
+# ---------------------------------------------------------------------------
+# Retry checks
+# ---------------------------------------------------------------------------
+
+def verify_retries() -> List[str]:
+    """
+    Check that the advanced client retries failed requests within its retry budget
+
+    Returns:
+        Human-readable failures (empty when every check passed)
+    """
+    problems = []
+
+    def attempts(stub: StubServer, endpoint: str, call: Callable[[], object], expected_status: int) -> int:
+        before = stub.stats.requests.get(endpoint, 0)
+        try:
+            call()
+            problems.append(f"{endpoint}: expected a {expected_status}, the call succeeded")
+        except APIError as e:
+            if e.status_code != expected_status:
+                problems.append(f"{endpoint}: expected a {expected_status}, got {e.status_code}")
+        return stub.stats.requests.get(endpoint, 0) - before
+
+    def client(stub: StubServer, **kwargs) -> AdvancedBodyweightClient:
+        # A circuit that never opens, so every attempt reaches the stub
+        return AdvancedBodyweightClient(stub.url, synthetic_token(0), max_retries=3, retry_delay=0.001,
+                                        circuit_breaker=CircuitBreaker(failure_threshold=1000), **kwargs)
+
+    behaviors = {
+        '/calculate-ica': EndpointBehavior(error_rate=1.0, error_status=503, retry_after=0),
+        '/update-biometrics': EndpointBehavior(error_rate=1.0, error_status=500),
+        '/update-progressions': EndpointBehavior(error_rate=1.0, error_status=503, retry_after=0),
+        '/analyze-evolution': EndpointBehavior(error_rate=1.0, error_status=429, retry_after=120),
+    }
+    with StubServer(behaviors=behaviors) as stub:
+        sent = attempts(stub, '/calculate-ica', client(stub).calculate_ica, 503)
+        if sent != 4:
+            problems.append(f"a read failing with 503 was sent {sent} times, expected 4 (3 retries)")
+
+        sent = attempts(stub, '/update-progressions', lambda: client(stub).update_progressions('s1', []), 503)
+        if sent != 4:
+            problems.append(f"a write refused with 503 was sent {sent} times, expected 4 (3 retries)")
+
+        sent = attempts(stub, '/update-biometrics',
+                        lambda: client(stub).update_biometrics(BiometricData(weight=70)), 500)
+        if sent != 1:
+            problems.append(f"a write failing with 500 was sent {sent} times, expected 1 (not retried)")
+
+        # Retry-After beyond max_retry_delay: give up at once rather than retry early
+        started = time.perf_counter()
+        sent = attempts(stub, '/analyze-evolution', client(stub).analyze_evolution, 429)
+        if sent != 1 or time.perf_counter() - started > 5:
+            problems.append(f"a 429 with Retry-After: 120 was sent {sent} times, expected 1 and no wait")
+
+        # A budget with room for one retry in its window: the second call is not retried at all
+        budgeted = client(stub, retry_budget=RetryBudget(ratio=0.0, min_retries_per_second=0.1, window=10.0))
+        sent = [attempts(stub, '/calculate-ica', budgeted.calculate_ica, 503) for _ in range(2)]
+        if sent != [2, 1]:
+            problems.append(f"with a one-retry budget two failing reads were sent {sent} times, expected [2, 1]")
+
+    return problems
+
+
+def compare_with_baseline(results: List, baseline_path: str, threshold: float) -> List[str]:
+    """
+    Compare results against a saved --json run
+
+    Returns:
+        Descriptions of scenarios whose throughput dropped or p95 latency grew by more than threshold
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {entry['scenario']: entry for entry in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.scenario)
+        if previous is None:
+            continue
+        throughput = getattr(result, 'throughput', None)
+        if previous.get('throughput') and throughput is not None and throughput < previous['throughput'] * (1 - threshold):
+            regressions.append(f"{result.scenario}: throughput {previous['throughput']:.1f} -> {throughput:.1f} ops/s")
+        if previous['p95_ms'] and result.p95_ms > previous['p95_ms'] * (1 + threshold):
+            regressions.append(f"{result.scenario}: p95 {previous['p95_ms']:.1f} -> {result.p95_ms:.1f} ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Python clients against a local stub server")
+    parser.add_argument("--operations", type=int, default=200, help="Operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients per scenario")
+    parser.add_argument("--latency", type=float, default=5.0, help="Stub base latency in ms")
+    parser.add_argument("--jitter", type=float, default=5.0, help="Stub latency jitter in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an injected 503")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Probability of a stalled request")
+    parser.add_argument("--stall-ms", type=float, default=500.0, help="Extra latency of stalled requests in ms")
+    parser.add_argument("--payload-scale", type=int, default=1, help="Multiplier for the lists in responses")
+    parser.add_argument("--scenarios", help="Comma-separated scenario (or --startup probe) names (default: all)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced-memory pass")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    parser.add_argument("--baseline", help="Compare with a previous --json file")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative regression")
+    parser.add_argument("--startup", action="store_true", help="Measure cold import and first-request latency instead")
+    parser.add_argument("--startup-runs", type=int, default=20, help="Fresh interpreters per startup probe")
+    parser.add_argument("--verify-retries", action="store_true", help="Check retry behavior against the stub and exit")
+    args = parser.parse_args(argv)
+
+    # Per-request logging would dominate the measurements; failures are
+    # counted in the results table instead
+    logging.getLogger("bodyweight_client").setLevel(logging.CRITICAL)
+
+    if args.verify_retries:
+        problems = verify_retries()
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            return 1
+        print("✅ Failed requests are retried within the retry budget and Retry-After limits")
+        return 0
+
+    config = BenchmarkConfig(
+        operations=args.operations,
+        concurrency=args.concurrency,
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+        stall_ms=args.stall_ms,
+        payload_scale=args.payload_scale,
+        measure_memory=not args.no_memory,
+    )
+    selected = args.scenarios.split(",") if args.scenarios else None
+
+    if args.startup:
+        print(f"🏁 Measuring startup over {args.startup_runs} fresh interpreters per probe\n")
+        results = measure_startup(args.startup_runs, selected)
+        print_startup_results(results)
+    else:
+        print(f"🏁 Benchmarking with {config.concurrency} concurrent clients, {config.operations} operations "
+              f"per scenario, stub latency {config.latency_ms}±{config.jitter_ms}ms\n")
+        results = run_benchmarks(config, selected)
+        print_results(results)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"config": asdict(config), "python": sys.version.split()[0],
+                       "results": [asdict(r) for r in results]}, f, indent=2)
+        print(f"\n💾 Results written to {args.json_path}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Regressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   - {line}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
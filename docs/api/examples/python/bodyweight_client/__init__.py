@@ -0,0 +1,64 @@
+"""
+Bodyweight Training API - Python Client
+Comprehensive Python client for the Bodyweight Adaptive Training API
+
+Importing the package is cheap: submodules load on first attribute access,
+so `from bodyweight_client import BiometricData, APIError` never imports an
+HTTP library, and `requests` is only loaded once a client class is used.
+
+- api: endpoint constants and APIError (no transport)
+- data: request/response dataclasses (no transport)
+- client: BodyweightTrainingClient, AdvancedBodyweightClient and helpers (requests)
+- examples: walkthroughs, run with `python -m bodyweight_client`
+
+The package logs to the "bodyweight_client" logger and configures no
+handlers; call logging.basicConfig() (or attach your own handler) to see
+its output.
+"""
+
+import importlib
+import logging
+from typing import Any, List
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    'APIError': 'api',
+    'BULK_ANALYSES': 'api',
+    'CONDITIONAL_ENDPOINTS': 'api',
+    'IDEMPOTENCY_HEADER': 'api',
+    'IDEMPOTENT_ENDPOINTS': 'api',
+    'MAX_HISTORY_PAGE_SIZE': 'api',
+    '_api_error_for_status': 'api',
+    'BiometricData': 'data',
+    'ExercisePerformance': 'data',
+    'PerformanceRows': 'data',
+    'PreparedSession': 'data',
+    'SessionFeedback': 'data',
+    'apply_routine_delta': 'data',
+    'feedback_payload': 'data',
+    'routine_delta_payload': 'data',
+    'AdvancedBodyweightClient': 'client',
+    'BodyweightTrainingClient': 'client',
+    'bulk_analyze_users': 'client',
+    'warm_user': 'client',
+    'example_analytics': 'examples',
+    'example_complete_workflow': 'examples',
+}
+
+__all__ = ['logger'] + [name for name in _EXPORTS if not name.startswith('_')]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,27 @@
+"""
+Run the client examples: python -m bodyweight_client
+"""
+
+import logging
+
+from .examples import example_analytics, example_complete_workflow
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    print("Bodyweight Training API - Python Client Examples")
+    print("=" * 50)
+    
+    # Note: Update these with your actual values before running
+    SUPABASE_URL = "https://your-project.supabase.co"
+    JWT_TOKEN = "your-jwt-token"
+    
+    if JWT_TOKEN == "your-jwt-token":
+        print("❌ Please update SUPABASE_URL and JWT_TOKEN variables before running examples")
+    else:
+        print("\n🔄 Running complete workflow example...")
+        example_complete_workflow()
+        
+        print("\n" + "="*50)
+        print("🔄 Running analytics example...")
+        example_analytics()
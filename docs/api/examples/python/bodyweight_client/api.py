@@ -0,0 +1,85 @@
+"""
+Bodyweight Training API - Endpoint Constants and Errors
+Shared by the sync and async clients; imports no HTTP transport
+"""
+
+from typing import Any, Dict, Optional
+
+from ratelimit import parse_retry_after
+
+
+class APIError(Exception):
+    """Custom API error class"""
+    def __init__(self, message: str, status_code: int = None, response_data: Dict = None,
+                 retry_after: Optional[float] = None):
+        self.message = message
+        self.status_code = status_code
+        self.response_data = response_data or {}
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
+def _api_error_for_status(status_code: int, reason: str, error_data: Optional[Any] = None,
+                          retry_after: Optional[str] = None) -> APIError:
+    """
+    Map a non-2xx HTTP response onto an APIError
+    
+    Shared by the sync and async clients so both surface identical errors.
+    
+    Args:
+        status_code: HTTP status code of the response
+        reason: HTTP reason phrase
+        error_data: Parsed JSON error body, or None if it could not be parsed
+        retry_after: Raw Retry-After header value, if present
+        
+    Returns:
+        APIError describing the failure
+    """
+    retry_after_seconds = parse_retry_after(retry_after)
+    
+    if status_code == 401:
+        return APIError("Authentication failed - invalid or expired JWT token", 401)
+    elif status_code == 404:
+        return APIError("Resource not found", 404)
+    elif status_code == 429:
+        return APIError("Rate limit exceeded - please wait before retrying", 429,
+                        retry_after=retry_after_seconds)
+    
+    if isinstance(error_data, dict):
+        error_msg = error_data.get('error', f"HTTP {status_code}")
+        details = error_data.get('details', '')
+        full_msg = f"{error_msg}. {details}".strip()
+        return APIError(full_msg, status_code, error_data, retry_after_seconds)
+    
+    return APIError(f"HTTP {status_code}: {reason}", status_code, {}, retry_after_seconds)
+
+
+# Server-side cap on get-training-history page size
+MAX_HISTORY_PAGE_SIZE = 100
+
+# Read-only endpoints that are safe to coalesce, cache or repeat
+IDEMPOTENT_ENDPOINTS = frozenset({
+    "/calculate-ica",
+    "/get-current-routine",
+    "/get-latest-biometrics",
+    "/get-training-history",
+    "/analyze-muscle-groups",
+    "/analyze-evolution",
+})
+
+# Request header the write endpoints deduplicate on: a write resent with the
+# same key is answered with the stored response instead of being applied twice
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+# Polled read endpoints that answer If-None-Match with 304 Not Modified
+CONDITIONAL_ENDPOINTS = frozenset({
+    "/get-current-routine",
+    "/get-latest-biometrics",
+})
+
+# (result key, client method, log label) for each call made by bulk_analyze
+BULK_ANALYSES = (
+    ('ica', 'calculate_ica', 'ICA analysis'),
+    ('muscle_groups', 'analyze_muscle_groups', 'Muscle group analysis'),
+    ('evolution', 'analyze_evolution', 'Evolution analysis'),
+)
@@ -0,0 +1,1009 @@
+"""
+Bodyweight Training API - Python Client
+Comprehensive Python client for the Bodyweight Adaptive Training API (requests transport)
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+import contextlib
+import contextvars
+import json
+import time
+import uuid
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from batch import BatchReport, FileCheckpoint, item_idempotency_key, run_ordered_batch
+from cache import ResponseCache, ValidatorCache, token_fingerprint
+from circuit import CircuitBreaker, CircuitOpenError, is_failure
+from codec import JSONCodec, RequestCompression, accept_encoding, get_codec
+from hedging import HedgePolicy
+from instrumentation import Instrumentation
+from ratelimit import RateLimiter, RetryBudget, backoff_delay
+from singleflight import SingleFlight
+from tracing import NOOP_TRACER, SPAN_KIND_CLIENT, Tracer
+
+from . import logger
+from .api import (
+    BULK_ANALYSES,
+    CONDITIONAL_ENDPOINTS,
+    IDEMPOTENCY_HEADER,
+    IDEMPOTENT_ENDPOINTS,
+    MAX_HISTORY_PAGE_SIZE,
+    APIError,
+    _api_error_for_status,
+)
+from .data import (
+    BiometricData,
+    PerformanceRows,
+    PreparedSession,
+    SessionFeedback,
+    apply_routine_delta,
+    feedback_payload,
+    routine_delta_payload,
+)
+
+
+class BodyweightTrainingClient:
+    """
+    Python client for the Bodyweight Adaptive Training API
+    
+    This client provides a comprehensive interface to all API endpoints
+    with proper error handling, retries, and type hints.
+    """
+    
+    def __init__(self, supabase_url: str, jwt_token: str, timeout: int = 30,
+                 single_flight: Optional[SingleFlight] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 codec: Optional[JSONCodec] = None,
+                 request_compression: Optional[RequestCompression] = None,
+                 session: Optional[requests.Session] = None,
+                 token_source: Optional[Callable[[], str]] = None,
+                 validators: Optional[ValidatorCache] = None,
+                 tracer: Optional[Tracer] = None,
+                 user_id: Optional[str] = None):
+        """
+        Initialize the client
+        
+        Args:
+            supabase_url: Base Supabase URL (e.g., https://your-project.supabase.co)
+            jwt_token: JWT authentication token
+            timeout: Request timeout in seconds
+            single_flight: Coalescer for identical concurrent read requests; may be
+                shared between clients (defaults to a private one)
+            instrumentation: Optional per-endpoint metrics and request hooks
+            codec: JSON codec for payloads and responses (defaults to the fastest installed)
+            request_compression: Optional gzip compression of large request bodies
+            session: Optional requests session (and connection pool) shared with
+                other clients; the JWT is sent per request, never stored on it
+            token_source: Optional callable returning the JWT to send with each
+                request, for tokens refreshed elsewhere (see pool.ClientPool)
+            validators: ETags and bodies of the polled endpoints, for conditional
+                requests (defaults to a private one)
+            tracer: Optional tracer recording spans for each request phase
+                (defaults to the no-op NOOP_TRACER)
+            user_id: Verified ID of the token's user. It namespaces shared
+                caches, coalesced requests and journals; without it the
+                token's fingerprint is used, so only the same token reaches
+                the same entries
+        """
+        self.base_url = f"{supabase_url.rstrip('/')}/functions/v1"
+        self.timeout = timeout
+        self.jwt_token = jwt_token
+        self.token_source = token_source
+        self.user_id = user_id if user_id is not None else token_fingerprint(jwt_token)
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+        self.instrumentation = instrumentation
+        self.codec = codec if codec is not None else get_codec()
+        self.request_compression = request_compression
+        self.validators = validators if validators is not None else ValidatorCache()
+        self.tracer = tracer if tracer is not None else NOOP_TRACER
+        # Blocks of the last delta-mode routine, by block tag
+        self._routine_blocks: Dict[str, Dict] = {}
+        self.session = session if session is not None else requests.Session()
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Accept-Encoding': accept_encoding(),
+            'User-Agent': 'BodyweightTraining-Python-Client/1.0'
+        })
+        
+        logger.info(f"Initialized client for {supabase_url}")
+    
+    def _make_request(self, endpoint: str, method: str = 'POST', data: Dict = None,
+                      headers: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Make HTTP request, coalescing identical concurrent reads
+        
+        Concurrent calls to an idempotent endpoint with the same user and
+        payload share a single HTTP request; see single_flight.stats for how
+        many calls were coalesced.
+        """
+        if endpoint not in IDEMPOTENT_ENDPOINTS:
+            return self._send_request(endpoint, method, data, headers)
+        
+        key = (endpoint, self.base_url, self.user_id, method.upper(),
+               json.dumps(data, sort_keys=True, separators=(',', ':')))
+        return self.single_flight.do(key, lambda: self._send_request(endpoint, method, data, headers))
+    
+    def _send_request(self, endpoint: str, method: str = 'POST', data: Dict = None,
+                      headers: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Make HTTP request with error handling
+        
+        Requests to CONDITIONAL_ENDPOINTS carry the last ETag received as
+        If-None-Match; on 304 Not Modified the stored body is decoded instead.
+        
+        Args:
+            endpoint: API endpoint (without base URL)
+            method: HTTP method
+            data: Request payload
+            headers: Extra request headers (e.g. Idempotency-Key)
+            
+        Returns:
+            Parsed JSON response
+            
+        Raises:
+            APIError: On HTTP errors or invalid responses
+        """
+        url = f"{self.base_url}{endpoint}"
+        probe = (self.instrumentation.track(endpoint, method, data)
+                 if self.instrumentation is not None else contextlib.nullcontext())
+        
+        conditional = endpoint in CONDITIONAL_ENDPOINTS
+        validator = self.validators.get(self.user_id, endpoint) if conditional else None
+        if validator is not None:
+            headers = {**(headers or {}), 'If-None-Match': validator[0]}
+        
+        with probe, self.tracer.span('request', SPAN_KIND_CLIENT, endpoint=endpoint,
+                                     method=method.upper()) as span:
+            try:
+                logger.debug(f"Making {method} request to {endpoint}")
+                
+                if method.upper() == 'GET':
+                    response = self._traced_send(lambda: self.session.get(
+                        url, headers={**self._auth_headers(), **(headers or {})}, timeout=self.timeout))
+                else:
+                    response = self._post(endpoint, url, data, headers)
+                
+                # Log response time
+                response_time = response.elapsed.total_seconds()
+                logger.debug(f"Request completed in {response_time:.2f}s")
+                
+                if self.instrumentation is not None:
+                    probe.record_response(response.status_code, len(response.request.body or b''),
+                                          len(response.content))
+                
+                if not response.ok:
+                    try:
+                        error_data = self.codec.loads(response.content)
+                    except ValueError:
+                        error_data = None
+                    raise _api_error_for_status(response.status_code, response.reason, error_data,
+                                                response.headers.get('Retry-After'))
+                
+                content = response.content
+                if response.status_code == 304 and validator is not None:
+                    logger.debug(f"♻️ {endpoint} not modified")
+                    span.set_attribute('not_modified', True)
+                    content = validator[1]
+                elif conditional and response.headers.get('ETag'):
+                    self.validators.set(self.user_id, endpoint, response.headers['ETag'], content)
+                
+                try:
+                    with self.tracer.span('decode', bytes=len(content)):
+                        return self.codec.loads(content)
+                except ValueError as e:
+                    raise APIError(f"Request failed: {str(e)}")
+                
+            except requests.exceptions.Timeout:
+                raise APIError(f"Request timed out after {self.timeout}s")
+            except requests.exceptions.ConnectionError:
+                raise APIError("Failed to connect to API server")
+            except requests.exceptions.RequestException as e:
+                raise APIError(f"Request failed: {str(e)}")
+    
+    def _auth_headers(self) -> Dict[str, str]:
+        """Authorization header for the next request"""
+        token = self.token_source() if self.token_source is not None else self.jwt_token
+        return {'Authorization': f'Bearer {token}'}
+    
+    def set_token(self, jwt_token: str) -> None:
+        """Use a new JWT (e.g. after a refresh) for subsequent requests"""
+        self.jwt_token = jwt_token
+    
+    def send(self, endpoint: str, data: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None,
+             method: str = 'POST', coalesce: bool = True) -> Dict:
+        """
+        Call an endpoint with a prepared payload and extra request headers
+        
+        Takes the same request path as the endpoint methods, for callers
+        that build requests themselves (e.g. a journal replaying writes with
+        their Idempotency-Key).
+        
+        Args:
+            endpoint: API endpoint (without base URL), e.g. "/update-biometrics"
+            data: Request payload; may hold RawJSON fragments
+            headers: Extra request headers
+            method: HTTP method
+            coalesce: False to always send the request, skipping single-flight
+                coalescing and any response cache (e.g. for load replays)
+            
+        Returns:
+            Parsed JSON response
+            
+        Raises:
+            APIError: On HTTP errors or invalid responses
+        """
+        if not coalesce:
+            return self._send_request(endpoint, method, data, headers)
+        return self._make_request(endpoint, method, data, headers)
+    
+    def _traced_send(self, send: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Run one HTTP call under a 'send' span
+        
+        The 'wait' child span covers sending the request until the response
+        headers were parsed (requests' Response.elapsed); the rest of 'send'
+        is reading the body.
+        """
+        if not self.tracer.enabled:
+            return send()
+        with self.tracer.span('send') as span:
+            started_ns = time.time_ns()
+            response = send()
+            span.set_attribute('status_code', response.status_code)
+            span.set_attribute('response_bytes', len(response.content))
+            self.tracer.record_span('wait', started_ns, started_ns + int(response.elapsed.total_seconds() * 1e9))
+        return response
+    
+    def _post(self, endpoint: str, url: str, data: Optional[Dict],
+              extra_headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """POST a codec-encoded body, compressing it when enabled and accepted by the endpoint"""
+        with self.tracer.span('encode') as span:
+            body = self.codec.encode_payload(data) if data is not None else None
+            if body is None or self.request_compression is None:
+                compressed, headers = body, {}
+            else:
+                compressed, headers = self.request_compression.encode(endpoint, body)
+            span.set_attribute('bytes', len(compressed or b''))
+        
+        request_headers = {**self._auth_headers(), **(extra_headers or {})}
+        response = self._traced_send(lambda: self.session.post(
+            url, data=compressed, headers={**request_headers, **headers}, timeout=self.timeout))
+        if headers and response.status_code == 415:
+            logger.info(f"🗜️ {endpoint} does not accept compressed bodies, sending uncompressed")
+            self.request_compression.mark_unsupported(endpoint)
+            response = self._traced_send(lambda: self.session.post(
+                url, data=body, headers=request_headers, timeout=self.timeout))
+        return response
+    
+    def generate_routine(self, days_to_generate: int = 1, biometric_data: Optional[BiometricData] = None) -> Dict:
+        """
+        Generate a personalized training routine
+        
+        Args:
+            days_to_generate: Number of days to generate (1-7)
+            biometric_data: Current biometric data for personalization
+            
+        Returns:
+            Training plan with generated session
+        """
+        payload = {"daysToGenerate": days_to_generate}
+        
+        if biometric_data:
+            payload["biometricData"] = biometric_data.to_dict()
+        
+        response = self._make_request("/generate-routine", data=payload)
+        
+        logger.info("✅ Routine generated successfully")
+        return response
+    
+    def calculate_ica(self) -> Dict:
+        """
+        Calculate current ICA (Index of Current Ability) score
+        
+        Returns:
+            ICA data with score, factors, and recommendations
+        """
+        response = self._make_request("/calculate-ica")
+        
+        ica_score = response.get('ica_score', 'N/A')
+        logger.info(f"🧠 Current ICA score: {ica_score}")
+        
+        return response
+    
+    def get_latest_biometrics(self) -> BiometricData:
+        """
+        Get latest biometric data for the user
+        
+        Returns:
+            BiometricData object with latest measurements
+        """
+        response = self._make_request("/get-latest-biometrics")
+        
+        logger.info("📊 Retrieved latest biometric data")
+        return BiometricData(**{k: v for k, v in response.items() if k in BiometricData.__dataclass_fields__})
+    
+    def get_current_routine(self, delta: bool = False) -> Optional[Dict]:
+        """
+        Get current active routine
+        
+        Polling is cheap either way: an unchanged routine costs a 304. With
+        delta, a changed routine only carries the exercise blocks this client
+        has not seen yet; the others are reused from the previous call.
+        
+        Args:
+            delta: Request the routine in delta mode
+            
+        Returns:
+            Current routine data or None if no active routine
+        """
+        endpoint = "/get-current-routine"
+        payload = routine_delta_payload(self._routine_blocks) if delta else None
+        response = self._make_request(endpoint, data=payload)
+        try:
+            # Also needed without delta: a 304 may replay a body received in delta mode
+            routine, blocks = apply_routine_delta(response.get('routine'), self._routine_blocks)
+        except KeyError:
+            # A referenced block is no longer held (another thread replaced them);
+            # refetch the full routine, bypassing validators and caches
+            self.validators.invalidate_user(self.user_id)
+            response = self._send_request(endpoint, data=routine_delta_payload(()) if delta else None)
+            routine, blocks = apply_routine_delta(response.get('routine'), {})
+        if delta:
+            self._routine_blocks = blocks
+        
+        if routine:
+            logger.info("🏋️ Retrieved current active routine")
+        else:
+            logger.info("No active routine found")
+        
+        return routine
+    
+    def save_session_feedback(self, 
+                            session_id: str, 
+                            feedback: SessionFeedback, 
+                            exercise_performance: Optional[PerformanceRows] = None,
+                            idempotency_key: Optional[str] = None) -> Dict:
+        """
+        Save session feedback after workout completion
+        
+        Args:
+            session_id: ID of the completed session
+            feedback: Session feedback data
+            exercise_performance: Detailed exercise performance data, as a list of
+                records or an ExercisePerformanceColumns container
+            idempotency_key: Optional Idempotency-Key; resending with the same key
+                returns the stored response instead of saving the feedback twice
+            
+        Returns:
+            Response with updated progressions and session data
+        """
+        payload = feedback_payload(session_id, feedback, exercise_performance)
+        headers = {IDEMPOTENCY_HEADER: idempotency_key} if idempotency_key else None
+        response = self._make_request("/save-session-feedback", data=payload, headers=headers)
+        
+        # Log progression updates
+        with self.tracer.span('postprocess', endpoint="/save-session-feedback"):
+            progressions = response.get('session', {}).get('updated_progressions', [])
+            if progressions:
+                for progression in progressions:
+                    status = "🚀 LEVEL UP!" if progression.get('progression_triggered') else "📊 Maintained"
+                    logger.info(f"{status} Exercise {progression.get('exercise_id', '')[:8]}...")
+            
+            logger.info("💾 Session feedback saved successfully")
+        return response
+    
+    def save_session_feedback_batch(self,
+                                    items: Iterable[Tuple[str, SessionFeedback, Optional[PerformanceRows]]],
+                                    max_workers: int = 4,
+                                    checkpoint_path: Optional[str] = None) -> BatchReport:
+        """
+        Save feedback for many finished sessions through a bounded worker pool
+        
+        Items are consumed lazily and results are reported in input order.
+        A failing session is recorded in the report without stopping the
+        batch. With a checkpoint file, each session ID is recorded as soon
+        as its feedback is saved, and a rerun after a crash skips those
+        sessions. Every request carries an idempotency key derived from the
+        checkpoint's batch ID and the session ID, so a session that was in
+        flight when the batch crashed is resent with the same key on resume
+        and the server applies it only once.
+        
+        Args:
+            items: Iterable of (session_id, feedback, exercise_performance) tuples
+            max_workers: Number of concurrent requests
+            checkpoint_path: Optional path of the resumable checkpoint file
+            
+        Returns:
+            BatchReport with one result per session, in input order
+        """
+        checkpoint = FileCheckpoint(checkpoint_path) if checkpoint_path else None
+        batch_id = checkpoint.batch_id if checkpoint is not None else str(uuid.uuid4())
+        
+        try:
+            report = run_ordered_batch(
+                self.save_session_feedback,
+                ((session_id, (session_id, feedback, performance, item_idempotency_key(batch_id, session_id)))
+                 for session_id, feedback, performance in items),
+                max_workers=max_workers,
+                checkpoint=checkpoint,
+                catch=(APIError,),
+            )
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        
+        for failure in report.failed:
+            logger.error(f"Feedback for session {failure.key} failed: {failure.error}")
+        logger.info(f"💾 Saved {report.succeeded} session feedbacks "
+                    f"({len(report.failed)} failed, {report.skipped} already saved)")
+        return report
+    
+    def analyze_muscle_groups(self) -> Dict:
+        """
+        Analyze muscle group balance and performance
+        
+        Returns:
+            Muscle group analysis with balance scores and recommendations
+        """
+        response = self._make_request("/analyze-muscle-groups")
+        
+        # Log significant imbalances
+        analyses = response.get('muscle_group_analyses', [])
+        for analysis in analyses:
+            imbalance = analysis.get('imbalance_score', 0)
+            if imbalance > 30:
+                muscle_group = analysis.get('muscle_group', 'Unknown')
+                logger.warning(f"⚠️ Imbalance detected in {muscle_group}: {imbalance:.1f}%")
+        
+        logger.info("💪 Muscle group analysis completed")
+        return response
+    
+    def analyze_evolution(self) -> Dict:
+        """
+        Analyze training evolution and progress over time
+        
+        Returns:
+            Evolution analysis with trends and predictions
+        """
+        response = self._make_request("/analyze-evolution")
+        
+        # Log key insights
+        with self.tracer.span('postprocess', endpoint="/analyze-evolution"):
+            ica_evolution = response.get('ica_evolution', {})
+            current_ica = ica_evolution.get('current_ica', 'N/A')
+            trend = ica_evolution.get('trend', 'unknown')
+            
+            overall_progress = response.get('overall_progress', {})
+            progress_score = overall_progress.get('score', 0)
+            classification = overall_progress.get('classification', 'Unknown')
+            
+            logger.info(f"📈 Current ICA: {current_ica} ({trend})")
+            logger.info(f"🏆 Overall progress: {progress_score:.2f} - {classification}")
+        
+        return response
+    
+    def update_progressions(self, session_id: str, exercise_blocks: List[Dict]) -> Dict:
+        """
+        Update exercise progressions based on performance
+        
+        Args:
+            session_id: Session ID for tracking
+            exercise_blocks: List of exercise performance data
+            
+        Returns:
+            Updated progression information
+        """
+        payload = {
+            "sessionId": session_id,
+            "exerciseBlocks": exercise_blocks
+        }
+        
+        response = self._make_request("/update-progressions", data=payload)
+        
+        progressions = response.get('progressions_updated', [])
+        logger.info(f"📊 Updated {len(progressions)} exercise progressions")
+        
+        return response
+    
+    def get_training_history(self,
+                             limit: int = 10,
+                             offset: int = 0,
+                             status: str = 'completed',
+                             start_date: Optional[str] = None,
+                             end_date: Optional[str] = None,
+                             include_exercises: bool = True,
+                             include_performance: bool = False) -> Dict:
+        """
+        Get one page of training history, newest sessions first
+        
+        Args:
+            limit: Page size (the server caps it at 100)
+            offset: Number of sessions to skip
+            status: Session status filter ('planned', 'in_progress', 'completed', 'skipped' or 'all')
+            start_date: Only sessions on or after this date (YYYY-MM-DD)
+            end_date: Only sessions on or before this date (YYYY-MM-DD)
+            include_exercises: Include session exercises in each session
+            include_performance: Include per-set exercise performance (requires exercises)
+            
+        Returns:
+            Training history page with pagination and summary data
+        """
+        payload = {
+            "limit": limit,
+            "offset": offset,
+            "status": status,
+            "include_exercises": include_exercises,
+            "include_performance": include_performance
+        }
+        
+        if start_date:
+            payload["start_date"] = start_date
+        if end_date:
+            payload["end_date"] = end_date
+        
+        response = self._make_request("/get-training-history", data=payload)
+        
+        logger.debug(f"📚 Retrieved {len(response.get('training_history', []))} sessions at offset {offset}")
+        return response
+    
+    def iter_training_history(self,
+                              page_size: int = MAX_HISTORY_PAGE_SIZE,
+                              prefetch: bool = True,
+                              **filters) -> Iterator[Dict]:
+        """
+        Lazily iterate over the full training history, one session at a time
+        
+        Pages are fetched on demand; with prefetch enabled the next page is
+        requested in a background thread while the caller processes the
+        current one. At most two pages are held in memory at once.
+        
+        Args:
+            page_size: Sessions per request (capped at 100 by the server)
+            prefetch: Fetch the next page in the background
+            **filters: status, start_date, end_date, include_exercises and
+                include_performance, as for get_training_history
+            
+        Yields:
+            Training session dicts, newest first
+        """
+        page_size = min(page_size, MAX_HISTORY_PAGE_SIZE)
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        
+        def fetch(offset: int) -> List[Dict]:
+            page = self.get_training_history(limit=page_size, offset=offset, **filters)
+            return page.get('training_history', [])
+        
+        try:
+            offset = 0
+            pending = executor.submit(fetch, offset) if executor else None
+            
+            while True:
+                sessions = pending.result() if executor else fetch(offset)
+                offset += len(sessions)
+                has_more = len(sessions) == page_size
+                
+                if executor and has_more:
+                    pending = executor.submit(fetch, offset)
+                
+                yield from sessions
+                del sessions
+                
+                if not has_more:
+                    break
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+    
+    def update_biometrics(self, biometric_data: BiometricData) -> Dict:
+        """
+        Record a new biometric measurement
+        
+        Args:
+            biometric_data: Biometric values to record
+            
+        Returns:
+            Updated biometric snapshot
+        """
+        response = self._make_request("/update-biometrics", data=biometric_data.to_dict())
+        
+        logger.info("📊 Biometric data updated successfully")
+        return response
+
+    def prefetch_session(self, biometric_data: Optional[BiometricData] = None, include_ica: bool = True,
+                         call_timeout: Optional[float] = None,
+                         executor: Optional[Executor] = None) -> PreparedSession:
+        """
+        Prepare today's session for the app-open path
+        
+        The latest biometrics and ICA are fetched speculatively on the
+        executor while the active routine is read on the calling thread. If
+        there is no active routine, one is generated immediately (the server
+        falls back to the stored biometrics, so it does not wait for them).
+        With an active routine the whole call costs about one round-trip.
+        
+        Args:
+            biometric_data: Today's check-in, sent with the routine generation
+                if one is needed
+            include_ica: Also fetch the ICA speculatively
+            call_timeout: Maximum seconds to wait for the speculative reads,
+                measured from the start of the call
+            executor: Optional shared executor for the speculative reads
+        
+        Returns:
+            PreparedSession; biometrics or ica are None if their read failed
+        
+        Raises:
+            APIError: If the routine could not be read or generated
+        """
+        started = time.monotonic()
+        pool = executor or ThreadPoolExecutor(max_workers=2)
+        try:
+            # Copied contexts keep the speculative requests' spans under the caller's
+            speculative = {'biometrics': pool.submit(contextvars.copy_context().run, self.get_latest_biometrics)}
+            if include_ica:
+                speculative['ica'] = pool.submit(contextvars.copy_context().run, self.calculate_ica)
+        
+            routine = self.get_current_routine()
+            generated = not routine
+            if generated:
+                response = self.generate_routine(days_to_generate=1, biometric_data=biometric_data)
+                routine = response['trainingPlan']['current_session']
+        
+            results = {}
+            for key, future in speculative.items():
+                remaining = None
+                if call_timeout is not None:
+                    remaining = max(0.0, started + call_timeout - time.monotonic())
+                try:
+                    results[key] = future.result(timeout=remaining)
+                except FutureTimeoutError:
+                    future.cancel()
+                    logger.warning(f"Prefetch of {key} timed out after {call_timeout}s")
+                except APIError as e:
+                    logger.warning(f"Prefetch of {key} failed: {e}")
+        finally:
+            if executor is None:
+                pool.shutdown(wait=False)
+        
+        elapsed = time.monotonic() - started
+        logger.info(f"⚡ Session ready in {elapsed:.2f}s ({'generated' if generated else 'active'} routine)")
+        return PreparedSession(routine=routine, generated=generated, biometrics=results.get('biometrics'),
+                               ica=results.get('ica'), elapsed=elapsed)
+
+
+class AdvancedBodyweightClient(BodyweightTrainingClient):
+    """
+    Advanced client with retry logic, rate limiting, circuit breaking, and caching
+    """
+    
+    def __init__(self, supabase_url: str, jwt_token: str, timeout: int = 30, 
+                 max_retries: int = 3, retry_delay: float = 1.0,
+                 cache: Optional[ResponseCache] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 retry_budget: Optional[RetryBudget] = None,
+                 max_retry_delay: float = 30.0,
+                 instrumentation: Optional[Instrumentation] = None,
+                 codec: Optional[JSONCodec] = None,
+                 request_compression: Optional[RequestCompression] = None,
+                 session: Optional[requests.Session] = None,
+                 token_source: Optional[Callable[[], str]] = None,
+                 validators: Optional[ValidatorCache] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 hedging: Optional[HedgePolicy] = None,
+                 tracer: Optional[Tracer] = None,
+                 user_id: Optional[str] = None):
+        """
+        Initialize advanced client
+        
+        Args:
+            supabase_url: Base Supabase URL
+            jwt_token: JWT authentication token
+            timeout: Request timeout in seconds
+            max_retries: Maximum number of retries for failed requests
+            retry_delay: Initial delay between retries (exponential backoff)
+            cache: Response cache for read endpoints; may be shared between
+                clients (defaults to a private in-memory cache)
+            single_flight: Coalescer for identical concurrent read requests
+            rate_limiter: Optional token-bucket limiter applied before every HTTP
+                request; share one instance to limit several clients together
+            retry_budget: Limits retries to a fraction of recent requests
+                (defaults to a private RetryBudget)
+            max_retry_delay: Upper bound for the delay between retries; a longer
+                Retry-After is not waited out and the error is raised
+            instrumentation: Optional per-endpoint metrics and request hooks
+            codec: JSON codec for payloads and responses (defaults to the fastest installed)
+            request_compression: Optional gzip compression of large request bodies
+            session: Optional requests session shared with other clients
+            token_source: Optional callable returning the JWT for each request
+            validators: ETags and bodies of the polled endpoints, for conditional requests
+            circuit_breaker: Per-endpoint circuit breaker; share one instance so
+                clients stop calling a failing endpoint together (defaults to a
+                private CircuitBreaker)
+            hedging: Optional hedge policy sending a second attempt of slow
+                idempotent reads
+            tracer: Optional tracer recording spans for each request phase,
+                cache lookups and retries
+            user_id: Verified ID of the token's user, namespacing the cache
+                (defaults to the token's fingerprint)
+        """
+        super().__init__(supabase_url, jwt_token, timeout, single_flight, instrumentation,
+                         codec, request_compression, session, token_source, validators, tracer, user_id)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.response_cache = cache if cache is not None else ResponseCache()
+        self.rate_limiter = rate_limiter
+        self.retry_budget = retry_budget if retry_budget is not None else RetryBudget()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.hedging = hedging
+    
+    def _send_request(self, endpoint: str, method: str = 'POST', data: Dict = None,
+                      headers: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Make HTTP request with retries; every endpoint method goes through here
+        
+        Runs below the cache and request coalescing, so a cache hit is never
+        retried and coalesced callers share one retried request.
+        """
+        return self._make_request_with_retry(endpoint, method, data, headers)
+    
+    def _send_hedged(self, endpoint: str, method: str, data: Optional[Dict],
+                     headers: Optional[Dict[str, str]]) -> Dict:
+        """
+        Make one HTTP request, hedged for idempotent reads when a hedge policy is set
+        """
+        if self.hedging is not None and endpoint in IDEMPOTENT_ENDPOINTS:
+            return self.hedging.call(endpoint, lambda: self._send_attempt(endpoint, method, data, headers))
+        return self._send_attempt(endpoint, method, data, headers)
+    
+    def _send_attempt(self, endpoint: str, method: str, data: Optional[Dict],
+                      headers: Optional[Dict[str, str]]) -> Dict:
+        """
+        Make one HTTP request if the endpoint's circuit and the rate limiter allow it
+        
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+        """
+        self.circuit_breaker.before_request(endpoint)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(endpoint)
+        try:
+            response = super()._send_request(endpoint, method, data, headers)
+        except APIError as e:
+            if is_failure(e):
+                self.circuit_breaker.record_failure(endpoint)
+            else:
+                self.circuit_breaker.record_success(endpoint)
+            raise
+        self.circuit_breaker.record_success(endpoint)
+        return response
+    
+    def _make_request(self, endpoint: str, method: str = 'POST', data: Dict = None,
+                      headers: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Make HTTP request through the response cache
+        
+        Read endpoints with a TTL policy are served from the cache when fresh.
+        Any other endpoint is treated as a write and invalidates the user's
+        cached reads that it makes stale.
+        """
+        if not self.response_cache.is_cacheable(endpoint):
+            try:
+                return super()._make_request(endpoint, method, data, headers)
+            finally:
+                self.response_cache.invalidate_for_write(self.user_id, endpoint)
+        
+        with self.tracer.span('cache.lookup', endpoint=endpoint) as span:
+            cached = self.response_cache.get(self.user_id, endpoint, data)
+            span.set_attribute('hit', cached is not None)
+        if cached is not None:
+            logger.debug(f"📋 Cache hit for {endpoint}")
+            if self.instrumentation is not None:
+                self.instrumentation.record_cache_hit(endpoint)
+            return cached
+        
+        if self.instrumentation is not None:
+            self.instrumentation.record_cache_miss(endpoint)
+        response = super()._make_request(endpoint, method, data, headers)
+        self.response_cache.set(self.user_id, endpoint, data, response)
+        return response
+    
+    def _make_request_with_retry(self, endpoint: str, method: str = 'POST', data: Dict = None,
+                                 headers: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Make request with retry logic and jittered exponential backoff
+        
+        Reads are retried on 429s, 5xx errors and connection failures. Writes
+        are only retried when the server refused them outright (429 and 503),
+        since after a timeout or another 5xx the write may have been applied.
+        A server Retry-After hint sets the minimum wait; a hint longer than
+        max_retry_delay raises the error instead of retrying early. Retries
+        also stop once the retry budget is spent so failures don't multiply
+        load during an incident. An open
+        circuit is not retried: the error is raised straight away.
+        """
+        self.retry_budget.record_request()
+        idempotent = endpoint in IDEMPOTENT_ENDPOINTS
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.tracer.span('retry.attempt', endpoint=endpoint, attempt=attempt):
+                    return self._send_hedged(endpoint, method, data, headers)
+            except CircuitOpenError:
+                raise
+            except APIError as e:
+                if idempotent:
+                    retryable = e.status_code == 429 or e.status_code is None or e.status_code >= 500
+                else:
+                    retryable = e.status_code in (429, 503)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                
+                if not self.retry_budget.try_acquire():
+                    logger.warning(f"Retry budget exhausted, giving up on {endpoint}")
+                    raise
+                
+                delay = backoff_delay(attempt, self.retry_delay, self.max_retry_delay, e.retry_after)
+                if delay is None:
+                    logger.warning(f"{endpoint} asked to retry after {e.retry_after:.0f}s, "
+                                   f"more than max_retry_delay; giving up")
+                    raise
+                if self.instrumentation is not None:
+                    self.instrumentation.record_retry(endpoint)
+                if e.status_code == 429:
+                    logger.warning(f"Rate limited, waiting {delay:.1f}s before retry {attempt + 1}/{self.max_retries}")
+                else:
+                    logger.warning(f"Request failed, retrying in {delay:.1f}s... ({attempt + 1}/{self.max_retries})")
+                with self.tracer.span('retry.backoff', endpoint=endpoint, delay_s=delay):
+                    time.sleep(delay)
+    
+    def calculate_ica_cached(self, cache_duration: int = 300) -> Dict:
+        """
+        Calculate ICA with caching (5 minute default)
+        
+        Args:
+            cache_duration: Cache duration in seconds
+            
+        Returns:
+            ICA data (may be from cache)
+        """
+        cached = self.response_cache.get(self.user_id, "/calculate-ica", max_age=cache_duration)
+        if cached is not None:
+            logger.info("📋 Using cached ICA data")
+            return cached
+        
+        # Too old for the caller; drop it so calculate_ica fetches fresh data
+        self.response_cache.delete(self.user_id, "/calculate-ica")
+        return self.calculate_ica()
+    
+    def bulk_analyze(self, max_workers: int = 3, call_timeout: Optional[float] = None,
+                     executor: Optional[Executor] = None) -> Dict:
+        """
+        Perform bulk analysis (ICA, muscle groups, evolution) concurrently
+        
+        The three analyses run on a thread pool, so latency is that of the
+        slowest call rather than the sum. A failed or timed out analysis is
+        reported as None without affecting the others.
+        
+        Args:
+            max_workers: Thread pool size when no executor is given
+            call_timeout: Maximum seconds to wait for each analysis, measured
+                from submission (None waits for the HTTP timeout)
+            executor: Optional shared executor to run the calls on
+            
+        Returns:
+            Combined analysis results
+        """
+        logger.info("🔄 Performing bulk analysis...")
+        
+        pool = executor or ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = self._submit_bulk_analysis(pool)
+            results = self._collect_bulk_analysis(futures, call_timeout, time.monotonic())
+        finally:
+            if executor is None:
+                pool.shutdown(wait=False)
+        
+        logger.info("📊 Bulk analysis completed")
+        return results
+    
+    def _submit_bulk_analysis(self, executor: Executor) -> Dict[str, Future]:
+        """Submit every bulk analysis call to the executor"""
+        return {key: executor.submit(contextvars.copy_context().run, getattr(self, method))
+                for key, method, _ in BULK_ANALYSES}
+    
+    @staticmethod
+    def _collect_bulk_analysis(futures: Dict[str, Future], call_timeout: Optional[float],
+                               submitted_at: float) -> Dict:
+        """Wait for submitted bulk analysis calls, isolating failures per item"""
+        results = {}
+        
+        for key, _, label in BULK_ANALYSES:
+            future = futures[key]
+            remaining = None
+            if call_timeout is not None:
+                remaining = max(0.0, submitted_at + call_timeout - time.monotonic())
+            
+            try:
+                results[key] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                logger.error(f"{label} timed out after {call_timeout}s")
+                results[key] = None
+            except APIError as e:
+                logger.error(f"{label} failed: {e}")
+                results[key] = None
+        
+        return results
+
+
+def bulk_analyze_users(supabase_url: str, jwt_tokens: List[str], max_concurrency: int = 16,
+                       call_timeout: Optional[float] = None, **client_kwargs) -> List[Dict]:
+    """
+    Run bulk_analyze for many users at once with a global concurrency cap
+    
+    Every user's calls share one thread pool, so at most max_concurrency
+    requests are in flight across all users. Time spent queued behind the
+    cap counts towards call_timeout.
+    
+    Args:
+        supabase_url: Base Supabase URL
+        jwt_tokens: One JWT per user to analyze
+        max_concurrency: Maximum number of requests in flight across all users;
+            also the size of the connection pool the clients share
+        call_timeout: Maximum seconds to wait for each analysis, measured from submission
+        **client_kwargs: Extra arguments for AdvancedBodyweightClient
+        
+    Returns:
+        One bulk_analyze result dict per token, in the same order
+    """
+    logger.info(f"🔄 Performing bulk analysis for {len(jwt_tokens)} users...")
+    
+    # One connection pool for every user's client, sized to the concurrency cap
+    session = requests.Session()
+    session.mount(supabase_url, HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency))
+    clients = [AdvancedBodyweightClient(supabase_url, token, session=session, **client_kwargs)
+               for token in jwt_tokens]
+    pool = ThreadPoolExecutor(max_workers=max_concurrency)
+    
+    try:
+        submitted_at = time.monotonic()
+        pending = [client._submit_bulk_analysis(pool) for client in clients]
+        results = [
+            AdvancedBodyweightClient._collect_bulk_analysis(futures, call_timeout, submitted_at)
+            for futures in pending
+        ]
+    finally:
+        # Don't block on calls that already timed out
+        pool.shutdown(wait=False, cancel_futures=True)
+        session.close()
+    
+    logger.info(f"📊 Bulk analysis completed for {len(jwt_tokens)} users")
+    return results
+
+
+def warm_user(supabase_url: str, jwt_token: str, biometric_data: Optional[BiometricData] = None,
+              call_timeout: Optional[float] = None,
+              **client_kwargs) -> Tuple[AdvancedBodyweightClient, PreparedSession]:
+    """
+    Create a client for a user and prepare their session in one go
+
+    The returned client's response cache already holds the biometrics and
+    ICA fetched by prefetch_session, so the screens that follow app open
+    are served without further round-trips.
+
+    Args:
+        supabase_url: Base Supabase URL
+        jwt_token: The user's JWT
+        biometric_data: Today's check-in, used if a routine must be generated
+        call_timeout: Maximum seconds to wait for the speculative reads
+        **client_kwargs: Extra arguments for AdvancedBodyweightClient
+
+    Returns:
+        (client, prepared session)
+    """
+    client = AdvancedBodyweightClient(supabase_url, jwt_token, **client_kwargs)
+    return client, client.prefetch_session(biometric_data=biometric_data, call_timeout=call_timeout)
@@ -0,0 +1,157 @@
+"""
+Bodyweight Training API - Request and Response Data
+Payload dataclasses shared by the sync and async clients
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from models import ExercisePerformanceColumns, FrozenExercisePerformance, RawJSON
+
+
+@dataclass
+class BiometricData:
+    """Biometric data structure"""
+    weight: Optional[float] = None
+    body_fat_percentage: Optional[float] = None
+    resting_hr: Optional[int] = None
+    training_hr_avg: Optional[int] = None
+    sleep_hours: Optional[float] = None
+    sleep_quality: Optional[int] = None
+    fatigue_level: Optional[int] = None
+    age: Optional[int] = None
+    last_updated: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary, excluding None values"""
+        return {k: v for k, v in self.__dict__.items() if v is not None}
+
+
+@dataclass
+class SessionFeedback:
+    """Session feedback structure"""
+    rpe_reported: int
+    completion_rate: float
+    technical_quality: int
+    enjoyment_level: Optional[int] = None
+    recovery_feeling: Optional[int] = None
+    actual_duration: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary, excluding None values"""
+        return {k: v for k, v in self.__dict__.items() if v is not None}
+
+
+@dataclass
+class ExercisePerformance:
+    """Exercise performance data structure"""
+    sessionExerciseId: str
+    exerciseId: str
+    setNumber: int
+    repsCompleted: int
+    rpeReported: Optional[int] = None
+    techniqueQuality: Optional[int] = None
+    restTimeActual: Optional[int] = None
+    difficultyPerceived: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary, excluding None values"""
+        return {k: v for k, v in self.__dict__.items() if v is not None}
+
+
+# Exercise performance rows accepted by save_session_feedback
+PerformanceRows = Union[List[ExercisePerformance], List[FrozenExercisePerformance], ExercisePerformanceColumns]
+
+
+def feedback_payload(session_id: str, feedback: SessionFeedback,
+                     exercise_performance: Optional[PerformanceRows] = None) -> Dict:
+    """
+    Request body of save-session-feedback
+
+    Columnar performance data stays columnar: it is serialized once with
+    ExercisePerformanceColumns.to_json() and carried as a RawJSON fragment,
+    which the clients' codecs splice into the body without re-encoding.
+    """
+    payload = {
+        "sessionId": session_id,
+        "feedback": feedback.to_dict()
+    }
+
+    if exercise_performance:
+        if isinstance(exercise_performance, ExercisePerformanceColumns):
+            payload["exercisePerformance"] = RawJSON(exercise_performance.to_json())
+        else:
+            payload["exercisePerformance"] = [ep.to_dict() for ep in exercise_performance]
+    return payload
+
+
+# Sections of a routine holding exercise blocks
+ROUTINE_SECTIONS = ('warm_up', 'exercise_blocks', 'cool_down')
+
+
+def routine_delta_payload(known_blocks: Iterable[str]) -> Dict:
+    """Request body of get-current-routine in delta mode"""
+    return {"delta": True, "known_blocks": sorted(known_blocks)}
+
+
+def _copy_block(block: Dict) -> Dict:
+    copied = dict(block)
+    if isinstance(copied.get('exercise'), dict):
+        copied['exercise'] = dict(copied['exercise'])
+    return copied
+
+
+def apply_routine_delta(routine: Optional[Dict],
+                        known_blocks: Dict[str, Dict]) -> Tuple[Optional[Dict], Dict[str, Dict]]:
+    """
+    Rebuild the full routine from a delta-mode get-current-routine response
+
+    Blocks the server sent as {"block_ref": tag} are taken from known_blocks
+    instead of being decoded again; blocks sent in full lose their
+    block_etag, and a routine without delta markers comes back as sent.
+    Returned blocks are copies (block and exercise dicts), so callers may
+    edit them without corrupting known_blocks.
+
+    Args:
+        routine: The response's routine (or None)
+        known_blocks: {block tag: block} from the previous call
+
+    Returns:
+        (routine, blocks), where blocks maps the tag of every block in the
+        routine to the block, for the next request
+
+    Raises:
+        KeyError: If the server referenced a block that is not in known_blocks
+    """
+    if not routine:
+        return routine, {}
+
+    blocks: Dict[str, Dict] = {}
+    rebuilt = dict(routine)
+    for section in ROUTINE_SECTIONS:
+        items = routine.get(section)
+        if not isinstance(items, list):
+            continue
+        section_blocks = []
+        for item in items:
+            tag = item.get('block_ref')
+            if tag is not None:
+                block = known_blocks[tag]
+            else:
+                tag = item.get('block_etag')
+                block = {key: value for key, value in item.items() if key != 'block_etag'}
+            if tag is not None:
+                blocks[tag] = block
+            section_blocks.append(_copy_block(block))
+        rebuilt[section] = section_blocks
+    return rebuilt, blocks
+
+
+@dataclass
+class PreparedSession:
+    """Everything the app needs on open, as returned by prefetch_session"""
+    routine: Dict
+    generated: bool
+    biometrics: Optional[BiometricData] = None
+    ica: Optional[Dict] = None
+    elapsed: float = 0.0
@@ -0,0 +1,158 @@
+"""
+Bodyweight Training API - Client Examples
+Complete workflow and analytics walkthroughs; run them with `python -m bodyweight_client`
+"""
+
+from .api import APIError
+from .client import AdvancedBodyweightClient, BodyweightTrainingClient
+from .data import BiometricData, ExercisePerformance, SessionFeedback
+
+
+def example_complete_workflow():
+    """Example of complete workout workflow"""
+    
+    # Initialize client (replace with your actual values)
+    client = BodyweightTrainingClient(
+        supabase_url="https://your-project.supabase.co",
+        jwt_token="your-jwt-token"
+    )
+    
+    try:
+        print("🚀 Starting complete workout workflow...\n")
+        
+        # Step 1: Check current routine
+        # (steps 1-3 one at a time; client.prefetch_session() overlaps them
+        # and returns a ready session in about one round-trip)
+        print("Step 1: Checking for active routine...")
+        current_routine = client.get_current_routine()
+        
+        if not current_routine:
+            print("No active routine found. Generating new one...\n")
+            
+            # Step 2: Get latest biometrics
+            print("Step 2: Getting latest biometric data...")
+            biometrics = client.get_latest_biometrics()
+            print(f"Current weight: {biometrics.weight}kg, Sleep: {biometrics.sleep_hours}h\n")
+            
+            # Step 3: Update biometrics and generate routine
+            print("Step 3: Generating routine with updated biometrics...")
+            updated_biometrics = BiometricData(
+                weight=biometrics.weight,
+                sleep_hours=7.5,      # Updated sleep
+                sleep_quality=4,      # Good sleep quality
+                fatigue_level=2       # Low fatigue
+            )
+            
+            routine_response = client.generate_routine(
+                days_to_generate=1,
+                biometric_data=updated_biometrics
+            )
+            
+            current_routine = routine_response['trainingPlan']['current_session']
+            print(f"Generated routine with {len(current_routine['exercise_blocks'])} exercises\n")
+        
+        # Step 4: Simulate workout completion
+        print("Step 4: Simulating workout completion...")
+        
+        session_feedback = SessionFeedback(
+            rpe_reported=7,
+            completion_rate=0.9,
+            technical_quality=4,
+            enjoyment_level=4,
+            recovery_feeling=3,
+            actual_duration=35
+        )
+        
+        # Create exercise performance data
+        exercise_performance = []
+        for i, block in enumerate(current_routine.get('exercise_blocks', [])[:2]):  # First 2 exercises
+            exercise_performance.append(ExercisePerformance(
+                sessionExerciseId=block.get('session_exercise_id', f'demo-{i}'),
+                exerciseId=block['exercise']['id'],
+                setNumber=1,
+                repsCompleted=int(block['reps'] * 0.9),  # Completed 90% of planned
+                rpeReported=7,
+                techniqueQuality=4,
+                restTimeActual=block.get('rest_seconds', 60) + 10
+            ))
+        
+        # Save feedback
+        feedback_result = client.save_session_feedback(
+            session_id=current_routine['id'],
+            feedback=session_feedback,
+            exercise_performance=exercise_performance
+        )
+        
+        print("✅ Workout completed and feedback saved!\n")
+        
+        # Step 5: Analyze progress
+        print("Step 5: Analyzing progress...")
+        ica_data = client.calculate_ica()
+        muscle_analysis = client.analyze_muscle_groups()
+        
+        print(f"Updated ICA score: {ica_data.get('ica_score', 'N/A')}")
+        print(f"Adherence rate: {(ica_data.get('adherence_rate', 0) * 100):.1f}%")
+        print(f"Muscle groups trained: {muscle_analysis['summary']['total_muscle_groups_trained']}")
+        
+        print("\n🎉 Complete workflow finished successfully!")
+        
+    except APIError as e:
+        print(f"❌ API Error: {e}")
+        if e.status_code == 401:
+            print("💡 Tip: Check your JWT token and make sure it's valid")
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+
+
+def example_analytics():
+    """Example of analytics and insights"""
+    
+    client = AdvancedBodyweightClient(
+        supabase_url="https://your-project.supabase.co",
+        jwt_token="your-jwt-token",
+        max_retries=3
+    )
+    
+    try:
+        print("📊 Performing comprehensive analytics...\n")
+        
+        # Bulk analysis with error handling
+        results = client.bulk_analyze()
+        
+        if results['ica']:
+            ica = results['ica']
+            print(f"🧠 ICA Score: {ica.get('ica_score', 'N/A')}/5.0")
+            print(f"📈 Adherence: {(ica.get('adherence_rate', 0) * 100):.1f}%")
+            print(f"😴 Recovery: {(ica.get('recovery_factor', 0) * 100):.1f}%")
+        
+        if results['muscle_groups']:
+            mg = results['muscle_groups']
+            balance_score = mg['summary']['overall_balance_score']
+            print(f"💪 Muscle Balance: {(balance_score * 100):.1f}%")
+            
+            # Show imbalances
+            imbalances = [
+                analysis for analysis in mg['muscle_group_analyses']
+                if analysis['imbalance_score'] > 20
+            ]
+            
+            if imbalances:
+                print("⚠️ Imbalances detected:")
+                for imbalance in imbalances[:3]:  # Show top 3
+                    print(f"   - {imbalance['muscle_group']}: {imbalance['imbalance_score']:.1f}%")
+        
+        if results['evolution']:
+            evo = results['evolution']
+            progress = evo['overall_progress']
+            print(f"🏆 Progress: {progress['classification']} ({(progress['score'] * 100):.0f}%)")
+            
+            # Show top recommendations
+            if progress['recommendations']:
+                print("💡 Top recommendations:")
+                for rec in progress['recommendations'][:2]:
+                    print(f"   - {rec}")
+        
+        print("\n✅ Analytics completed!")
+        
+    except APIError as e:
+        print(f"❌ Analytics failed: {e}")
@@ -0,0 +1,603 @@
+"""
+Bodyweight Training API - Bulk Tool
+Training history export, request log replay and load generation from the command line
+
+Usage:
+    python bulk.py export --url https://xyz.supabase.co --tokens tokens.txt --output history.ndjson
+    python bulk.py export --stub --users 200 --output history.parquet --include-performance
+    python bulk.py load --stub --concurrency 32 --duration 30 --record requests.ndjson
+    python bulk.py load --url https://staging.supabase.co --tokens tokens.txt --requests 5000 \\
+        --mix get-current-routine=4,calculate-ica=2,save-session-feedback=1 --rate 200
+    python bulk.py replay requests.ndjson --url https://staging.supabase.co --tokens tokens.txt --speed 2
+
+Every command runs against --url (one JWT per line in --tokens) or, with
+--stub, against a local stub server using synthetic tokens for --users
+athletes. export streams sessions to NDJSON (or Parquet when pyarrow is
+installed) as pages arrive, so memory stays bounded however many users are
+exported. load and replay report per-endpoint latency percentiles;
+--record writes every request sent to an NDJSON log that replay accepts.
+--trace writes the client's request-phase spans as OTLP/JSON and
+--profile samples every thread's stack into a flamegraph-ready file.
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from bodyweight_client import (
+    APIError,
+    BiometricData,
+    BodyweightTrainingClient,
+    MAX_HISTORY_PAGE_SIZE,
+    SessionFeedback,
+    logger,
+)
+from cache import user_id_from_jwt
+from codec import get_codec
+from instrumentation import Instrumentation, RequestRecorder
+from profiler import SamplingProfiler
+from ratelimit import TokenBucket
+from stub_server import EndpointBehavior, StubProcess, synthetic_token
+from tracing import OTLPFileExporter, Tracer
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+# Columns of a Parquet export: the training_sessions fields selected by the
+# get-training-history edge function, with the nested session_exercises
+# (and their exercise_performance) kept as a JSON string
+EXPORT_COLUMNS = (
+    ('user_id', 'string'),
+    ('id', 'string'),
+    ('session_date', 'string'),
+    ('status', 'string'),
+    ('planned_duration', 'int64'),
+    ('actual_duration', 'int64'),
+    ('intensity_target', 'float64'),
+    ('ica_score', 'float64'),
+    ('notes', 'string'),
+    ('created_at', 'string'),
+    ('updated_at', 'string'),
+    ('session_exercises', 'string'),
+)
+
+
+def _synthetic_biometrics(rng: random.Random) -> BiometricData:
+    return BiometricData(sleep_hours=round(rng.uniform(5.5, 9.0), 1), sleep_quality=rng.randint(4, 9),
+                         fatigue_level=rng.randint(2, 7), resting_hr=rng.randint(50, 70))
+
+
+def _synthetic_feedback(rng: random.Random) -> SessionFeedback:
+    return SessionFeedback(rpe_reported=rng.randint(5, 9), completion_rate=round(rng.uniform(0.7, 1.0), 2),
+                           technical_quality=rng.randint(3, 5), actual_duration=rng.randint(25, 50))
+
+
+# Load generator operations: endpoint name -> call(client, rng)
+LOAD_OPERATIONS: Dict[str, Callable[[BodyweightTrainingClient, random.Random], Any]] = {
+    'get-current-routine': lambda client, rng: client.get_current_routine(),
+    'get-latest-biometrics': lambda client, rng: client.get_latest_biometrics(),
+    'calculate-ica': lambda client, rng: client.calculate_ica(),
+    'get-training-history': lambda client, rng: client.get_training_history(limit=20),
+    'analyze-muscle-groups': lambda client, rng: client.analyze_muscle_groups(),
+    'analyze-evolution': lambda client, rng: client.analyze_evolution(),
+    'generate-routine': lambda client, rng: client.generate_routine(1, _synthetic_biometrics(rng)),
+    'save-session-feedback': lambda client, rng: client.save_session_feedback(str(uuid4()), _synthetic_feedback(rng)),
+    'update-biometrics': lambda client, rng: client.update_biometrics(_synthetic_biometrics(rng)),
+}
+
+# Roughly an app's traffic: mostly reads on open, one write per finished session
+DEFAULT_MIX = {
+    'get-current-routine': 4,
+    'get-latest-biometrics': 2,
+    'calculate-ica': 2,
+    'get-training-history': 2,
+    'analyze-muscle-groups': 1,
+    'analyze-evolution': 1,
+    'generate-routine': 1,
+    'save-session-feedback': 1,
+    'update-biometrics': 1,
+}
+
+
+@dataclass
+class ExportReport:
+    users: int = 0
+    sessions: int = 0
+    duration_s: float = 0.0
+    failed_users: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class RunReport:
+    """
+    Outcome of a load or replay run
+
+    operations counts client calls; requests counts HTTP requests, which is
+    lower when concurrent identical reads were coalesced. endpoints holds
+    the Instrumentation.snapshot() entries.
+    """
+    operations: int
+    requests: int
+    failures: int
+    duration_s: float
+    throughput: float
+    endpoints: Dict[str, Dict[str, Any]]
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+
+def read_tokens(path: str) -> List[str]:
+    """JWTs from a file with one token per line; blank lines and # comments are skipped"""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def make_clients(url: str, tokens: Iterable[str], pool_size: int = 10, timeout: int = 30,
+                 instrumentation: Optional[Instrumentation] = None,
+                 tracer: Optional[Tracer] = None) -> List[BodyweightTrainingClient]:
+    """
+    One client per token, all sharing a single connection pool
+
+    Args:
+        url: Supabase project (or stub) URL
+        tokens: JWT per simulated or exported user
+        pool_size: Connections kept open to the host; match the concurrency
+        timeout: Request timeout in seconds
+        instrumentation: Optional metrics and hooks shared by every client
+        tracer: Optional tracer shared by every client
+    """
+    session = requests.Session()
+    session.mount(url, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    return [BodyweightTrainingClient(url, token, timeout=timeout, instrumentation=instrumentation, session=session,
+                                     tracer=tracer)
+            for token in tokens]
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+class NDJSONHistoryWriter:
+    """Writes one session per line with its user_id added; '-' writes to stdout"""
+
+    def __init__(self, path: str):
+        self._codec = get_codec()
+        self._file = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        self._owned = path != '-'
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        self._file.write(b''.join(self._codec.dumps(row) + b'\n' for row in rows))
+
+    def close(self) -> None:
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetHistoryWriter:
+    """Writes sessions to a Parquet file with the EXPORT_COLUMNS schema, in row groups of `row_group_size`"""
+
+    def __init__(self, path: str, row_group_size: int = 50000):
+        if pyarrow is None:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow); use an .ndjson output instead")
+        # Explicit schema: inferring it per row group would type an all-null column as null
+        self._schema = pyarrow.schema([(name, getattr(pyarrow, kind)()) for name, kind in EXPORT_COLUMNS])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+        self._row_group_size = row_group_size
+        self._buffer: List[Dict] = []
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        for row in rows:
+            exercises = row.get('session_exercises')
+            self._buffer.append({**row, 'session_exercises': json.dumps(exercises) if exercises is not None else None})
+        if len(self._buffer) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._writer.write_table(pyarrow.Table.from_pylist(self._buffer, schema=self._schema))
+            self._buffer = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_history_writer(path: str):
+    """NDJSON or Parquet writer, chosen by file extension"""
+    if path.endswith('.parquet'):
+        return ParquetHistoryWriter(path)
+    return NDJSONHistoryWriter(path)
+
+
+def export_history(clients: List[BodyweightTrainingClient], writer, workers: int = 4,
+                   page_size: int = MAX_HISTORY_PAGE_SIZE, **filters) -> ExportReport:
+    """
+    Stream every client's training history into a writer
+
+    Users are exported concurrently; each page is written as soon as it
+    arrives, so at most a couple of pages per worker are held in memory.
+    A user whose export fails is recorded in the report (rows already
+    written for that user stay in the output) and the others continue.
+
+    Args:
+        clients: One client per user to export
+        writer: NDJSONHistoryWriter, ParquetHistoryWriter or anything with write_rows(rows)
+        workers: Users exported at the same time
+        page_size: Sessions per get-training-history request
+        **filters: status, start_date, end_date, include_exercises and
+            include_performance, as for get_training_history
+
+    Returns:
+        ExportReport with user, session and failure counts
+    """
+    report = ExportReport()
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def export_user(client: BodyweightTrainingClient) -> None:
+        # The operator supplied the tokens, so their sub claim is a fair row label
+        user_id = user_id_from_jwt(client.jwt_token)
+        rows = []
+        try:
+            for session in client.iter_training_history(page_size=page_size, **filters):
+                rows.append({'user_id': user_id, **session})
+                if len(rows) >= page_size:
+                    with lock:
+                        writer.write_rows(rows)
+                        report.sessions += len(rows)
+                    rows = []
+        except APIError as e:
+            with lock:
+                report.failed_users[user_id] = e.message
+            logger.warning(f"❌ Export failed for user {user_id}: {e.message}")
+        with lock:
+            if rows:
+                writer.write_rows(rows)
+                report.sessions += len(rows)
+            report.users += 1
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # list() re-raises anything unexpected from the workers
+        list(executor.map(export_user, clients))
+
+    report.duration_s = time.perf_counter() - started
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Load generation and replay
+# ---------------------------------------------------------------------------
+
+def _run_report(instrumentation: Instrumentation, operations: int, failures: int, duration: float) -> RunReport:
+    endpoints = instrumentation.snapshot()
+    total = sum(metrics['requests'] for metrics in endpoints.values())
+    return RunReport(operations=operations, requests=total, failures=failures, duration_s=duration,
+                     throughput=total / duration if duration else 0.0, endpoints=endpoints)
+
+
+def run_load(clients: List[BodyweightTrainingClient], instrumentation: Instrumentation,
+             mix: Optional[Dict[str, float]] = None, concurrency: int = 8, duration: Optional[float] = 30.0,
+             total_requests: Optional[int] = None, rate: Optional[float] = None, seed: Optional[int] = None) -> RunReport:
+    """
+    Closed-loop load generator
+
+    Each of `concurrency` workers repeatedly picks an operation from the
+    weighted mix and a client (user) at random, until `duration` seconds
+    have passed or `total_requests` operations have been started. With
+    `rate`, operations are additionally capped at that many per second
+    across all workers.
+
+    Args:
+        clients: Clients to spread the load over; they must share `instrumentation`
+        instrumentation: Metrics the report is built from
+        mix: {LOAD_OPERATIONS name: weight} (defaults to DEFAULT_MIX)
+        concurrency: Worker threads, i.e. requests in flight
+        duration: Seconds to run (None runs until total_requests)
+        total_requests: Operations to run (None runs for duration)
+        rate: Optional operations per second limit
+        seed: Seed for operation and user selection
+
+    Returns:
+        RunReport with per-endpoint latency percentiles
+    """
+    mix = mix or DEFAULT_MIX
+    unknown = set(mix) - set(LOAD_OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations {sorted(unknown)} (available: {', '.join(LOAD_OPERATIONS)})")
+    if duration is None and total_requests is None:
+        raise ValueError("Give a duration, a request count or both")
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    bucket = TokenBucket(rate, max(1.0, min(rate, concurrency))) if rate else None
+    deadline = time.monotonic() + duration if duration is not None else None
+    remaining = [total_requests]
+    counts = {'operations': 0, 'failures': 0}
+    lock = threading.Lock()
+
+    def claim() -> bool:
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        with lock:
+            if remaining[0] is not None:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+            counts['operations'] += 1
+            return True
+
+    def worker(index: int) -> None:
+        rng = random.Random(None if seed is None else seed + index)
+        while claim():
+            if bucket is not None:
+                bucket.acquire()
+            name = rng.choices(names, weights)[0]
+            try:
+                LOAD_OPERATIONS[name](rng.choice(clients), rng)
+            except APIError:
+                with lock:
+                    counts['failures'] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    return _run_report(instrumentation, counts['operations'], counts['failures'], time.perf_counter() - started)
+
+
+def read_request_log(path: str) -> Iterator[Dict[str, Any]]:
+    """Entries of an NDJSON request log written by instrumentation.RequestRecorder"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay_requests(entries: Iterable[Dict[str, Any]], clients: List[BodyweightTrainingClient],
+                    instrumentation: Instrumentation, concurrency: int = 8, speed: float = 1.0) -> RunReport:
+    """
+    Send recorded requests again, preserving their relative timing
+
+    Entries are dispatched in log order, each `(ts - first ts) / speed`
+    seconds after the start (speed 0 sends them as fast as the workers
+    allow), and assigned to the clients round-robin. Requests are sent with
+    coalesce=False, bypassing single-flight and response caches, so every
+    recorded request is sent. At most
+    2 * concurrency requests are queued, so a slow target delays the
+    schedule instead of growing memory.
+
+    Args:
+        entries: Log entries with ts, method, endpoint and payload
+        clients: Clients (users) to send as; they must share `instrumentation`
+        instrumentation: Metrics the report is built from
+        concurrency: Requests in flight
+        speed: Time compression factor (2 replays twice as fast)
+
+    Returns:
+        RunReport with per-endpoint latency percentiles
+    """
+    slots = threading.BoundedSemaphore(concurrency * 2)
+    failures = [0]
+    lock = threading.Lock()
+
+    def send(client: BodyweightTrainingClient, entry: Dict[str, Any]) -> None:
+        try:
+            client.send(entry['endpoint'], entry.get('payload'), method=entry.get('method', 'POST'), coalesce=False)
+        except APIError:
+            with lock:
+                failures[0] += 1
+        finally:
+            slots.release()
+
+    started = time.perf_counter()
+    first_ts = None
+    index = -1
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index, entry in enumerate(entries):
+            if first_ts is None:
+                first_ts = entry['ts']
+            if speed > 0:
+                delay = (entry['ts'] - first_ts) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            slots.acquire()
+            executor.submit(send, clients[index % len(clients)], entry)
+    return _run_report(instrumentation, index + 1, failures[0], time.perf_counter() - started)
+
+
+def print_run_report(report: RunReport) -> None:
+    header = f"{'endpoint':26s} {'requests':>9s} {'errors':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, metrics in sorted(report.endpoints.items()):
+        latency = metrics['latency']
+        print(f"{endpoint:26s} {metrics['requests']:9d} {metrics['errors']:7d} {latency['p50'] * 1000:8.1f} "
+              f"{latency['p95'] * 1000:8.1f} {latency['p99'] * 1000:8.1f}")
+    print(f"\n{report.operations} operations ({report.failures} failed), {report.requests} HTTP requests "
+          f"in {report.duration_s:.1f}s, {report.throughput:.1f} req/s")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in LOAD_OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation '{name}' (choose from {', '.join(LOAD_OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+@contextlib.contextmanager
+def _target(args: argparse.Namespace) -> Iterator[Tuple[str, List[str]]]:
+    """(url, tokens) for the command: the given project or a local stub server"""
+    if args.tokens:
+        tokens = read_tokens(args.tokens)
+    elif args.stub:
+        tokens = [synthetic_token(i) for i in range(args.users)]
+    else:
+        raise SystemExit("--tokens is required unless --stub is given")
+    if not tokens:
+        raise SystemExit(f"No tokens in {args.tokens}")
+
+    if not args.stub:
+        yield args.url, tokens
+        return
+    behavior = EndpointBehavior(latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate)
+    with StubProcess(default=behavior, history_size=args.history_size, seed=args.seed) as stub:
+        print(f"🧪 Stub server on {stub.url}", file=sys.stderr)
+        yield stub.url, tokens
+
+
+def _add_target_arguments(parser: argparse.ArgumentParser) -> None:
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Supabase project URL, e.g. https://xyz.supabase.co")
+    target.add_argument("--stub", action="store_true", help="Start a local stub server instead")
+    parser.add_argument("--tokens", help="File with one JWT per line (optional with --stub)")
+    parser.add_argument("--users", type=int, default=10, help="Synthetic users when --stub is given without --tokens")
+    parser.add_argument("--timeout", type=int, default=30, help="Request timeout in seconds")
+    parser.add_argument("--record", help="Append every request sent to this NDJSON log")
+    parser.add_argument("--json", dest="json_path", help="Write the report to this file")
+    diagnostics = parser.add_argument_group("diagnostics")
+    diagnostics.add_argument("--trace", help="Append request-phase spans to this file as OTLP/JSON lines")
+    diagnostics.add_argument("--trace-sample-rate", type=float, default=1.0, help="Fraction of requests traced")
+    diagnostics.add_argument("--profile", help="Sample thread stacks and write them to this file (folded format)")
+    diagnostics.add_argument("--profile-interval", type=float, default=5.0, help="Milliseconds between samples")
+    stub = parser.add_argument_group("stub server")
+    stub.add_argument("--latency", type=float, default=5.0, help="Stub base latency in ms")
+    stub.add_argument("--jitter", type=float, default=5.0, help="Stub latency jitter in ms")
+    stub.add_argument("--error-rate", type=float, default=0.0, help="Probability of an injected 503")
+    stub.add_argument("--history-size", type=int, default=250, help="Sessions per user in the stub's history")
+    stub.add_argument("--seed", type=int, help="Seed for the stub and the load generator")
+
+
+def _write_profile(profiler: SamplingProfiler, path: str) -> None:
+    profiler.write_folded(path)
+    profiler.print_top(file=sys.stderr)
+    print(f"🔬 Profile written to {path}", file=sys.stderr)
+
+
+def _write_json(path: Optional[str], report: Any) -> None:
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(asdict(report), f, indent=2)
+        print(f"💾 Report written to {path}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk export, request replay and load generation")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log client activity")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export training history of many users")
+    _add_target_arguments(export)
+    export.add_argument("--output", required=True, help="Output file (.ndjson or .parquet; - for stdout)")
+    export.add_argument("--workers", type=int, default=4, help="Users exported concurrently")
+    export.add_argument("--page-size", type=int, default=MAX_HISTORY_PAGE_SIZE, help="Sessions per request")
+    export.add_argument("--status", default="all", help="Session status filter")
+    export.add_argument("--start-date", help="Only sessions on or after this date (YYYY-MM-DD)")
+    export.add_argument("--end-date", help="Only sessions on or before this date (YYYY-MM-DD)")
+    export.add_argument("--include-performance", action="store_true", help="Include per-set performance")
+
+    load = commands.add_parser("load", help="Generate load with a weighted request mix")
+    _add_target_arguments(load)
+    load.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    load.add_argument("--duration", type=float, help="Seconds to run (default 30 unless --requests is given)")
+    load.add_argument("--requests", type=int, help="Operations to run")
+    load.add_argument("--rate", type=float, help="Operations per second limit")
+    load.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                      help="Weighted operations, e.g. get-current-routine=4,calculate-ica=1 (default: app-like mix)")
+
+    replay = commands.add_parser("replay", help="Replay a recorded request log")
+    replay.add_argument("log", help="NDJSON request log (see --record)")
+    _add_target_arguments(replay)
+    replay.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    replay.add_argument("--speed", type=float, default=1.0, help="Time compression (0 = as fast as possible)")
+
+    args = parser.parse_args(argv)
+    if args.command == "export" and args.output.endswith('.parquet') and pyarrow is None:
+        parser.error("Parquet output needs pyarrow (pip install pyarrow); use an .ndjson output instead")
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(message)s")
+
+    instrumentation = Instrumentation()
+    tracer = None
+    with contextlib.ExitStack() as stack:
+        if args.record:
+            instrumentation.add_pre_request_hook(stack.enter_context(RequestRecorder(args.record)))
+        if args.trace:
+            tracer = Tracer(OTLPFileExporter(args.trace), service_name='bodyweight-bulk',
+                            sample_rate=args.trace_sample_rate)
+            stack.callback(tracer.shutdown)
+        url, tokens = stack.enter_context(_target(args))
+        if args.profile:
+            profiler = SamplingProfiler(interval=args.profile_interval / 1000)
+            stack.callback(_write_profile, profiler, args.profile)
+            stack.enter_context(profiler)
+        pool_size = getattr(args, 'concurrency', None) or getattr(args, 'workers', 4)
+        clients = make_clients(url, tokens, pool_size * 2, args.timeout, instrumentation, tracer)
+
+        if args.command == "export":
+            filters = {'status': args.status, 'include_performance': args.include_performance}
+            if args.start_date:
+                filters['start_date'] = args.start_date
+            if args.end_date:
+                filters['end_date'] = args.end_date
+            print(f"📦 Exporting training history of {len(clients)} users to {args.output}", file=sys.stderr)
+            with open_history_writer(args.output) as writer:
+                report = export_history(clients, writer, args.workers, args.page_size, **filters)
+            print(f"✅ Exported {report.sessions} sessions of {report.users} users in {report.duration_s:.1f}s "
+                  f"({len(report.failed_users)} failed)", file=sys.stderr)
+            _write_json(args.json_path, report)
+            return 1 if report.failed_users else 0
+
+        if args.command == "load":
+            duration = args.duration if args.duration is not None or args.requests else 30.0
+            print(f"🏁 Load: {args.concurrency} workers over {len(clients)} users", file=sys.stderr)
+            report = run_load(clients, instrumentation, args.mix, args.concurrency, duration,
+                              args.requests, args.rate, args.seed)
+        else:
+            print(f"🔁 Replaying {args.log} at {args.speed}x over {len(clients)} users", file=sys.stderr)
+            report = replay_requests(read_request_log(args.log), clients, instrumentation,
+                                     args.concurrency, args.speed)
+
+        print_run_report(report)
+        _write_json(args.json_path, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""
+Bodyweight Training API - Response Cache
+TTL/LRU response cache with per-endpoint policies and write invalidation
+"""
+
+import base64
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+# Seconds each read endpoint's response stays fresh. get-training-history is
+# deliberately absent so paging through long histories does not fill the cache.
+DEFAULT_TTLS: Dict[str, float] = {
+    "/get-current-routine": 30,
+    "/get-latest-biometrics": 60,
+    "/calculate-ica": 300,
+    "/analyze-muscle-groups": 300,
+    "/analyze-evolution": 300,
+}
+
+# Read endpoints whose cached responses become stale when a write endpoint runs
+DEFAULT_INVALIDATIONS: Dict[str, Tuple[str, ...]] = {
+    "/generate-routine": (
+        "/get-current-routine", "/get-training-history",
+    ),
+    "/save-session-feedback": (
+        "/get-current-routine", "/get-training-history", "/calculate-ica",
+        "/analyze-muscle-groups", "/analyze-evolution",
+    ),
+    "/update-progressions": (
+        "/get-current-routine", "/calculate-ica", "/analyze-evolution",
+    ),
+    "/update-biometrics": (
+        "/get-latest-biometrics", "/calculate-ica", "/analyze-evolution",
+    ),
+    "/complete-onboarding": tuple(DEFAULT_TTLS),
+}
+
+
+class CacheStats:
+    """Hit/miss/eviction counters for a cache backend"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class MemoryCache:
+    """
+    In-process TTL cache with an LRU size bound
+
+    Thread-safe. Values are deep-copied in and out so callers can mutate
+    responses without corrupting cached entries.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Args:
+            max_entries: Maximum number of entries before least recently used ones are evicted
+        """
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Return a fresh cached value or None
+
+        Args:
+            key: Cache key
+            max_age: Optional stricter freshness bound in seconds
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            value, stored_at, expires_at = entry
+            if now >= expires_at or (max_age is not None and now - stored_at >= max_age):
+                del self._entries[key]
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (value, now, now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteCache:
+    """
+    On-disk TTL cache with an LRU size bound, backed by sqlite
+
+    Entries survive process restarts. Values are stored as JSON.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        """
+        Args:
+            path: sqlite database file path
+            max_entries: Maximum number of entries before least recently used ones are evicted
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS response_cache_last_access ON response_cache (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Return a fresh cached value or None
+
+        Args:
+            key: Cache key
+            max_age: Optional stricter freshness bound in seconds
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+            value, stored_at, expires_at = row
+            if now >= expires_at or (max_age is not None and now - stored_at >= max_age):
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats.misses += 1
+                return None
+
+            self._conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        encoded = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, stored_at, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, now, now + ttl, now),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM response_cache WHERE key IN"
+                    " (SELECT key FROM response_cache ORDER BY last_access LIMIT ?)",
+                    (overflow,),
+                )
+                self.stats.evictions += overflow
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def jwt_claims(jwt_token: str) -> Dict[str, Any]:
+    """Unverified claims of a JWT ({} if it cannot be decoded)"""
+    try:
+        payload = jwt_token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except (IndexError, ValueError, AttributeError):
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+
+def user_id_from_jwt(jwt_token: str) -> str:
+    """
+    The token's `sub` claim, unverified, for labels such as export rows
+
+    Anyone can mint a token with another user's `sub` (the signature is not
+    checked here), so never key shared state on it; use token_fingerprint
+    or a user id the auth server verified instead. Falls back to the
+    token's fingerprint when there is no `sub`.
+    """
+    subject = jwt_claims(jwt_token).get('sub')
+    if subject:
+        return str(subject)
+    return token_fingerprint(jwt_token)
+
+
+def token_fingerprint(jwt_token: str) -> str:
+    """Hash of the whole token, a namespace only the token's holder can reach"""
+    return hashlib.sha256(jwt_token.encode()).hexdigest()[:32]
+
+
+class ResponseCache:
+    """
+    Response cache applying per-endpoint TTLs and write invalidation
+
+    Keys are namespaced as `<user>|<endpoint>|<payload hash>`, so every
+    cached response belongs to exactly one user and request payload. The
+    user part is the client's user_id: a fingerprint of its token unless
+    the client was given a user id. Share a cache between clients only if
+    those ids were verified (e.g. by the server that issued the tokens);
+    an id taken from an unverified token claim would let a forged token
+    read another user's cached responses.
+    """
+
+    def __init__(self, backend: Any = None, ttls: Optional[Dict[str, float]] = None,
+                 invalidations: Optional[Dict[str, Tuple[str, ...]]] = None):
+        """
+        Args:
+            backend: MemoryCache (default) or SqliteCache instance
+            ttls: Per-endpoint TTLs in seconds; endpoints not listed are never cached
+            invalidations: Read endpoints to invalidate when each write endpoint runs
+        """
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.invalidations = dict(DEFAULT_INVALIDATIONS if invalidations is None else invalidations)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.backend.stats
+
+    def is_cacheable(self, endpoint: str) -> bool:
+        return self.ttls.get(endpoint, 0) > 0
+
+    @staticmethod
+    def make_key(user_id: str, endpoint: str, payload: Optional[Dict] = None) -> str:
+        """Build the cache key for a user, endpoint and request payload"""
+        body = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        digest = hashlib.sha256(body.encode()).hexdigest()[:16]
+        return f"{user_id}|{endpoint}|{digest}"
+
+    def get(self, user_id: str, endpoint: str, payload: Optional[Dict] = None,
+            max_age: Optional[float] = None) -> Optional[Any]:
+        return self.backend.get(self.make_key(user_id, endpoint, payload), max_age)
+
+    def set(self, user_id: str, endpoint: str, payload: Optional[Dict], value: Any) -> None:
+        self.backend.set(self.make_key(user_id, endpoint, payload), value, self.ttls[endpoint])
+
+    def delete(self, user_id: str, endpoint: str, payload: Optional[Dict] = None) -> None:
+        self.backend.delete(self.make_key(user_id, endpoint, payload))
+
+    def invalidate_endpoint(self, user_id: str, endpoint: str) -> None:
+        """Drop every cached payload variant of one endpoint for a user"""
+        self.backend.delete_prefix(f"{user_id}|{endpoint}|")
+
+    def invalidate_for_write(self, user_id: str, endpoint: str) -> None:
+        """Drop the user's cached reads that a write endpoint makes stale"""
+        for read_endpoint in self.invalidations.get(endpoint, ()):
+            self.invalidate_endpoint(user_id, read_endpoint)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+class ValidatorCache:
+    """
+    Last ETag and response body per user and endpoint, for conditional requests
+
+    Clients send the stored ETag as If-None-Match and reuse the stored body
+    when the server answers 304 Not Modified. Entries never expire (the
+    server decides whether they are current) and are only bounded by LRU
+    eviction. There is one entry per user and endpoint: the conditional
+    endpoints are parameterless reads.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.backend = MemoryCache(max_entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.backend.stats
+
+    def get(self, user_id: str, endpoint: str) -> Optional[Tuple[str, Any]]:
+        """(etag, body) last received for the user and endpoint, or None"""
+        return self.backend.get(f"{user_id}|{endpoint}")
+
+    def set(self, user_id: str, endpoint: str, etag: str, body: Any) -> None:
+        self.backend.set(f"{user_id}|{endpoint}", (etag, body), float('inf'))
+
+    def invalidate_user(self, user_id: str) -> None:
+        self.backend.delete_prefix(f"{user_id}|")
+
+    def clear(self) -> None:
+        self.backend.clear()
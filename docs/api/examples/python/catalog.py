@@ -0,0 +1,301 @@
+"""
+Bodyweight Training API - Local Exercise Catalog
+Indexed snapshot of the exercises table and its alternatives graph, synced incrementally
+
+Routine blocks only carry the exercise columns the edge function selected,
+and finding a substitute means another query against the exercises table.
+An ExerciseCatalog keeps the whole table locally with O(1) indexes by id,
+category and muscle group, a difficulty ordering per category, and the
+alternative_for graph from migration 008, so routines can be rendered and
+substitutions chosen without round trips:
+
+    catalog = ExerciseCatalog.load('exercises.json')
+    catalog.sync(RestCatalogSource(client, SUPABASE_ANON_KEY))   # only rows changed since the snapshot
+    catalog.save('exercises.json')
+
+    for block, exercise in catalog.session_exercises(routine):
+        ...
+    easier = catalog.find_alternative(exercise_id, reason='equipment')
+"""
+
+import bisect
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Set, Tuple
+
+import requests
+
+from bodyweight_client import APIError, BodyweightTrainingClient, logger
+
+# Session sections holding exercise blocks, in display order
+SESSION_SECTIONS = ('warm_up', 'exercise_blocks', 'cool_down')
+
+ALTERNATIVE_REASONS = ('difficulty', 'equipment', 'mobility', 'injury')
+
+
+class CatalogSource(Protocol):
+    """Provider of exercises rows changed since a catalog version"""
+
+    def changed_since(self, version: Optional[str]) -> Iterable[Dict[str, Any]]:
+        ...
+
+
+class RestCatalogSource:
+    """
+    Reads the exercises table through the Supabase REST API (PostgREST)
+
+    Exercises are readable by every authenticated user, so the user's JWT
+    and the project's anon key are enough. Rows are requested in updated_at
+    order starting at the catalog version (inclusive, so rows sharing the
+    last timestamp are not missed) and paged with limit/offset.
+    """
+
+    def __init__(self, client: BodyweightTrainingClient, anon_key: str, page_size: int = 500):
+        """
+        Args:
+            client: Client whose session, base URL and JWT are reused
+            anon_key: Supabase project anon (public) key, sent as the apikey header
+            page_size: Rows per request
+        """
+        self.client = client
+        self.anon_key = anon_key
+        self.page_size = page_size
+        self.url = f"{client.base_url.rsplit('/functions/v1', 1)[0]}/rest/v1/exercises"
+
+    def changed_since(self, version: Optional[str]) -> Iterator[Dict[str, Any]]:
+        params = {'select': '*', 'order': 'updated_at.asc,id.asc', 'limit': str(self.page_size)}
+        if version:
+            params['updated_at'] = f"gte.{version}"
+
+        offset = 0
+        while True:
+            rows = self._fetch(dict(params, offset=str(offset)))
+            yield from rows
+            if len(rows) < self.page_size:
+                return
+            offset += len(rows)
+
+    def _fetch(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        headers = {'apikey': self.anon_key, 'Accept': 'application/json', **self.client._auth_headers()}
+        try:
+            response = self.client.session.get(self.url, params=params, headers=headers,
+                                               timeout=self.client.timeout)
+        except requests.exceptions.RequestException as e:
+            raise APIError(f"Exercise catalog request failed: {e}")
+        if not response.ok:
+            raise APIError(f"Exercise catalog request failed: HTTP {response.status_code}",
+                           response.status_code)
+        return response.json()
+
+
+def _difficulty(exercise: Dict[str, Any]) -> float:
+    return float(exercise.get('difficulty_level') or 0)
+
+
+class ExerciseCatalog:
+    """
+    In-memory exercises table with lookup indexes
+
+    Every index is maintained on upsert, so lookups by id, category or
+    muscle group are dictionary reads. The catalog version is the newest
+    updated_at seen; sync() fetches only rows changed since then. Deleted
+    exercises are not visible to an incremental sync (the table has no
+    tombstones); use sync(full=True) to rebuild from scratch.
+    """
+
+    def __init__(self, exercises: Iterable[Dict[str, Any]] = (), version: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._clear(version)
+        self.upsert(exercises)
+
+    def _clear(self, version: Optional[str] = None) -> None:
+        self.version = version
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_muscle_group: Dict[str, Set[str]] = {}
+        self._alternatives: Dict[str, Set[str]] = {}
+        # Per category, (difficulty, id) pairs kept sorted for range queries
+        self._difficulty_order: Dict[str, List[Tuple[float, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, exercise_id: str) -> bool:
+        return exercise_id in self._by_id
+
+    def get(self, exercise_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(exercise_id)
+
+    def __getitem__(self, exercise_id: str) -> Dict[str, Any]:
+        return self._by_id[exercise_id]
+
+    # -- maintenance --------------------------------------------------------
+
+    def upsert(self, exercises: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace exercises rows; returns how many were applied"""
+        count = 0
+        with self._lock:
+            for exercise in exercises:
+                self._remove(exercise['id'])
+                self._add(exercise)
+                updated_at = exercise.get('updated_at')
+                if updated_at and (self.version is None or updated_at > self.version):
+                    self.version = updated_at
+                count += 1
+        return count
+
+    def _add(self, exercise: Dict[str, Any]) -> None:
+        exercise_id = exercise['id']
+        self._by_id[exercise_id] = exercise
+        category = exercise.get('category')
+        bisect.insort(self._difficulty_order.setdefault(category, []), (_difficulty(exercise), exercise_id))
+        for group in exercise.get('muscle_groups') or []:
+            self._by_muscle_group.setdefault(group, set()).add(exercise_id)
+        if exercise.get('is_alternative') and exercise.get('alternative_for'):
+            self._alternatives.setdefault(exercise['alternative_for'], set()).add(exercise_id)
+
+    def _remove(self, exercise_id: str) -> None:
+        exercise = self._by_id.pop(exercise_id, None)
+        if exercise is None:
+            return
+        category = exercise.get('category')
+        order = self._difficulty_order[category]
+        index = bisect.bisect_left(order, (_difficulty(exercise), exercise_id))
+        del order[index]
+        for group in exercise.get('muscle_groups') or []:
+            self._by_muscle_group[group].discard(exercise_id)
+        if exercise.get('is_alternative') and exercise.get('alternative_for'):
+            self._alternatives[exercise['alternative_for']].discard(exercise_id)
+
+    def sync(self, source: CatalogSource, full: bool = False) -> int:
+        """
+        Apply rows changed since the catalog version
+
+        Args:
+            source: Catalog source, e.g. RestCatalogSource
+            full: Refetch everything and drop exercises no longer returned
+
+        Returns:
+            Number of rows applied
+        """
+        if not full:
+            applied = self.upsert(source.changed_since(self.version))
+            logger.info(f"📚 Exercise catalog synced: {applied} changed rows (version {self.version})")
+            return applied
+
+        rows = list(source.changed_since(None))
+        with self._lock:
+            self._clear()
+        applied = self.upsert(rows)
+        logger.info(f"📚 Exercise catalog rebuilt with {applied} exercises (version {self.version})")
+        return applied
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Write the snapshot atomically as JSON"""
+        with self._lock:
+            snapshot = {'version': self.version, 'exercises': list(self._by_id.values())}
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ExerciseCatalog':
+        """Load a snapshot written by save(); a missing file gives an empty catalog"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+        return cls(snapshot['exercises'], snapshot.get('version'))
+
+    # -- lookups ------------------------------------------------------------
+
+    def _sorted(self, ids: Iterable[str]) -> List[Dict[str, Any]]:
+        return sorted((self._by_id[i] for i in ids), key=lambda e: (_difficulty(e), e['id']))
+
+    def by_category(self, category: str) -> List[Dict[str, Any]]:
+        """Exercises of a category, easiest first"""
+        return [self._by_id[i] for _, i in self._difficulty_order.get(category, [])]
+
+    def by_muscle_group(self, muscle_group: str) -> List[Dict[str, Any]]:
+        """Exercises training a muscle group, easiest first"""
+        return self._sorted(self._by_muscle_group.get(muscle_group, ()))
+
+    def in_difficulty_range(self, category: str, low: float = 0, high: float = float('inf')) -> List[Dict[str, Any]]:
+        """Exercises of a category with low <= difficulty_level < high, easiest first"""
+        order = self._difficulty_order.get(category, [])
+        start = bisect.bisect_left(order, (low, ''))
+        end = bisect.bisect_left(order, (high, ''))
+        return [self._by_id[i] for _, i in order[start:end]]
+
+    def alternatives_for(self, exercise_id: str) -> List[Dict[str, Any]]:
+        """Exercises registered as alternatives of exercise_id (is_alternative), easiest first"""
+        return self._sorted(self._alternatives.get(exercise_id, ()))
+
+    def find_alternative(self, exercise_id: str, reason: str = 'difficulty') -> Optional[Dict[str, Any]]:
+        """
+        Local equivalent of the server's findAlternativeExercise
+
+        Picks the easiest registered alternative (for reason='equipment', the
+        easiest one needing no equipment, if any). Without registered
+        alternatives, falls back to the hardest exercise of the same
+        category that is easier than the original (difficulty below 5 when
+        the original has none).
+
+        Args:
+            exercise_id: Exercise to replace
+            reason: One of ALTERNATIVE_REASONS
+
+        Returns:
+            The replacement exercise row, or None
+        """
+        if reason not in ALTERNATIVE_REASONS:
+            raise ValueError(f"Unknown alternative reason '{reason}'")
+
+        alternatives = self.alternatives_for(exercise_id)
+        if alternatives:
+            if reason == 'equipment':
+                no_equipment = [e for e in alternatives if not e.get('equipment_needed')]
+                if no_equipment:
+                    return no_equipment[0]
+            return alternatives[0]
+
+        original = self._by_id.get(exercise_id)
+        if original is None or not original.get('category'):
+            return None
+        easier = self.in_difficulty_range(original['category'], high=original.get('difficulty_level') or 5)
+        return easier[-1] if easier else None
+
+    # -- routines -----------------------------------------------------------
+
+    def session_exercises(self, session: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        (block, exercise) pairs of a routine session, in display order
+
+        The exercise is the full catalog row when known, otherwise the
+        block's own embedded exercise.
+        """
+        for section in SESSION_SECTIONS:
+            for block in session.get(section) or []:
+                embedded = block.get('exercise') or {}
+                yield block, self._by_id.get(embedded.get('id'), embedded)
+
+    def substitute(self, session: Dict[str, Any], exercise_id: str,
+                   reason: str = 'difficulty') -> Optional[Dict[str, Any]]:
+        """
+        Replace an exercise in every block of a session with its alternative
+
+        Blocks are updated in place; sets, reps and rest are kept.
+
+        Returns:
+            The replacement exercise, or None if there is no alternative
+        """
+        replacement = self.find_alternative(exercise_id, reason)
+        if replacement is None:
+            return None
+        for block, _ in self.session_exercises(session):
+            if (block.get('exercise') or {}).get('id') == exercise_id:
+                block['exercise'] = replacement
+        return replacement
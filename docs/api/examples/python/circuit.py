@@ -0,0 +1,187 @@
+"""
+Bodyweight Training API - Circuit Breaker
+Per-endpoint circuit breaker that stops sending requests to a failing edge function
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from bodyweight_client import logger
+from bodyweight_client.api import APIError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(APIError):
+    """Raised instead of sending a request while the endpoint's circuit is open"""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"Circuit open for {endpoint}; not sending requests for {retry_after:.1f}s",
+                         retry_after=retry_after)
+        self.endpoint = endpoint
+
+
+def is_failure(error: APIError) -> bool:
+    """Whether an error says the endpoint is unhealthy (timeouts, connection errors, 5xx)"""
+    return error.status_code is None or error.status_code >= 500
+
+
+class CircuitStats:
+    """Counters of one endpoint's circuit"""
+
+    def __init__(self):
+        self.allowed = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+        self.opened = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "successes": self.successes,
+            "failures": self.failures,
+            "opened": self.opened,
+        }
+
+
+class EndpointCircuit:
+    """
+    Closed / open / half-open state machine for one endpoint
+
+    Closed: requests flow; `failure_threshold` consecutive failures open the
+    circuit. Open: requests are rejected for `recovery_timeout` seconds.
+    Half-open: one trial request is let through; its success closes the
+    circuit and its failure opens it again. If the trial never reports back,
+    another one is admitted after a further `recovery_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.stats = CircuitStats()
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[float]:
+        """
+        Ask to send a request
+
+        Returns:
+            None if the request may be sent, otherwise seconds until the
+            circuit will admit a trial request
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN:
+                wait = self._opened_at + self.recovery_timeout - now
+                if wait > 0:
+                    self.stats.rejected += 1
+                    return wait
+                self.state = HALF_OPEN
+                self._trial_started_at = now
+            elif self.state == HALF_OPEN:
+                wait = self._trial_started_at + self.recovery_timeout - now
+                if wait > 0:
+                    self.stats.rejected += 1
+                    return wait
+                self._trial_started_at = now
+            self.stats.allowed += 1
+            return None
+
+    def record_success(self) -> bool:
+        """Record a healthy response; returns True if this closed the circuit"""
+        with self._lock:
+            self.stats.successes += 1
+            self._consecutive_failures = 0
+            if self.state == CLOSED:
+                return False
+            self.state = CLOSED
+            return True
+
+    def record_failure(self) -> bool:
+        """Record a failed request; returns True if this opened the circuit"""
+        with self._lock:
+            self.stats.failures += 1
+            self._consecutive_failures += 1
+            if self.state == OPEN:
+                return False
+            if self.state == CLOSED and self._consecutive_failures < self.failure_threshold:
+                return False
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self.stats.opened += 1
+            return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self._consecutive_failures,
+                    **self.stats.to_dict()}
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breakers
+
+    Share one instance between clients so they all stop calling an edge
+    function that is down, instead of each discovering it separately.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 endpoint_settings: Optional[Dict[str, Dict[str, float]]] = None):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open an endpoint's circuit
+            recovery_timeout: Seconds an open circuit rejects requests before a trial
+            endpoint_settings: Optional {endpoint: {"failure_threshold": ..., "recovery_timeout": ...}}
+                overrides, e.g. for the slower generate-routine
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.endpoint_settings = dict(endpoint_settings or {})
+        self._circuits: Dict[str, EndpointCircuit] = {}
+        self._lock = threading.Lock()
+
+    def circuit_for(self, endpoint: str) -> EndpointCircuit:
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None:
+                settings = {"failure_threshold": self.failure_threshold,
+                            "recovery_timeout": self.recovery_timeout,
+                            **self.endpoint_settings.get(endpoint, {})}
+                circuit = self._circuits[endpoint] = EndpointCircuit(**settings)
+            return circuit
+
+    def state(self, endpoint: str) -> str:
+        return self.circuit_for(endpoint).state
+
+    def before_request(self, endpoint: str) -> None:
+        """
+        Raises:
+            CircuitOpenError: If the endpoint's circuit does not admit a request now
+        """
+        wait = self.circuit_for(endpoint).acquire()
+        if wait is not None:
+            raise CircuitOpenError(endpoint, wait)
+
+    def record_success(self, endpoint: str) -> None:
+        if self.circuit_for(endpoint).record_success():
+            logger.info(f"🔌 Circuit closed for {endpoint}, requests resumed")
+
+    def record_failure(self, endpoint: str) -> None:
+        circuit = self.circuit_for(endpoint)
+        if circuit.record_failure():
+            logger.warning(f"🔌 Circuit opened for {endpoint}; rejecting requests for {circuit.recovery_timeout:.0f}s")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """State and counters of every endpoint seen so far"""
+        with self._lock:
+            circuits = dict(self._circuits)
+        return {endpoint: circuit.to_dict() for endpoint, circuit in circuits.items()}
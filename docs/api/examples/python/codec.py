@@ -0,0 +1,242 @@
+"""
+Bodyweight Training API - JSON Codecs and Body Compression
+Pluggable JSON encoding (orjson / msgspec / stdlib) and gzip/Brotli helpers
+"""
+
+import gzip
+import json
+import sys
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from models import RawJSON
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class JSONCodec:
+    """Encodes request payloads to bytes and decodes response bodies"""
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a JSON body; raises ValueError on invalid input"""
+        return json.loads(data)
+
+    def encode_payload(self, obj: Any) -> bytes:
+        """
+        Encode a request payload, splicing RawJSON fragments in verbatim
+
+        The payload itself or any of its top-level values may be RawJSON;
+        everything else goes through dumps().
+        """
+        if isinstance(obj, RawJSON):
+            return obj.data
+        if not isinstance(obj, dict) or not any(isinstance(value, RawJSON) for value in obj.values()):
+            return self.dumps(obj)
+
+        encoded = self.dumps({key: value for key, value in obj.items() if not isinstance(value, RawJSON)})
+        fragments = b','.join(self.dumps(key) + b':' + value.data
+                              for key, value in obj.items() if isinstance(value, RawJSON))
+        if encoded == b'{}':
+            return b'{' + fragments + b'}'
+        return encoded[:-1] + b',' + fragments + b'}'
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)  # orjson.JSONDecodeError subclasses ValueError
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+AVAILABLE_CODECS = {"json": JSONCodec}
+if msgspec is not None:
+    AVAILABLE_CODECS["msgspec"] = MsgspecCodec
+if orjson is not None:
+    AVAILABLE_CODECS["orjson"] = OrjsonCodec
+
+_PREFERRED_CODECS = ("orjson", "msgspec", "json")
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Return a codec by name, or the fastest one installed
+
+    Args:
+        name: "orjson", "msgspec" or "json" (None picks the fastest available)
+
+    Raises:
+        ValueError: If the named codec is unknown or its library is not installed
+    """
+    if name is None:
+        name = next(n for n in _PREFERRED_CODECS if n in AVAILABLE_CODECS)
+    if name not in AVAILABLE_CODECS:
+        raise ValueError(f"JSON codec '{name}' is not available (installed: {', '.join(AVAILABLE_CODECS)})")
+    return AVAILABLE_CODECS[name]()
+
+
+# Request body compression. Only gzip is accepted by the edge functions
+# (see supabase/functions/_shared/body.ts); Brotli is used for responses.
+REQUEST_ENCODINGS = ("gzip",)
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+
+# Bulk-upload endpoints that decode compressed request bodies
+COMPRESSIBLE_ENDPOINTS = frozenset({"/save-session-feedback", "/update-progressions"})
+
+
+def accept_encoding() -> str:
+    """Accept-Encoding header value for responses the client can decode"""
+    return "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+def compress_body(body: bytes, encoding: str, level: int = 6) -> bytes:
+    """Compress a request body with the given Content-Encoding"""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("Brotli compression requires the 'brotli' package")
+        return brotli.compress(body, quality=min(level, 11))
+    raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+
+def decompress_body(body: bytes, encoding: Optional[str]) -> bytes:
+    """Decompress a body according to its Content-Encoding header"""
+    if not encoding or encoding == "identity":
+        return body
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("Brotli decompression requires the 'brotli' package")
+        return brotli.decompress(body)
+    raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+
+class RequestCompression:
+    """
+    Negotiated compression of large request bodies
+
+    Bodies of at least `threshold` bytes sent to one of `endpoints` are
+    compressed. If an endpoint answers 415 Unsupported Media Type (e.g. an
+    older deployment), the client resends uncompressed and stops
+    compressing for that endpoint.
+    """
+
+    def __init__(self, encoding: str = "gzip", threshold: int = DEFAULT_COMPRESSION_THRESHOLD, level: int = 6,
+                 endpoints: Iterable[str] = COMPRESSIBLE_ENDPOINTS):
+        if encoding not in REQUEST_ENCODINGS:
+            raise ValueError(f"Request encoding must be one of {REQUEST_ENCODINGS}")
+        self.encoding = encoding
+        self.threshold = threshold
+        self.level = level
+        self.endpoints = frozenset(endpoints)
+        self.unsupported_endpoints = set()
+
+    def encode(self, endpoint: str, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+        """Return the body to send and the extra headers it needs"""
+        if (len(body) < self.threshold or endpoint not in self.endpoints
+                or endpoint in self.unsupported_endpoints):
+            return body, {}
+        return compress_body(body, self.encoding, self.level), {"Content-Encoding": self.encoding}
+
+    def mark_unsupported(self, endpoint: str) -> None:
+        self.unsupported_endpoints.add(endpoint)
+
+
+# Repeats of each response list in the sample payloads: 12 routine blocks per section, 48 weeks of evolution
+SAMPLE_SCALE = 12
+
+
+def _sample_payloads(scale: int = SAMPLE_SCALE) -> Dict[str, Any]:
+    """
+    Routine and evolution responses from the OpenAPI examples, scaled up to realistic sizes
+
+    The stub server builds its responses the same way, so the payloads have
+    the real response shapes (trainingPlan, exercise_blocks, ...).
+    """
+    # Deferred: the stub server (and the PyYAML it needs) is only used for these sample payloads
+    from stub_server import load_endpoint_examples, scale_payload
+
+    examples = load_endpoint_examples()
+    return {endpoint.lstrip('/'): scale_payload(examples[endpoint], scale)
+            for endpoint in ("/generate-routine", "/analyze-evolution")}
+
+
+def benchmark(payloads: Dict[str, Any], rounds: int = 200) -> None:
+    """Print encode/decode time per codec and compressed sizes for each payload"""
+    codecs = [get_codec(name) for name in AVAILABLE_CODECS]
+
+    for label, payload in payloads.items():
+        raw = JSONCodec().dumps(payload)
+        print(f"\n📦 {label}: {len(raw):,} bytes")
+
+        for codec in codecs:
+            started = time.perf_counter()
+            for _ in range(rounds):
+                codec.dumps(payload)
+            encode = (time.perf_counter() - started) / rounds
+            started = time.perf_counter()
+            for _ in range(rounds):
+                codec.loads(raw)
+            decode = (time.perf_counter() - started) / rounds
+            print(f"   {codec.name:8s} encode {encode * 1e6:8.1f}µs  decode {decode * 1e6:8.1f}µs")
+
+        encodings = ["gzip"] + (["br"] if brotli is not None else [])
+        for encoding in encodings:
+            started = time.perf_counter()
+            compressed = compress_body(raw, encoding)
+            elapsed = time.perf_counter() - started
+            print(f"   {encoding:8s} {len(compressed):,} bytes ({len(compressed) / len(raw):.0%}) in {elapsed * 1e3:.2f}ms")
+
+
+if __name__ == "__main__":
+    # Usage: python codec.py [recorded_response.json ...]
+    # Pass response bodies saved from real API calls; without arguments the
+    # OpenAPI example routine and evolution responses, scaled up, are used.
+    if len(sys.argv) > 1:
+        recorded = {}
+        for path in sys.argv[1:]:
+            with open(path, 'rb') as f:
+                recorded[path] = json.loads(f.read())
+    else:
+        recorded = _sample_payloads()
+
+    print(f"Codecs available: {', '.join(AVAILABLE_CODECS)}  (default: {get_codec().name})")
+    benchmark(recorded)
@@ -0,0 +1,366 @@
+"""
+Bodyweight Training API - Local Evolution Analysis
+Append-only per-user history store with incrementally maintained evolution metrics
+
+The analyze-evolution edge function rebuilds its weekly ICA estimates and
+performance trends from every session in the window on each call. Here the
+same aggregates are kept per week and updated as sessions are appended, so
+refreshing a dashboard costs O(weeks shown) instead of a full recomputation:
+
+    with HistoryStore('history', client.user_id) as store:
+        store.sync(client)               # only fetches sessions newer than the store
+        dashboard = store.evolution(weeks_back=12)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from ica import calculate_volatility
+
+# Fields kept per session and per session exercise (the rest of the
+# get-training-history payload is not used by the evolution metrics)
+SESSION_FIELDS = ('id', 'session_date', 'status', 'ica_score')
+EXERCISE_FIELDS = ('exercise_id', 'sets_planned', 'reps_planned', 'sets_completed', 'reps_completed',
+                   'rpe_reported', 'technical_quality')
+
+# User IDs used verbatim as history file names (UUIDs, token fingerprints)
+_SAFE_USER_ID = re.compile(r'[a-z0-9_-]{1,64}')
+
+
+def _history_filename(user_id: str) -> str:
+    """History file name of a user; IDs that are not plain lowercase tokens are hashed"""
+    if not _SAFE_USER_ID.fullmatch(user_id):
+        user_id = hashlib.sha256(user_id.encode('utf-8')).hexdigest()
+    return f"{user_id}.jsonl"
+
+
+def _week_start(day: date) -> str:
+    """Sunday starting the week, as groupSessionsByWeek computes it"""
+    return (day - timedelta(days=(day.weekday() + 1) % 7)).isoformat()
+
+
+def _completion(exercise: Dict) -> float:
+    planned = (exercise.get('sets_planned') or 0) * (exercise.get('reps_planned') or 0)
+    if not planned:
+        return 1.0  # the server divides by zero here; count an unplanned block as done
+    return (exercise.get('sets_completed') or 0) * (exercise.get('reps_completed') or 0) / planned
+
+
+def _improvement_rate(values: List[float]) -> float:
+    """calculateImprovementRate: second-half average minus first-half average"""
+    if len(values) < 2:
+        return 0
+    half = len(values) // 2
+    first, second = values[:half], values[half:]
+    return round(sum(second) / len(second) - sum(first) / len(first), 2)
+
+
+def _rpe_optimization_score(values: List[float]) -> float:
+    """calculateRPEOptimizationScore: closeness of the weekly RPE to the ideal 6.5"""
+    if not values:
+        return 0.5
+    distance = sum(abs(rpe - 6.5) for rpe in values) / len(values)
+    return max(0, 1 - distance / 3)
+
+
+@dataclass
+class WeekAggregate:
+    """Running sums for one Sunday-based week of completed sessions"""
+    week: str
+    sessions: int = 0
+    session_completion_sum: float = 0.0
+    exercises: int = 0
+    exercise_completion_sum: float = 0.0
+    rpe_sum: float = 0.0
+    quality_sum: float = 0.0
+
+    def add(self, session: Dict) -> None:
+        exercises = session.get('session_exercises') or []
+        completions = [_completion(e) for e in exercises]
+
+        self.sessions += 1
+        self.session_completion_sum += sum(completions) / (len(completions) or 1)
+        self.exercises += len(exercises)
+        self.exercise_completion_sum += sum(completions)
+        self.rpe_sum += sum(e.get('rpe_reported') or 7 for e in exercises)
+        self.quality_sum += sum(e.get('technical_quality') or 3 for e in exercises)
+
+    @property
+    def ica(self) -> float:
+        """The server's weekly ICA approximation from average session completion"""
+        return max(0.1, min(1.5, self.session_completion_sum / self.sessions * 1.2))
+
+    @property
+    def avg_completion(self) -> float:
+        return self.exercise_completion_sum / self.exercises if self.exercises else 0.0
+
+    @property
+    def avg_rpe(self) -> float:
+        return self.rpe_sum / self.exercises if self.exercises else 7.0
+
+    @property
+    def avg_quality(self) -> float:
+        return self.quality_sum / self.exercises if self.exercises else 3.0
+
+
+class EvolutionTracker:
+    """
+    Weekly ICA and performance aggregates, updated one session at a time
+
+    Sessions must be added in date order. Adding one touches only the week
+    it falls in; evolution() reads the last `weeks_back` weeks.
+    """
+
+    def __init__(self):
+        self.weeks: List[WeekAggregate] = []
+        self.total_sessions = 0
+        self.last_session_date: Optional[str] = None
+
+    def add(self, session: Dict) -> None:
+        session_date = session['session_date'][:10]
+        if self.last_session_date is not None and session_date < self.last_session_date:
+            raise ValueError(f"Session {session.get('id')} on {session_date} is older than "
+                             f"the last tracked session ({self.last_session_date})")
+
+        week = _week_start(date.fromisoformat(session_date))
+        if not self.weeks or self.weeks[-1].week != week:
+            self.weeks.append(WeekAggregate(week))
+        self.weeks[-1].add(session)
+        self.total_sessions += 1
+        self.last_session_date = session_date
+
+    def evolution(self, weeks_back: int = 12, today: Optional[date] = None) -> Dict:
+        """
+        ICA and performance evolution over recent weeks
+
+        Mirrors the ica_evolution and performance_evolution sections of the
+        analyze-evolution response. The window starts at the week containing
+        `today - weeks_back` weeks, so it covers whole weeks.
+
+        Args:
+            weeks_back: Number of weeks to include (the server's default is 12)
+            today: Reference date (defaults to today)
+
+        Returns:
+            Dict with ica_evolution and performance_evolution
+        """
+        today = today or date.today()
+        cutoff = _week_start(today - timedelta(weeks=weeks_back))
+        window = []
+        for week in reversed(self.weeks):
+            if week.week < cutoff:
+                break
+            window.append(week)
+        window.reverse()
+
+        return {
+            'ica_evolution': self._ica_evolution(window),
+            'performance_evolution': self._performance_evolution(window),
+        }
+
+    @staticmethod
+    def _ica_evolution(window: List[WeekAggregate]) -> Dict:
+        if not window:
+            return {'current': 0.1, 'trend': 'stable', 'volatility': 0, 'weekly_changes': [],
+                    'monthly_changes': [], 'prediction_4_weeks': 0.1}
+
+        # Week-over-week change of the estimate (the first week has none)
+        weekly_changes = []
+        previous = None
+        for week in window:
+            ica = week.ica
+            weekly_changes.append({'week': week.week, 'ica': ica,
+                                   'change': ica - previous if previous is not None else 0})
+            previous = ica
+
+        months: Dict[str, List[float]] = {}
+        for entry in weekly_changes:
+            months.setdefault(entry['week'][:7], []).append(entry['ica'])
+        monthly_changes = []
+        previous = None
+        for month, values in months.items():
+            avg_ica = sum(values) / len(values)
+            monthly_changes.append({'month': month, 'avg_ica': avg_ica,
+                                    'change': avg_ica - previous if previous is not None else 0})
+            previous = avg_ica
+
+        recent = weekly_changes[-4:]
+        avg_change = sum(w['change'] for w in recent) / len(recent)
+        trend = 'improving' if avg_change > 0.02 else 'declining' if avg_change < -0.02 else 'stable'
+        current = weekly_changes[-1]['ica']
+
+        return {
+            'current': current,
+            'trend': trend,
+            'volatility': calculate_volatility([w['ica'] for w in weekly_changes]),
+            'weekly_changes': weekly_changes,
+            'monthly_changes': monthly_changes,
+            'prediction_4_weeks': max(0.1, min(2.0, current + avg_change * 4)),
+        }
+
+    @staticmethod
+    def _performance_evolution(window: List[WeekAggregate]) -> Dict:
+        if not window:
+            return {
+                'completion_rate': {'current': 0.8, 'trend': [], 'improvement_rate': 0},
+                'rpe_optimization': {'current_avg': 7, 'trend': [], 'optimization_score': 0.5},
+                'technical_quality': {'current_avg': 3, 'trend': [], 'improvement_rate': 0},
+            }
+
+        completions = [w.avg_completion for w in window]
+        rpes = [w.avg_rpe for w in window]
+        qualities = [w.avg_quality for w in window]
+        return {
+            'completion_rate': {
+                'current': completions[-1],
+                'trend': [{'week': w.week, 'avg_completion': c} for w, c in zip(window, completions)],
+                'improvement_rate': _improvement_rate(completions),
+            },
+            'rpe_optimization': {
+                'current_avg': rpes[-1],
+                'trend': [{'week': w.week, 'avg_rpe': r} for w, r in zip(window, rpes)],
+                'optimization_score': _rpe_optimization_score(rpes),
+            },
+            'technical_quality': {
+                'current_avg': qualities[-1],
+                'trend': [{'week': w.week, 'avg_quality': q} for w, q in zip(window, qualities)],
+                'improvement_rate': _improvement_rate(qualities),
+            },
+        }
+
+
+def compact_session(session: Dict) -> Dict:
+    """Keep only the fields the evolution metrics use"""
+    record = {k: session.get(k) for k in SESSION_FIELDS}
+    record['session_exercises'] = [{k: e.get(k) for k in EXERCISE_FIELDS}
+                                   for e in session.get('session_exercises') or []]
+    return record
+
+
+class HistoryStore:
+    """
+    Append-only JSON Lines file of one user's completed sessions
+
+    The file is replayed into an EvolutionTracker when the store is opened;
+    after that every new session is written once and folded into the
+    tracker. Lines are flushed but not fsynced: the server holds the
+    authoritative history, so a lost tail is simply fetched again by the
+    next sync(). A final line torn by a crash mid-append is cut off when the
+    store is opened. User IDs that could escape the directory (anything but
+    lowercase letters, digits, '-' and '_') are hashed into the file name.
+    """
+
+    def __init__(self, directory: str, user_id: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, _history_filename(user_id))
+        self.tracker = EvolutionTracker()
+        self._lock = threading.Lock()
+        self._ids = set()
+
+        if os.path.exists(self.path):
+            self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self) -> None:
+        """Replay the file into the tracker, truncating a torn final line"""
+        size = os.path.getsize(self.path)
+        valid_end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                end = valid_end + len(line)
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        if end < size:
+                            raise  # corruption before the tail is not ours to repair
+                        break
+                    if not line.endswith(b'\n'):
+                        break  # complete JSON but the append did not finish
+                    self._ids.add(record['id'])
+                    self.tracker.add(record)
+                valid_end = end
+        if valid_end < size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+
+    def __len__(self) -> int:
+        return self.tracker.total_sessions
+
+    @property
+    def last_session_date(self) -> Optional[str]:
+        return self.tracker.last_session_date
+
+    def append(self, session: Dict) -> bool:
+        """
+        Add one completed session
+
+        Returns:
+            False if the session was already stored or is not completed
+
+        Raises:
+            ValueError: If the session is older than the newest stored session
+        """
+        if session.get('status') != 'completed':
+            return False
+        with self._lock:
+            if session['id'] in self._ids:
+                return False
+            record = compact_session(session)
+            self.tracker.add(record)
+            self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+            self._file.flush()
+            self._ids.add(record['id'])
+            return True
+
+    def extend(self, sessions: Iterable[Dict]) -> int:
+        """Append sessions given oldest first; returns how many were new"""
+        return sum(self.append(session) for session in sessions)
+
+    def sync(self, client, page_size: int = 100) -> int:
+        """
+        Fetch and append the sessions completed since the newest stored one
+
+        Uses client.iter_training_history with start_date set to the last
+        stored session date, so only the tail of the history is downloaded.
+        For the async client, collect `iter_training_history` yourself and
+        pass the sessions, oldest first, to extend().
+
+        Args:
+            client: BodyweightTrainingClient (or subclass) for this user
+            page_size: History page size
+
+        Returns:
+            Number of new sessions stored
+        """
+        filters = {'status': 'completed', 'include_exercises': True}
+        if self.last_session_date:
+            filters['start_date'] = self.last_session_date
+
+        # Newest first from the server; compact each unseen session as its page
+        # arrives, so only the compact records are held, then store oldest first
+        new_sessions = [compact_session(s) for s in client.iter_training_history(page_size=page_size, **filters)
+                        if s.get('id') not in self._ids]
+        new_sessions.sort(key=lambda s: s['session_date'])
+        return self.extend(new_sessions)
+
+    def evolution(self, weeks_back: int = 12, today: Optional[date] = None) -> Dict:
+        """Evolution metrics for the stored history; see EvolutionTracker.evolution"""
+        with self._lock:
+            return self.tracker.evolution(weeks_back, today)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> 'HistoryStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,149 @@
+"""
+Bodyweight Training API - Hedged Requests
+Second attempts for slow idempotent reads, fired after the endpoint's recent p95 latency
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+from ratelimit import RetryBudget
+
+
+class HedgeStats:
+    """Counters describing how often requests were hedged and whether it paid off"""
+
+    def __init__(self):
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+        self.hedged_by_endpoint: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "budget_exhausted": self.budget_exhausted,
+            "hedged_by_endpoint": dict(self.hedged_by_endpoint),
+        }
+
+
+class HedgePolicy:
+    """
+    Run idempotent requests with a hedge
+
+    The request is started on a worker thread. If it has not finished after
+    the endpoint's recent `percentile` latency, an identical second request
+    is sent and whichever succeeds first is returned; the other is left to
+    finish in the background. Only about 1 request in 20 waits that long, so
+    at p95 the extra load is around 5%, while a stalled edge-function
+    instance no longer holds the caller for the whole timeout. A budget caps
+    hedges at `max_hedge_ratio` of requests so a slow backend is not
+    overwhelmed with duplicates.
+
+    Until an endpoint has `min_samples` latency samples its requests are not
+    hedged. Share one policy between clients to pool latency samples, the
+    budget and the worker threads.
+    """
+
+    def __init__(self, percentile: float = 95.0, min_delay: float = 0.01, min_samples: int = 20,
+                 window: int = 200, max_hedge_ratio: float = 0.1, max_workers: int = 32):
+        """
+        Args:
+            percentile: Latency percentile after which the hedge is sent
+            min_delay: Lower bound for the hedge delay in seconds
+            min_samples: Successful requests needed before an endpoint is hedged
+            window: Recent latencies kept per endpoint
+            max_hedge_ratio: Hedges allowed per request over a sliding window
+            max_workers: Worker threads; should cover twice the concurrent hedged calls
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.stats = HedgeStats()
+        self.budget = RetryBudget(ratio=max_hedge_ratio, min_retries_per_second=0.0)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        """Record the latency of a successful request"""
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None:
+                latencies = self._latencies[endpoint] = deque(maxlen=self.window)
+            latencies.append(seconds)
+
+    def delay_for(self, endpoint: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there are too few samples"""
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[index])
+
+    def _timed(self, endpoint: str, fn: Callable[[], Any]) -> Callable[[], Any]:
+        def attempt() -> Any:
+            started = time.perf_counter()
+            result = fn()
+            self.observe(endpoint, time.perf_counter() - started)
+            return result
+        return attempt
+
+    def call(self, endpoint: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, hedging it if it is slower than the endpoint's recent latency
+
+        Args:
+            endpoint: Endpoint label for latency samples and stats
+            fn: Zero-argument callable performing one request; may be called twice concurrently
+
+        Returns:
+            The first successful result (or the last error if both attempts fail)
+        """
+        with self._lock:
+            self.stats.calls += 1
+        self.budget.record_request()
+        delay = self.delay_for(endpoint)
+        attempt = self._timed(endpoint, fn)
+        if delay is None:
+            return attempt()
+
+        # Each attempt runs in a copy of the caller's context, so tracing spans nest under its span
+        primary = self._executor.submit(contextvars.copy_context().run, attempt)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+
+        if not self.budget.try_acquire():
+            with self._lock:
+                self.stats.budget_exhausted += 1
+            return primary.result()
+
+        hedge = self._executor.submit(contextvars.copy_context().run, attempt)
+        with self._lock:
+            self.stats.hedged += 1
+            self.stats.hedged_by_endpoint[endpoint] = self.stats.hedged_by_endpoint.get(endpoint, 0) + 1
+
+        done, _ = wait((primary, hedge), return_when=FIRST_COMPLETED)
+        first = primary if primary in done else hedge
+        if first.exception() is not None:
+            # The first answer was an error; the other attempt decides
+            first = hedge if first is primary else primary
+        if first is hedge and hedge.done() and hedge.exception() is None:
+            with self._lock:
+                self.stats.hedge_wins += 1
+        return first.result()
+
+    def close(self) -> None:
+        """Stop the worker threads once running attempts finish"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,968 @@
+"""
+Bodyweight Training API - Offline ICA Scoring
+Python port of AdaptiveTrainingAlgorithm.calculateICA (supabase/functions/_shared/algorithm.ts)
+
+Two entry points:
+- calculate_ica(): scores one user from the same inputs the calculate-ica
+  edge function passes to the algorithm, returning the same ICAData shape
+- score_cohort(): scores many users in one NumPy-vectorized pass from
+  columnar session, exercise and history arrays
+
+Both take an explicit `now` so results are reproducible. The TypeScript
+quirks (JavaScript truthiness of missing/zero values, Math.round rounding
+half up) are reproduced on purpose so scores match the server exactly.
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+FITNESS_LEVELS = {
+    'beginner': 1.0,
+    'intermediate': 1.5,
+    'advanced': 2.0,
+}
+
+NEW_USER_SAFETY_FACTOR = 0.7  # Reduce intensity by 30% for new users
+NEW_USER_THRESHOLD_SESSIONS = 3  # Consider "new" until 3 completed sessions
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+# ---------------------------------------------------------------------------
+# Helpers reproducing JavaScript semantics
+# ---------------------------------------------------------------------------
+
+def _truthy(value: Any) -> bool:
+    """JavaScript truthiness for the numeric/optional fields used by the algorithm"""
+    if value is None:
+        return False
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return bool(value)
+
+
+def _or(value: Any, default: Any) -> Any:
+    """JavaScript `value || default`"""
+    return value if _truthy(value) else default
+
+
+def _js_round2(value: float) -> float:
+    """JavaScript Math.round(value * 100) / 100 (rounds half up, not to even)"""
+    return math.floor(value * 100 + 0.5) / 100
+
+
+def _parse_date(value: Any) -> datetime:
+    """Parse an ISO date/datetime the way `new Date(value)` does (date-only strings are UTC)"""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    text = str(value).replace('Z', '+00:00')
+    parsed = datetime.fromisoformat(text)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _days_between(now: datetime, then: datetime) -> int:
+    """Math.floor((now - then) / day)"""
+    return math.floor((now - then).total_seconds() / DAY_SECONDS)
+
+
+def _completion_ratio(session_exercise: Dict) -> float:
+    """min(completed / planned, 1), where a missing plan divides by zero to Infinity in JS"""
+    planned = (session_exercise.get('sets_planned') or 0) * (session_exercise.get('reps_planned') or 0)
+    if not planned:
+        return 1.0
+    return min(session_exercise['sets_completed'] * session_exercise['reps_completed'] / planned, 1)
+
+
+def _now(now: Optional[datetime]) -> datetime:
+    if now is None:
+        return datetime.now(timezone.utc)
+    return now if now.tzinfo else now.replace(tzinfo=timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# Scalar port
+# ---------------------------------------------------------------------------
+
+def is_new_user(recent_sessions: List[Dict]) -> bool:
+    """Check if user is considered "new" and needs safety adjustments"""
+    completed = [s for s in recent_sessions if s.get('status') == 'completed']
+    return len(completed) < NEW_USER_THRESHOLD_SESSIONS
+
+
+def calculate_trend(values: List[float]) -> str:
+    """Trend of a chronological series of ICA values"""
+    if len(values) < 3:
+        return 'stable'
+
+    recent = values[-3:]
+    older = values[:-2]
+
+    recent_avg = sum(recent) / len(recent)
+    older_avg = sum(older) / len(older)
+
+    change = (recent_avg - older_avg) / older_avg
+
+    if change > 0.08:
+        return 'improving'
+    if change < -0.08:
+        return 'declining'
+    return 'stable'
+
+
+def calculate_volatility(values: List[float]) -> float:
+    """Coefficient of variation of a series of ICA values"""
+    if len(values) < 2:
+        return 0
+
+    mean = sum(values) / len(values)
+    variance = sum((v - mean) ** 2 for v in values) / len(values)
+    return math.sqrt(variance) / mean
+
+
+def analyze_temporal_context(history: List[Dict], now: Optional[datetime] = None) -> Dict:
+    """Trend, volatility and smoothing inputs from the algorithm state history"""
+    now = _now(now)
+
+    if not history:
+        return {
+            'hasPreviousCalculations': False,
+            'trend': 'stable',
+            'volatility': 0,
+            'stabilityFactor': 1.0,
+            'trendAdjustment': 0,
+            'lastICA': None,
+            'averageICA': None,
+            'daysSinceLastCalculation': math.inf,
+        }
+
+    sorted_history = sorted(history, key=lambda e: _parse_date(e['calculation_date']), reverse=True)
+
+    last_ica = sorted_history[0]['current_ica']
+    days_since_last = _days_between(now, _parse_date(sorted_history[0]['calculation_date']))
+
+    recent_entries = sorted_history[:6]
+    two_weeks_ago = now - timedelta(days=14)
+    recent_last_2_weeks = [e for e in recent_entries if _parse_date(e['calculation_date']) >= two_weeks_ago]
+
+    if len(recent_last_2_weeks) >= 3:
+        values = [e['current_ica'] for e in recent_last_2_weeks][::-1]
+        trend = calculate_trend(values)
+        volatility = calculate_volatility(values)
+
+        stability_factor = max(0.7, 1.0 - volatility * 0.5)
+
+        trend_adjustment = 0
+        if trend == 'improving':
+            trend_adjustment = min(0.15, 0.15 if volatility < 0.3 else 0.05)
+        elif trend == 'declining':
+            trend_adjustment = max(-0.10, -0.10 if volatility < 0.3 else -0.05)
+
+        return {
+            'hasPreviousCalculations': True,
+            'trend': trend,
+            'volatility': volatility,
+            'stabilityFactor': stability_factor,
+            'trendAdjustment': trend_adjustment,
+            'lastICA': last_ica,
+            'averageICA': sum(values) / len(values),
+            'daysSinceLastCalculation': days_since_last,
+        }
+
+    average_ica = sum(e['current_ica'] for e in recent_entries) / len(recent_entries)
+
+    return {
+        'hasPreviousCalculations': True,
+        'trend': 'stable',
+        'volatility': 0.2,
+        'stabilityFactor': 0.9,
+        'trendAdjustment': 0,
+        'lastICA': last_ica,
+        'averageICA': average_ica,
+        'daysSinceLastCalculation': days_since_last,
+    }
+
+
+def calculate_dynamic_fitness_score(profile: Dict, progressions: List[Dict], recent_sessions: List[Dict],
+                                    avg_completion_rate: float, avg_rpe: float,
+                                    avg_technical_quality: float) -> float:
+    """Dynamic 2-10 fitness score from progressions, performance quality and consistency"""
+    initial_fitness = _or(profile.get('current_fitness_score'),
+                          FITNESS_LEVELS.get(profile.get('fitness_level'), math.nan) * 2.5)
+
+    if not recent_sessions or not progressions:
+        return max(initial_fitness, 2.0)
+
+    avg_progression_level = sum(p['current_level'] for p in progressions) / len(progressions)
+    progression_contribution = 1 + avg_progression_level
+
+    completion_factor = min(avg_completion_rate * 4, 4)
+    rpe_factor = max(4 - abs(avg_rpe - 6.5), 0) / 4 * 2
+    technique_factor = (avg_technical_quality / 5) * 2
+    performance_contribution = completion_factor + rpe_factor + technique_factor
+
+    recent_sessions_count = len([s for s in recent_sessions if s.get('status') == 'completed'])
+    weeks_training = max(len(recent_sessions) / 3, 1)
+    consistency_factor = min(recent_sessions_count / weeks_training / 3, 1) * 2
+
+    duration_bonus = min(weeks_training / 24, 1) * 1
+
+    dynamic_score = (
+        progression_contribution * 0.4 +
+        performance_contribution * 0.3 +
+        consistency_factor * 0.2 +
+        duration_bonus * 0.1 +
+        2.0
+    )
+
+    return max(2.0, min(10.0, dynamic_score))
+
+
+def _temporal_context_output(temporal: Dict, raw_ica: float) -> Dict:
+    return {
+        'has_previous_calculations': temporal['hasPreviousCalculations'],
+        'trend': temporal['trend'],
+        'volatility': temporal['volatility'],
+        'stability_factor': temporal['stabilityFactor'],
+        'trend_adjustment': temporal['trendAdjustment'],
+        'last_ica': temporal['lastICA'] if _truthy(temporal['lastICA']) else None,
+        'average_ica': temporal['averageICA'] if _truthy(temporal['averageICA']) else None,
+        'days_since_last_calculation': temporal['daysSinceLastCalculation'],
+        'raw_ica_score': _js_round2(raw_ica),
+        'temporal_adjustments_applied': temporal['hasPreviousCalculations'],
+    }
+
+
+def generate_new_user_ica(profile: Dict, algorithm_history: Optional[List[Dict]] = None,
+                          now: Optional[datetime] = None) -> Dict:
+    """Conservative baseline ICA for users without any training sessions"""
+    fitness_multiplier = _or(FITNESS_LEVELS.get(profile.get('fitness_level')), 1.0)
+    base_ica = 0.8 * fitness_multiplier
+    experience_bonus = min(0.3, profile.get('experience_years', math.nan) * 0.1)
+
+    age = profile.get('age')
+    age_factor = max(0.8, 1.2 - (age - 25) * 0.01) if _truthy(age) else 1.0
+
+    cardiovascular_bonus = 0
+    if _truthy(profile.get('resting_hr')) and _truthy(profile.get('training_hr_avg')):
+        hr_reserve = profile['training_hr_avg'] - profile['resting_hr']
+        if hr_reserve > 100:
+            cardiovascular_bonus = 0.1
+        elif hr_reserve < 60:
+            cardiovascular_bonus = -0.1
+
+    ica_score = max(0.1, min(2.0, (base_ica + experience_bonus + cardiovascular_bonus) * age_factor))
+
+    temporal = analyze_temporal_context(algorithm_history or [], now)
+
+    recommendations = [
+        "¡Bienvenido! Empezaremos con rutinas suaves para evaluar tu nivel",
+        "Es importante completar los primeros entrenamientos para personalizar tu programa",
+        "Escucha a tu cuerpo y ajusta la intensidad según te sientas",
+    ]
+    if profile.get('fitness_level') == 'beginner':
+        recommendations.append("Enfócate en la técnica correcta antes que en la intensidad")
+    elif profile.get('fitness_level') == 'advanced':
+        recommendations.append("Aunque seas avanzado, empezaremos conservadoramente para evaluar tus patrones de movimiento")
+
+    return {
+        'ica_score': _js_round2(ica_score),
+        'adherence_rate': 1.0,
+        'recovery_factor': 0.8,
+        'progression_velocity': 1.0,
+        'detraining_factor': 1.0,
+        'recent_performance': {
+            'sessions_last_4_weeks': 0,
+            'avg_rpe': 5.0,
+            'avg_completion_rate': 1.0,
+            'avg_technical_quality': 3.5,
+        },
+        'user_state': {
+            'current_fitness_level': FITNESS_LEVELS.get(profile.get('fitness_level'), math.nan) * 2,
+            'fatigue_level': _or(profile.get('fatigue_level'), 2),
+            'last_training_date': None,
+            'days_since_last_training': None,
+        },
+        'recommendations': recommendations,
+        'temporal_context': _temporal_context_output(temporal, ica_score),
+    }
+
+
+def calculate_ica(profile: Dict,
+                  progressions: List[Dict],
+                  recent_sessions: List[Dict],
+                  wellness_logs: Optional[List[Dict]] = None,
+                  algorithm_history: Optional[List[Dict]] = None,
+                  now: Optional[datetime] = None) -> Dict:
+    """
+    Calculate the ICA (Index of Current Ability) for one user offline
+
+    Args:
+        profile: User profile merged with latest biometrics, as built by calculate-ica
+        progressions: Active user_exercise_progressions rows
+        recent_sessions: training_sessions rows (newest first) with session_exercises
+        wellness_logs: Unused by the algorithm; accepted for signature parity
+        algorithm_history: algorithm_state_history rows for temporal smoothing
+        now: Reference time (defaults to the current UTC time)
+
+    Returns:
+        ICAData dict with the same keys as the calculate-ica response
+    """
+    now = _now(now)
+    is_new = is_new_user(recent_sessions)
+
+    if not recent_sessions:
+        return generate_new_user_ica(profile, algorithm_history, now)
+
+    temporal = analyze_temporal_context(algorithm_history or [], now)
+
+    four_weeks_ago = now - timedelta(days=28)
+    sessions_last_4_weeks = [
+        s for s in recent_sessions
+        if _parse_date(s['session_date']) >= four_weeks_ago and s.get('status') == 'completed'
+    ]
+
+    expected_sessions = math.floor(28 / 7 * _or(profile.get('available_days_per_week'), 3))
+    actual_sessions = len(sessions_last_4_weeks)
+    adherence_rate = min(actual_sessions / max(expected_sessions, 1), 1.0)
+
+    # Recovery factor (sleep quality, sleep hours, fatigue level, heart rate variability)
+    sleep_quality = profile.get('sleep_quality')
+    sleep_hours = profile.get('sleep_hours')
+    fatigue_level = profile.get('fatigue_level')
+    hrv_trend = profile.get('hrv_trend')
+
+    sleep_quality_factor = (sleep_quality / 5) * 0.25 if _truthy(sleep_quality) else 0.6
+    if _truthy(sleep_hours):
+        sleep_duration_factor = 0.25 if sleep_hours >= 7 else 0.15 if sleep_hours >= 6 else 0.05
+    else:
+        sleep_duration_factor = 0.15
+    fatigue_factor = (1 - (fatigue_level - 1) / 4) * 0.25 if _truthy(fatigue_level) else 0.6
+    hrv_factor = max(0.05, min(0.25, hrv_trend * 0.25)) if _truthy(hrv_trend) else 0.15
+
+    recovery_factor = max(sleep_quality_factor + sleep_duration_factor + fatigue_factor + hrv_factor, 0.3)
+
+    # Progression velocity from completed exercises
+    completed_exercises = [
+        se for s in sessions_last_4_weeks for se in (s.get('session_exercises') or [])
+        if _truthy(se.get('sets_completed')) and _truthy(se.get('reps_completed'))
+    ]
+
+    if completed_exercises:
+        n = len(completed_exercises)
+        avg_rpe = sum(_or(se.get('rpe_reported'), 5) for se in completed_exercises) / n
+        avg_completion_rate = sum(
+            _completion_ratio(se) for se in completed_exercises
+        ) / n
+        avg_technical_quality = sum(_or(se.get('technical_quality'), 3) for se in completed_exercises) / n
+    else:
+        avg_rpe, avg_completion_rate, avg_technical_quality = 5.0, 0.5, 3.0
+
+    progression_velocity = min(
+        avg_completion_rate * 0.4 +
+        (6 - abs(avg_rpe - 7)) / 6 * 0.3 +
+        avg_technical_quality / 5 * 0.3,
+        2.0
+    )
+
+    # Detraining factor
+    last_session = next((s for s in recent_sessions if s.get('status') == 'completed'), None)
+    days_since_last = _days_between(now, _parse_date(last_session['session_date'])) if last_session else 30
+    detraining_factor = max(1 - (days_since_last / 14) * 0.1, 0.7)
+
+    dynamic_fitness_score = calculate_dynamic_fitness_score(
+        profile, progressions, recent_sessions, avg_completion_rate, avg_rpe, avg_technical_quality
+    )
+
+    fitness_level_multiplier = _or(FITNESS_LEVELS.get(profile.get('fitness_level')), 1.0)
+    base_fitness = dynamic_fitness_score / 10
+
+    raw_ica = max(
+        (base_fitness * fitness_level_multiplier * adherence_rate * recovery_factor * progression_velocity) / detraining_factor,
+        0.1
+    )
+
+    temporal_ica = raw_ica
+    if temporal['hasPreviousCalculations']:
+        temporal_ica *= temporal['stabilityFactor']
+        temporal_ica += temporal['trendAdjustment']
+
+        last_ica = temporal['lastICA']
+        days = temporal['daysSinceLastCalculation']
+
+        # Smooth with the previous ICA (30% history, 70% current)
+        if _truthy(last_ica) and days <= 7:
+            smoothing_weight = 0.3
+            temporal_ica = temporal_ica * (1 - smoothing_weight) + last_ica * smoothing_weight
+
+        # Prevent extreme changes (max ±25% over 3 days)
+        if _truthy(last_ica) and days <= 3:
+            max_change = 0.25 * days / 3
+            change = (temporal_ica - last_ica) / last_ica
+            if abs(change) > max_change:
+                temporal_ica = last_ica * (1 + math.copysign(max_change, change))
+
+    ica_score = max(temporal_ica, 0.1)
+
+    recommendations = []
+    if adherence_rate < 0.6:
+        recommendations.append("Aumenta la consistencia en tus entrenamientos")
+    if recovery_factor < 0.6:
+        recommendations.append("Mejora tu calidad de sueño y manejo del estrés")
+    if avg_rpe > 8:
+        recommendations.append("Reduce la intensidad para evitar sobreentrenamiento")
+    if avg_completion_rate < 0.7:
+        recommendations.append("Ajusta la dificultad de los ejercicios")
+    if days_since_last > 7:
+        recommendations.append("Retoma tu rutina de entrenamiento gradualmente")
+    if temporal['trend'] == 'declining' and temporal['volatility'] > 0.4:
+        recommendations.append("Patrón de decline detectado - considera reducir temporalmente la intensidad")
+    if temporal['trend'] == 'improving' and temporal['volatility'] < 0.2:
+        recommendations.append("Progreso estable detectado - considera incrementar gradualmente el desafío")
+    if temporal['volatility'] > 0.5:
+        recommendations.append("Rendimiento inconsistente - enfócate en la regularidad del entrenamiento")
+
+    final_ica = ica_score * NEW_USER_SAFETY_FACTOR if is_new else ica_score
+
+    return {
+        'ica_score': _js_round2(final_ica),
+        'adherence_rate': adherence_rate,
+        'recovery_factor': recovery_factor,
+        'progression_velocity': progression_velocity,
+        'detraining_factor': detraining_factor,
+        'recent_performance': {
+            'sessions_last_4_weeks': actual_sessions,
+            'avg_rpe': avg_rpe,
+            'avg_completion_rate': avg_completion_rate,
+            'avg_technical_quality': avg_technical_quality,
+        },
+        'user_state': {
+            'current_fitness_level': base_fitness * 10,
+            'fatigue_level': _or(fatigue_level, 3),
+            'last_training_date': last_session['session_date'] if last_session else None,
+            'days_since_last_training': days_since_last,
+        },
+        'recommendations': recommendations,
+        'temporal_context': _temporal_context_output(temporal, raw_ica),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Vectorized cohort scoring
+# ---------------------------------------------------------------------------
+
+@dataclass
+class CohortArrays:
+    """
+    Columnar inputs for score_cohort
+
+    Per-user arrays have length n_users. Missing optional values are NaN
+    (NaN and 0 are both treated as "not provided", like the TypeScript code).
+    Ages are fractional days before `now` (e.g. (now - session_date) / 1 day).
+
+    Per-user:
+        fitness_level: Fitness multiplier (FITNESS_LEVELS value, NaN if unknown)
+        available_days_per_week, experience_years, age, current_fitness_score,
+        sleep_quality, sleep_hours, fatigue_level, hrv_trend, resting_hr,
+        training_hr_avg: Profile and latest biometric values
+        avg_progression_level: Mean current_level of active progressions (NaN if none)
+
+    Per session (newest-first order is not required):
+        session_user: User index of each session
+        session_age_days: Age of each session in days
+        session_completed: Whether the session status is 'completed'
+
+    Per session exercise:
+        exercise_session: Session index of each exercise
+        sets_completed, reps_completed, sets_planned, reps_planned,
+        rpe_reported, technical_quality: session_exercises columns
+
+    Per algorithm history entry:
+        history_user: User index of each entry
+        history_age_days: Age of each calculation_date in days
+        history_ica: current_ica of each entry
+    """
+    fitness_level: np.ndarray
+    available_days_per_week: np.ndarray
+    experience_years: np.ndarray
+    age: np.ndarray
+    current_fitness_score: np.ndarray
+    sleep_quality: np.ndarray
+    sleep_hours: np.ndarray
+    fatigue_level: np.ndarray
+    hrv_trend: np.ndarray
+    resting_hr: np.ndarray
+    training_hr_avg: np.ndarray
+    avg_progression_level: np.ndarray
+
+    session_user: np.ndarray
+    session_age_days: np.ndarray
+    session_completed: np.ndarray
+
+    exercise_session: np.ndarray
+    sets_completed: np.ndarray
+    reps_completed: np.ndarray
+    sets_planned: np.ndarray
+    reps_planned: np.ndarray
+    rpe_reported: np.ndarray
+    technical_quality: np.ndarray
+
+    history_user: np.ndarray
+    history_age_days: np.ndarray
+    history_ica: np.ndarray
+
+    @property
+    def n_users(self) -> int:
+        return len(self.fitness_level)
+
+
+def _np_truthy(values: np.ndarray) -> np.ndarray:
+    return ~np.isnan(values) & (values != 0)
+
+
+def _np_or(values: np.ndarray, default: Any) -> np.ndarray:
+    return np.where(_np_truthy(values), values, default)
+
+
+def _np_round2(values: np.ndarray) -> np.ndarray:
+    return np.floor(values * 100 + 0.5) / 100
+
+
+def _row_mean(values: np.ndarray) -> np.ndarray:
+    """Mean of the non-NaN values in each row (NaN for empty rows)"""
+    present = ~np.isnan(values)
+    counts = present.sum(axis=1)
+    totals = np.where(present, values, 0.0).sum(axis=1)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+
+def _group_sum(index: np.ndarray, values: np.ndarray, n: int) -> np.ndarray:
+    return np.bincount(index, weights=values, minlength=n)
+
+
+def _temporal_context_arrays(c: CohortArrays) -> Dict[str, np.ndarray]:
+    """Vectorized analyze_temporal_context over every user's history"""
+    n = c.n_users
+    has_history = np.bincount(c.history_user, minlength=n) > 0
+
+    # Newest-first dense (n_users, 6) matrices of the last six calculations
+    order = np.lexsort((c.history_age_days, c.history_user))
+    users = c.history_user[order]
+    ages = c.history_age_days[order]
+    icas = c.history_ica[order].astype(float)
+
+    group_start = np.searchsorted(users, np.arange(n))
+    rank = np.arange(len(users)) - group_start[users]
+    keep = rank < 6
+
+    recent_ica = np.full((n, 6), np.nan)
+    recent_age = np.full((n, 6), np.nan)
+    recent_ica[users[keep], rank[keep]] = icas[keep]
+    recent_age[users[keep], rank[keep]] = ages[keep]
+
+    last_ica = recent_ica[:, 0]
+    with np.errstate(invalid='ignore'):
+        days_since = np.where(has_history, np.floor(recent_age[:, 0]), np.inf)
+
+    # Entries within the last two weeks form a prefix of the newest-first rows
+    with np.errstate(invalid='ignore'):
+        in_window = recent_age <= 14
+    k = in_window.sum(axis=1)
+    windowed = np.where(in_window, recent_ica, np.nan)
+
+    enough = k >= 3
+    with np.errstate(invalid='ignore', divide='ignore'):
+        window_mean = _row_mean(np.where(enough[:, None], windowed, np.nan))
+        window_std = np.sqrt(_row_mean((windowed - window_mean[:, None]) ** 2))
+        volatility_window = window_std / window_mean
+
+        # Trend: the three newest values vs every value except the two newest
+        recent_avg = recent_ica[:, :3].mean(axis=1)
+        older = windowed.copy()
+        older[:, :2] = np.nan
+        older_avg = _row_mean(older)
+        change = (recent_avg - older_avg) / older_avg
+
+    trend = np.full(n, 'stable', dtype=object)
+    trend[enough & (change > 0.08)] = 'improving'
+    trend[enough & (change < -0.08)] = 'declining'
+
+    low_volatility = volatility_window < 0.3
+    trend_adjustment = np.select(
+        [trend == 'improving', trend == 'declining'],
+        [np.where(low_volatility, 0.15, 0.05), np.where(low_volatility, -0.10, -0.05)],
+        0.0,
+    )
+
+    average_all = _row_mean(recent_ica)
+
+    volatility = np.where(enough, volatility_window, np.where(has_history, 0.2, 0.0))
+    stability = np.where(enough, np.maximum(0.7, 1.0 - volatility_window * 0.5),
+                         np.where(has_history, 0.9, 1.0))
+    average_ica = np.where(enough, window_mean, np.where(has_history, average_all, np.nan))
+
+    return {
+        'has_previous': has_history,
+        'trend': trend,
+        'volatility': volatility,
+        'stability_factor': stability,
+        'trend_adjustment': np.where(has_history, trend_adjustment, 0.0),
+        'last_ica': np.where(has_history, last_ica, np.nan),
+        'average_ica': average_ica,
+        'days_since_last_calculation': days_since,
+    }
+
+
+def score_cohort(c: CohortArrays) -> Dict[str, np.ndarray]:
+    """
+    Score a whole cohort in one vectorized pass
+
+    Equivalent to calling calculate_ica once per user, but operating on
+    columnar arrays so 100k+ users can be rescored in seconds.
+
+    Args:
+        c: Columnar cohort inputs
+
+    Returns:
+        Dict of per-user arrays: ica_score, raw_ica_score, adherence_rate,
+        recovery_factor, progression_velocity, detraining_factor,
+        sessions_last_4_weeks, avg_rpe, avg_completion_rate,
+        avg_technical_quality, current_fitness_level,
+        days_since_last_training, trend, volatility, is_new_user
+    """
+    n = c.n_users
+    temporal = _temporal_context_arrays(c)
+
+    n_sessions = np.bincount(c.session_user, minlength=n)
+    n_completed = np.bincount(c.session_user, weights=c.session_completed.astype(float), minlength=n)
+    is_new = n_completed < NEW_USER_THRESHOLD_SESSIONS
+    no_sessions = n_sessions == 0
+
+    # Adherence over the last 4 weeks
+    session_recent = c.session_completed & (c.session_age_days <= 28)
+    actual_sessions = np.bincount(c.session_user, weights=session_recent.astype(float), minlength=n)
+    expected_sessions = np.floor(28 / 7 * _np_or(c.available_days_per_week, 3))
+    adherence_rate = np.minimum(actual_sessions / np.maximum(expected_sessions, 1), 1.0)
+
+    # Recovery factor
+    sleep_quality_factor = np.where(_np_truthy(c.sleep_quality), c.sleep_quality / 5 * 0.25, 0.6)
+    sleep_duration_factor = np.where(
+        _np_truthy(c.sleep_hours),
+        np.where(c.sleep_hours >= 7, 0.25, np.where(c.sleep_hours >= 6, 0.15, 0.05)),
+        0.15,
+    )
+    fatigue_factor = np.where(_np_truthy(c.fatigue_level), (1 - (c.fatigue_level - 1) / 4) * 0.25, 0.6)
+    hrv_factor = np.where(_np_truthy(c.hrv_trend), np.clip(c.hrv_trend * 0.25, 0.05, 0.25), 0.15)
+    recovery_factor = np.maximum(sleep_quality_factor + sleep_duration_factor + fatigue_factor + hrv_factor, 0.3)
+
+    # Exercise aggregates over completed sessions in the last 4 weeks
+    exercise_user = c.session_user[c.exercise_session]
+    counted = (
+        session_recent[c.exercise_session] &
+        _np_truthy(c.sets_completed) & _np_truthy(c.reps_completed)
+    )
+    with np.errstate(invalid='ignore', divide='ignore'):
+        completion = np.minimum(
+            (c.sets_completed * c.reps_completed) / (c.sets_planned * c.reps_planned), 1
+        )
+    weights = counted.astype(float)
+    n_counted = _group_sum(exercise_user, weights, n)
+    has_counted = n_counted > 0
+    safe_n = np.where(has_counted, n_counted, 1)
+
+    avg_rpe = np.where(has_counted, _group_sum(exercise_user, weights * _np_or(c.rpe_reported, 5), n) / safe_n, 5.0)
+    avg_completion_rate = np.where(
+        has_counted, _group_sum(exercise_user, np.where(counted, completion, 0.0), n) / safe_n, 0.5
+    )
+    avg_technical_quality = np.where(
+        has_counted, _group_sum(exercise_user, weights * _np_or(c.technical_quality, 3), n) / safe_n, 3.0
+    )
+
+    progression_velocity = np.minimum(
+        avg_completion_rate * 0.4 + (6 - np.abs(avg_rpe - 7)) / 6 * 0.3 + avg_technical_quality / 5 * 0.3,
+        2.0,
+    )
+
+    # Detraining from the most recent completed session
+    latest_completed_age = np.full(n, np.inf)
+    np.minimum.at(latest_completed_age, c.session_user[c.session_completed], c.session_age_days[c.session_completed])
+    days_since_last = np.where(np.isfinite(latest_completed_age), np.floor(latest_completed_age), 30)
+    detraining_factor = np.maximum(1 - (days_since_last / 14) * 0.1, 0.7)
+
+    # Dynamic fitness score
+    initial_fitness = _np_or(c.current_fitness_score, c.fitness_level * 2.5)
+    has_progressions = ~np.isnan(c.avg_progression_level)
+    weeks_training = np.maximum(n_sessions / 3, 1)
+    dynamic_score = (
+        (1 + c.avg_progression_level) * 0.4 +
+        (np.minimum(avg_completion_rate * 4, 4) +
+         np.maximum(4 - np.abs(avg_rpe - 6.5), 0) / 4 * 2 +
+         avg_technical_quality / 5 * 2) * 0.3 +
+        np.minimum(n_completed / weeks_training / 3, 1) * 2 * 0.2 +
+        np.minimum(weeks_training / 24, 1) * 0.1 +
+        2.0
+    )
+    dynamic_fitness_score = np.where(
+        no_sessions | ~has_progressions,
+        np.maximum(initial_fitness, 2.0),
+        np.clip(dynamic_score, 2.0, 10.0),
+    )
+
+    fitness_multiplier = _np_or(c.fitness_level, 1.0)
+    base_fitness = dynamic_fitness_score / 10
+
+    raw_ica = np.maximum(
+        base_fitness * fitness_multiplier * adherence_rate * recovery_factor * progression_velocity / detraining_factor,
+        0.1,
+    )
+
+    # Temporal smoothing
+    has_previous = temporal['has_previous']
+    last_ica = temporal['last_ica']
+    days = temporal['days_since_last_calculation']
+    last_truthy = _np_truthy(last_ica)
+
+    temporal_ica = np.where(has_previous, raw_ica * temporal['stability_factor'] + temporal['trend_adjustment'], raw_ica)
+    smooth = has_previous & last_truthy & (days <= 7)
+    temporal_ica = np.where(smooth, temporal_ica * 0.7 + last_ica * 0.3, temporal_ica)
+
+    clamp = has_previous & last_truthy & (days <= 3)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        max_change = 0.25 * days / 3
+        change = (temporal_ica - last_ica) / last_ica
+        clamped = last_ica * (1 + np.copysign(max_change, change))
+    temporal_ica = np.where(clamp & (np.abs(change) > max_change), clamped, temporal_ica)
+
+    ica_score = np.maximum(temporal_ica, 0.1)
+    final_ica = np.where(is_new, ica_score * NEW_USER_SAFETY_FACTOR, ica_score)
+
+    # Brand new users (no sessions) use the conservative baseline
+    base_ica = 0.8 * fitness_multiplier
+    experience_bonus = np.minimum(0.3, c.experience_years * 0.1)
+    age_factor = np.where(_np_truthy(c.age), np.maximum(0.8, 1.2 - (c.age - 25) * 0.01), 1.0)
+    has_hr = _np_truthy(c.resting_hr) & _np_truthy(c.training_hr_avg)
+    hr_reserve = c.training_hr_avg - c.resting_hr
+    cardiovascular_bonus = np.where(has_hr & (hr_reserve > 100), 0.1, np.where(has_hr & (hr_reserve < 60), -0.1, 0.0))
+    new_user_ica = np.clip((base_ica + experience_bonus + cardiovascular_bonus) * age_factor, 0.1, 2.0)
+
+    return {
+        'ica_score': _np_round2(np.where(no_sessions, new_user_ica, final_ica)),
+        'raw_ica_score': _np_round2(np.where(no_sessions, new_user_ica, raw_ica)),
+        'adherence_rate': np.where(no_sessions, 1.0, adherence_rate),
+        'recovery_factor': np.where(no_sessions, 0.8, recovery_factor),
+        'progression_velocity': np.where(no_sessions, 1.0, progression_velocity),
+        'detraining_factor': np.where(no_sessions, 1.0, detraining_factor),
+        'sessions_last_4_weeks': actual_sessions.astype(int),
+        'avg_rpe': np.where(no_sessions, 5.0, avg_rpe),
+        'avg_completion_rate': np.where(no_sessions, 1.0, avg_completion_rate),
+        'avg_technical_quality': np.where(no_sessions, 3.5, avg_technical_quality),
+        'current_fitness_level': np.where(no_sessions, c.fitness_level * 2, base_fitness * 10),
+        'days_since_last_training': np.where(no_sessions, np.nan, days_since_last),
+        'trend': temporal['trend'],
+        'volatility': temporal['volatility'],
+        'is_new_user': is_new,
+    }
+
+
+def _float_or_nan(value: Any) -> float:
+    return math.nan if value is None else float(value)
+
+
+def cohort_from_records(users: List[Dict], now: Optional[datetime] = None) -> CohortArrays:
+    """
+    Build CohortArrays from per-user calculate_ica inputs
+
+    Convenient for modest cohorts or tests; nightly jobs should build the
+    columns directly from a database export instead.
+
+    Args:
+        users: Dicts with profile, progressions, recent_sessions and algorithm_history
+        now: Reference time used to compute ages (defaults to the current UTC time)
+
+    Returns:
+        CohortArrays with one row per user, in input order
+    """
+    now = _now(now)
+
+    def age_days(value: Any) -> float:
+        return (now - _parse_date(value)).total_seconds() / DAY_SECONDS
+
+    profile_fields = (
+        'available_days_per_week', 'experience_years', 'age', 'current_fitness_score',
+        'sleep_quality', 'sleep_hours', 'fatigue_level', 'hrv_trend', 'resting_hr', 'training_hr_avg',
+    )
+    columns: Dict[str, List] = {name: [] for name in profile_fields}
+    fitness_level, avg_progression_level = [], []
+    session_user, session_age, session_completed = [], [], []
+    exercise_session = []
+    exercise_columns: Dict[str, List] = {
+        name: [] for name in ('sets_completed', 'reps_completed', 'sets_planned', 'reps_planned',
+                              'rpe_reported', 'technical_quality')
+    }
+    history_user, history_age, history_ica = [], [], []
+
+    for user_index, user in enumerate(users):
+        profile = user['profile']
+        fitness_level.append(FITNESS_LEVELS.get(profile.get('fitness_level'), math.nan))
+        for name in profile_fields:
+            columns[name].append(_float_or_nan(profile.get(name)))
+
+        progressions = user.get('progressions') or []
+        avg_progression_level.append(
+            sum(p['current_level'] for p in progressions) / len(progressions) if progressions else math.nan
+        )
+
+        for session in user.get('recent_sessions') or []:
+            session_index = len(session_user)
+            session_user.append(user_index)
+            session_age.append(age_days(session['session_date']))
+            session_completed.append(session.get('status') == 'completed')
+            for se in session.get('session_exercises') or []:
+                exercise_session.append(session_index)
+                for name, values in exercise_columns.items():
+                    value = se.get(name)
+                    # A missing plan multiplies to 0 in JS, like an explicit 0
+                    values.append(0.0 if value is None and name.endswith('_planned') else _float_or_nan(value))
+
+        for entry in user.get('algorithm_history') or []:
+            history_user.append(user_index)
+            history_age.append(age_days(entry['calculation_date']))
+            history_ica.append(float(entry['current_ica']))
+
+    return CohortArrays(
+        fitness_level=np.array(fitness_level),
+        avg_progression_level=np.array(avg_progression_level),
+        **{name: np.array(values) for name, values in columns.items()},
+        session_user=np.array(session_user, dtype=np.intp),
+        session_age_days=np.array(session_age, dtype=float),
+        session_completed=np.array(session_completed, dtype=bool),
+        exercise_session=np.array(exercise_session, dtype=np.intp),
+        **{name: np.array(values, dtype=float) for name, values in exercise_columns.items()},
+        history_user=np.array(history_user, dtype=np.intp),
+        history_age_days=np.array(history_age, dtype=float),
+        history_ica=np.array(history_ica, dtype=float),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Parity with the TypeScript implementation
+# ---------------------------------------------------------------------------
+
+DEFAULT_PARITY_FIXTURES = 'fixtures/ica_parity.json'
+
+# Fields compared between score_cohort and the TypeScript ICAData
+_COHORT_PARITY_FIELDS = {
+    'ica_score': ('ica_score',),
+    'raw_ica_score': ('temporal_context', 'raw_ica_score'),
+    'adherence_rate': ('adherence_rate',),
+    'recovery_factor': ('recovery_factor',),
+    'progression_velocity': ('progression_velocity',),
+    'detraining_factor': ('detraining_factor',),
+    'sessions_last_4_weeks': ('recent_performance', 'sessions_last_4_weeks'),
+    'avg_rpe': ('recent_performance', 'avg_rpe'),
+    'avg_completion_rate': ('recent_performance', 'avg_completion_rate'),
+    'avg_technical_quality': ('recent_performance', 'avg_technical_quality'),
+    'current_fitness_level': ('user_state', 'current_fitness_level'),
+    'days_since_last_training': ('user_state', 'days_since_last_training'),
+    'trend': ('temporal_context', 'trend'),
+    'volatility': ('temporal_context', 'volatility'),
+}
+
+
+def _values_match(actual: Any, expected: Any, tolerance: float) -> bool:
+    if isinstance(actual, dict) and isinstance(expected, dict):
+        return (actual.keys() == expected.keys() and
+                all(_values_match(actual[k], expected[k], tolerance) for k in expected))
+    if isinstance(actual, list) and isinstance(expected, list):
+        return len(actual) == len(expected) and all(_values_match(a, e, tolerance) for a, e in zip(actual, expected))
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float, np.number)) \
+            and not isinstance(expected, bool):
+        if math.isnan(expected) or math.isnan(actual):
+            return math.isnan(expected) and math.isnan(actual)
+        if math.isinf(expected) or math.isinf(actual):
+            return expected == actual
+        return abs(actual - expected) <= tolerance
+    if expected is None and isinstance(actual, (float, np.floating)):
+        # JSON has no NaN: the TypeScript NaN/undefined fields are captured as null
+        return math.isnan(actual)
+    return actual == expected
+
+
+def load_parity_fixtures(path: str = DEFAULT_PARITY_FIXTURES) -> Dict:
+    """Load fixtures captured by tests/capture-ica-fixtures.ts"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _record_from_fixture(case: Dict) -> Dict:
+    data = case['input']
+    return {
+        'profile': data['profile'],
+        'progressions': data['progressions'],
+        'recent_sessions': data['recentSessions'],
+        'wellness_logs': data.get('wellnessLogs'),
+        'algorithm_history': data.get('algorithmHistory'),
+    }
+
+
+def verify_parity(path: str = DEFAULT_PARITY_FIXTURES, tolerance: float = 1e-9) -> List[str]:
+    """
+    Check calculate_ica and score_cohort against the TypeScript outputs
+
+    Args:
+        path: Fixture file with inputs and expected calculateICA outputs
+        tolerance: Absolute tolerance for floating point fields
+
+    Returns:
+        Human-readable mismatch descriptions (empty when both ports match)
+    """
+    fixtures = load_parity_fixtures(path)
+    now = _parse_date(fixtures['now'])
+    cases = fixtures['cases']
+    records = [_record_from_fixture(case) for case in cases]
+    mismatches = []
+
+    for case, record in zip(cases, records):
+        actual = calculate_ica(now=now, **record)
+        if not _values_match(actual, case['expected'], tolerance):
+            mismatches.append(f"{case['name']}: calculate_ica differs from TypeScript")
+
+    scores = score_cohort(cohort_from_records(records, now))
+    for index, case in enumerate(cases):
+        for field_name, path_keys in _COHORT_PARITY_FIELDS.items():
+            expected = case['expected']
+            for key in path_keys:
+                expected = expected[key]
+            actual = scores[field_name][index]
+            if not _values_match(actual.item() if hasattr(actual, 'item') else actual, expected, tolerance):
+                mismatches.append(f"{case['name']}: score_cohort {field_name}={actual!r}, expected {expected!r}")
+
+    return mismatches
+
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    fixture_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_PARITY_FIXTURES)
+    problems = verify_parity(fixture_path)
+    if problems:
+        for problem in problems:
+            print(f"❌ {problem}")
+        raise SystemExit(1)
+    print(f"✅ Python ICA matches TypeScript on {len(load_parity_fixtures(fixture_path)['cases'])} fixtures")
+
+    # Rescoring throughput on a synthetic cohort built from the fixtures
+    fixtures = load_parity_fixtures(fixture_path)
+    now = _parse_date(fixtures['now'])
+    records = [_record_from_fixture(case) for case in fixtures['cases']] * 2000
+    cohort = cohort_from_records(records, now)
+    started = time.perf_counter()
+    scores = score_cohort(cohort)
+    elapsed = time.perf_counter() - started
+    print(f"⚡ Scored {cohort.n_users} users in {elapsed:.2f}s ({cohort.n_users / elapsed:,.0f} users/s)")
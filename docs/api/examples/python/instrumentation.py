@@ -0,0 +1,300 @@
+"""
+Bodyweight Training API - Client Instrumentation
+Request hooks, per-endpoint latency histograms, counters and metric exporters
+"""
+
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from codec import JSONCodec
+from models import RawJSON
+
+
+# Histogram bucket upper bounds in seconds (Prometheus-style, cumulative)
+DEFAULT_LATENCY_BUCKETS = (
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+@dataclass
+class RequestEvent:
+    """Outcome of a single HTTP request, passed to post-request hooks"""
+    endpoint: str
+    method: str
+    duration: float
+    status_code: Optional[int] = None
+    request_bytes: int = 0
+    response_bytes: int = 0
+    error: Optional[Exception] = None
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram with interpolated percentiles
+
+    Memory use is constant regardless of how many requests are observed.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0-100) by linear interpolation within its bucket"""
+        if self.count == 0:
+            return 0.0
+
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+
+class EndpointMetrics:
+    """Counters and latency histogram for one endpoint"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.latency = LatencyHistogram(buckets)
+        self.requests = 0
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.status_codes: Dict[int, int] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "status_codes": dict(self.status_codes),
+            "latency": {
+                "count": self.latency.count,
+                "sum": self.latency.sum,
+                "max": self.latency.max,
+                "p50": self.latency.percentile(50),
+                "p95": self.latency.percentile(95),
+                "p99": self.latency.percentile(99),
+                "buckets": list(zip(self.latency.buckets, self.latency.counts)),
+                "overflow": self.latency.counts[-1],
+            },
+        }
+
+
+class RequestProbe:
+    """Context manager timing one request; created by Instrumentation.track"""
+
+    def __init__(self, instrumentation: 'Instrumentation', endpoint: str, method: str):
+        self.instrumentation = instrumentation
+        self.event = RequestEvent(endpoint=endpoint, method=method.upper(), duration=0.0)
+        self._started = 0.0
+
+    def record_response(self, status_code: int, request_bytes: int, response_bytes: int) -> None:
+        self.event.status_code = status_code
+        self.event.request_bytes = request_bytes
+        self.event.response_bytes = response_bytes
+
+    def __enter__(self) -> 'RequestProbe':
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.event.duration = time.perf_counter() - self._started
+        self.event.error = exc
+        self.instrumentation.record_request(self.event)
+
+
+class Instrumentation:
+    """
+    Per-endpoint request metrics with pre/post-request hooks
+
+    Pass one instance to a client (or share it between clients) to collect
+    latency histograms, payload sizes and retry/cache counters per endpoint.
+    Clients without instrumentation skip all of this.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.pre_request_hooks: List[Callable[[str, str, Optional[Dict]], None]] = []
+        self.post_request_hooks: List[Callable[[RequestEvent], None]] = []
+        self._endpoints: Dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def add_pre_request_hook(self, hook: Callable[[str, str, Optional[Dict]], None]) -> None:
+        """Register hook(endpoint, method, payload) called before each HTTP request"""
+        self.pre_request_hooks.append(hook)
+
+    def add_post_request_hook(self, hook: Callable[[RequestEvent], None]) -> None:
+        """Register hook(event) called after each HTTP request, successful or not"""
+        self.post_request_hooks.append(hook)
+
+    def _metrics_for(self, endpoint: str) -> EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = EndpointMetrics(self.buckets)
+        return metrics
+
+    def track(self, endpoint: str, method: str, payload: Optional[Dict] = None) -> RequestProbe:
+        """Run pre-request hooks and return a probe timing the request"""
+        for hook in self.pre_request_hooks:
+            hook(endpoint, method, payload)
+        return RequestProbe(self, endpoint, method)
+
+    def record_request(self, event: RequestEvent) -> None:
+        with self._lock:
+            metrics = self._metrics_for(event.endpoint)
+            metrics.requests += 1
+            metrics.latency.observe(event.duration)
+            metrics.request_bytes += event.request_bytes
+            metrics.response_bytes += event.response_bytes
+            if event.status_code is not None:
+                metrics.status_codes[event.status_code] = metrics.status_codes.get(event.status_code, 0) + 1
+            if event.error is not None:
+                metrics.errors += 1
+
+        for hook in self.post_request_hooks:
+            hook(event)
+
+    def record_retry(self, endpoint: str) -> None:
+        with self._lock:
+            self._metrics_for(endpoint).retries += 1
+
+    def record_cache_hit(self, endpoint: str) -> None:
+        with self._lock:
+            self._metrics_for(endpoint).cache_hits += 1
+
+    def record_cache_miss(self, endpoint: str) -> None:
+        with self._lock:
+            self._metrics_for(endpoint).cache_misses += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a point-in-time copy of every endpoint's metrics"""
+        with self._lock:
+            return {endpoint: metrics.to_dict() for endpoint, metrics in self._endpoints.items()}
+
+    def export(self, exporter: 'MetricsExporter') -> Any:
+        return exporter.export(self.snapshot())
+
+
+class RequestRecorder:
+    """
+    Pre-request hook appending every HTTP request to an NDJSON log
+
+    Each line holds the wall-clock time, method, endpoint and payload of one
+    request (retries included, cache hits excluded), which is what
+    `bulk.py replay` sends again. Payloads are recorded as-is, so the log
+    contains user data but no tokens.
+
+    Usage:
+        with RequestRecorder('requests.ndjson') as recorder:
+            instrumentation.add_pre_request_hook(recorder)
+            ...
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.recorded = 0
+        self._codec = JSONCodec()
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __call__(self, endpoint: str, method: str, payload: Optional[Dict]) -> None:
+        # Payloads may carry RawJSON fragments (columnar exercise performance)
+        body = RawJSON(self._codec.encode_payload(payload))
+        line = self._codec.encode_payload({"ts": time.time(), "method": method.upper(), "endpoint": endpoint,
+                                           "payload": body}).decode('utf-8')
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> 'RequestRecorder':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class MetricsExporter:
+    """Base class for metric exporters"""
+
+    def export(self, snapshot: Dict[str, Dict[str, Any]]) -> Any:
+        raise NotImplementedError
+
+
+class InMemoryExporter(MetricsExporter):
+    """Keeps every exported snapshot, e.g. for tests or periodic dashboards"""
+
+    def __init__(self):
+        self.snapshots: List[Dict[str, Any]] = []
+
+    def export(self, snapshot: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        self.snapshots.append({"timestamp": time.time(), "endpoints": snapshot})
+        return snapshot
+
+
+class PrometheusTextExporter(MetricsExporter):
+    """Renders metrics in the Prometheus text exposition format"""
+
+    def __init__(self, prefix: str = "bodyweight_client"):
+        self.prefix = prefix
+
+    def export(self, snapshot: Dict[str, Dict[str, Any]]) -> str:
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_request_duration_seconds Request latency per endpoint",
+            f"# TYPE {p}_request_duration_seconds histogram",
+        ]
+        for endpoint, metrics in sorted(snapshot.items()):
+            latency = metrics["latency"]
+            cumulative = 0
+            for bound, count in latency["buckets"]:
+                cumulative += count
+                lines.append(f'{p}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'{p}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {latency["count"]}')
+            lines.append(f'{p}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {latency["sum"]}')
+            lines.append(f'{p}_request_duration_seconds_count{{endpoint="{endpoint}"}} {latency["count"]}')
+
+        counters = (
+            ("requests_total", "requests", "HTTP requests sent"),
+            ("errors_total", "errors", "Requests that raised an error"),
+            ("request_bytes_total", "request_bytes", "Request payload bytes sent"),
+            ("response_bytes_total", "response_bytes", "Response body bytes received"),
+            ("retries_total", "retries", "Retries attempted"),
+            ("cache_hits_total", "cache_hits", "Responses served from the cache"),
+            ("cache_misses_total", "cache_misses", "Cache lookups that missed"),
+        )
+        for name, key, help_text in counters:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} counter")
+            for endpoint, metrics in sorted(snapshot.items()):
+                lines.append(f'{p}_{name}{{endpoint="{endpoint}"}} {metrics[key]}')
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,408 @@
+"""
+Bodyweight Training API - Write-behind Journal
+Durable local queue for feedback, progression and biometric writes, replayed in the background
+
+Writes are committed to a sqlite journal and the call returns at once; a
+worker thread sends them in order, and whatever is still in the journal
+when the process stops is sent after the next start:
+
+    with WriteBehindQueue(client, 'writes.db') as writes:
+        writes.save_session_feedback(session_id, feedback, performance)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+from bodyweight_client import (
+    IDEMPOTENCY_HEADER,
+    APIError,
+    BiometricData,
+    BodyweightTrainingClient,
+    PerformanceRows,
+    SessionFeedback,
+    feedback_payload,
+    logger,
+)
+from codec import JSONCodec
+from models import RawJSON
+from ratelimit import backoff_delay
+
+# Endpoints whose writes may be deferred
+WRITE_BEHIND_ENDPOINTS = frozenset({
+    "/save-session-feedback",
+    "/update-progressions",
+    "/update-biometrics",
+})
+
+
+@dataclass
+class JournalEntry:
+    """One queued write; body is the request payload as stored, already JSON-encoded"""
+    seq: int
+    idempotency_key: str
+    user_id: str
+    endpoint: str
+    body: str
+    created_at: float
+    attempts: int = 0
+    last_error: Optional[str] = None
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        """The decoded request payload"""
+        return json.loads(self.body)
+
+
+class WriteJournal:
+    """
+    Append-only sqlite journal of pending writes
+
+    Every append is committed with synchronous=FULL before it returns, so an
+    acknowledged write survives a crash or power loss. Entries keep their
+    idempotency key across restarts, so a write that reached the server just
+    before a crash is replayed with the same key; the write endpoints answer
+    a key they have already applied with the stored response instead of
+    applying it again (supabase/functions/_shared/idempotency.ts). One
+    journal may hold the writes of several users.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: sqlite database file path
+        """
+        self.path = path
+        self._codec = JSONCodec()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS write_journal ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " idempotency_key TEXT NOT NULL UNIQUE,"
+            " user_id TEXT NOT NULL,"
+            " endpoint TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " last_error TEXT,"
+            " failed INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS write_journal_pending ON write_journal (user_id, failed, seq)"
+        )
+        self._conn.commit()
+
+    def append(self, user_id: str, endpoint: str, payload: Dict[str, Any]) -> JournalEntry:
+        """Durably record a write and return it with its new idempotency key"""
+        key = str(uuid.uuid4())
+        now = time.time()
+        body = self._codec.encode_payload(payload).decode('utf-8')
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO write_journal (idempotency_key, user_id, endpoint, payload, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, user_id, endpoint, body, now),
+            )
+            self._conn.commit()
+        return JournalEntry(cursor.lastrowid, key, user_id, endpoint, body, now)
+
+    def pending(self, user_id: str, limit: int = 100) -> List[JournalEntry]:
+        """Oldest pending writes of a user"""
+        return self._select("WHERE user_id = ? AND failed = 0 ORDER BY seq LIMIT ?", (user_id, limit))
+
+    def failed(self, user_id: Optional[str] = None) -> List[JournalEntry]:
+        """Writes the server rejected, kept for inspection"""
+        if user_id is None:
+            return self._select("WHERE failed = 1 ORDER BY seq", ())
+        return self._select("WHERE user_id = ? AND failed = 1 ORDER BY seq", (user_id,))
+
+    def _select(self, where: str, params: tuple) -> List[JournalEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, idempotency_key, user_id, endpoint, payload, created_at, attempts, last_error"
+                " FROM write_journal " + where, params
+            ).fetchall()
+        return [JournalEntry(seq, key, user_id, endpoint, body, created_at, attempts, error)
+                for seq, key, user_id, endpoint, body, created_at, attempts, error in rows]
+
+    def pending_users(self) -> List[str]:
+        """Users with pending writes, e.g. to start their queues after a restart"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT user_id FROM write_journal WHERE failed = 0 ORDER BY user_id"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, user_id: Optional[str] = None) -> int:
+        """Number of pending writes, for one user or in total"""
+        with self._lock:
+            if user_id is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM write_journal WHERE failed = 0").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM write_journal WHERE user_id = ? AND failed = 0", (user_id,)
+                ).fetchone()
+        return row[0]
+
+    def ack(self, seq: int) -> None:
+        """Remove a write the server accepted (or that should be discarded)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM write_journal WHERE seq = ?", (seq,))
+            self._conn.commit()
+
+    def record_attempt(self, seq: int, error: str, failed: bool = False) -> None:
+        """Record a failed attempt; failed=True takes the write out of the queue"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE write_journal SET attempts = attempts + 1, last_error = ?, failed = ? WHERE seq = ?",
+                (error, int(failed), seq),
+            )
+            self._conn.commit()
+
+    def requeue_failed(self, user_id: str) -> int:
+        """Put a user's rejected writes back in the queue; returns how many"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE write_journal SET failed = 0 WHERE user_id = ? AND failed = 1", (user_id,)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class WriteBehindStats:
+    """Counters for a WriteBehindQueue"""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.sent = 0
+        self.rejected = 0
+        self.retries = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "rejected": self.rejected,
+            "retries": self.retries,
+        }
+
+
+def _is_retryable(error: APIError) -> bool:
+    """
+    Connection failures, timeouts, 401 (token refresh pending), 409 (the same
+    idempotency key is still being applied), 429 and 5xx are retried
+    """
+    return error.status_code is None or error.status_code in (401, 408, 409, 429) or error.status_code >= 500
+
+
+class WriteBehindQueue:
+    """
+    Deferred writes for one user, journaled locally and sent by a background worker
+
+    save_session_feedback, update_progressions and update_biometrics return
+    the write's idempotency key as soon as it is journaled. The worker sends
+    pending writes oldest first, `batch_size` journal entries at a time, and
+    each write carries its key in an Idempotency-Key header. Each entry is
+    removed from the journal as soon as the server accepts it.
+
+    While the API is unreachable, rate limiting or failing with 5xx, the
+    worker backs off and retries the same write, so later writes never
+    overtake earlier ones. A 401 is retried too, giving a token source time
+    to refresh the JWT, but only `max_auth_retries` times in a row: a revoked
+    token must not hold the queue forever. A write the server rejects
+    outright (another 4xx, or a 401 past that limit) is kept in the journal
+    as failed and skipped; see WriteJournal.failed and requeue_failed.
+
+    Writes left in the journal at shutdown are replayed when a queue for the
+    same user is opened on the same journal. Writes are filed under the
+    client's user_id, so give the client a verified user_id for them to be
+    found with a new token after a restart.
+    """
+
+    def __init__(self, client: BodyweightTrainingClient, journal: Union[str, WriteJournal],
+                 batch_size: int = 20,
+                 flush_interval: float = 1.0,
+                 retry_delay: float = 1.0,
+                 max_retry_delay: float = 60.0,
+                 max_auth_retries: int = 3):
+        """
+        Args:
+            client: Client used to send the writes
+            journal: WriteJournal instance or the path of its sqlite file
+            batch_size: Journal entries read per batch
+            flush_interval: Seconds between journal checks when no write wakes the worker
+            retry_delay: Initial backoff while the API is unavailable
+            max_retry_delay: Upper bound for the backoff (a longer Retry-After is still honored)
+            max_auth_retries: Consecutive 401s retried before the write is marked failed
+        """
+        self.client = client
+        self.user_id = client.user_id
+        self._owns_journal = isinstance(journal, str)
+        self.journal = WriteJournal(journal) if self._owns_journal else journal
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_auth_retries = max_auth_retries
+        self.stats = WriteBehindStats()
+
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._stop = threading.Event()
+        self._auth_failures = 0  # consecutive 401s for the write at the head of the queue
+        self._wake.set()  # replay what an earlier run left in the journal
+        self._worker = threading.Thread(target=self._run, name=f"write-behind-{self.user_id}", daemon=True)
+        self._worker.start()
+
+    @property
+    def pending(self) -> int:
+        return self.journal.count(self.user_id)
+
+    def enqueue(self, endpoint: str, payload: Dict[str, Any]) -> str:
+        """
+        Journal a write to be sent in the background
+
+        Raises:
+            ValueError: If the endpoint is not in WRITE_BEHIND_ENDPOINTS
+        """
+        if endpoint not in WRITE_BEHIND_ENDPOINTS:
+            raise ValueError(f"{endpoint} cannot be written behind")
+        if self._stop.is_set():
+            raise RuntimeError("WriteBehindQueue is closed")
+
+        entry = self.journal.append(self.user_id, endpoint, payload)
+        self.stats.enqueued += 1
+        self._idle.clear()
+        self._wake.set()
+        logger.debug(f"📥 Queued {endpoint} as {entry.idempotency_key}")
+        return entry.idempotency_key
+
+    def save_session_feedback(self, session_id: str, feedback: SessionFeedback,
+                              exercise_performance: Optional[PerformanceRows] = None) -> str:
+        """Queue save-session-feedback; returns the write's idempotency key"""
+        return self.enqueue("/save-session-feedback", feedback_payload(session_id, feedback, exercise_performance))
+
+    def update_progressions(self, session_id: str, exercise_blocks: List[Dict]) -> str:
+        """Queue update-progressions; returns the write's idempotency key"""
+        return self.enqueue("/update-progressions", {"sessionId": session_id, "exerciseBlocks": exercise_blocks})
+
+    def update_biometrics(self, biometric_data: BiometricData) -> str:
+        """Queue update-biometrics; returns the write's idempotency key"""
+        return self.enqueue("/update-biometrics", biometric_data.to_dict())
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every pending write has been sent or rejected
+
+        Returns:
+            False if writes were still pending when the timeout expired
+        """
+        self._idle.clear()
+        self._wake.set()
+        return self._idle.wait(timeout)
+
+    def _run(self) -> None:
+        failures = 0
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            try:
+                error = self._drain()
+            except Exception as e:  # keep the worker alive; the entries stay journaled
+                logger.error(f"Write-behind worker error: {e}")
+                error = APIError(str(e))
+
+            if error is None:
+                if failures:
+                    logger.info("📡 Queued writes resumed")
+                failures = 0
+                continue
+
+            delay = backoff_delay(failures, self.retry_delay, self.max_retry_delay, error.retry_after)
+            if delay is None:
+                # The writes stay queued either way, so honor a long Retry-After in full
+                delay = error.retry_after
+            log = logger.warning if failures == 0 else logger.debug
+            log(f"📡 Queued writes paused ({error.message}), retrying in {delay:.1f}s ({self.pending} pending)")
+            failures += 1
+            self.stats.retries += 1
+            self._stop.wait(delay)
+            self._wake.set()
+
+    def _drain(self) -> Optional[APIError]:
+        """Send pending writes until the journal is empty or a retryable error stops the queue"""
+        sent = 0
+        while not self._stop.is_set():
+            entries = self.journal.pending(self.user_id, self.batch_size)
+            if not entries:
+                if sent:
+                    logger.info(f"📤 Sent {sent} queued writes")
+                self._idle.set()
+                return None
+
+            for entry in entries:
+                if self._stop.is_set():
+                    # Closing: leave the rest journaled for the next start
+                    return None
+                try:
+                    # The stored body is sent as-is, without decoding and re-encoding it
+                    self.client.send(entry.endpoint, data=RawJSON(entry.body),
+                                     headers={IDEMPOTENCY_HEADER: entry.idempotency_key})
+                except APIError as e:
+                    self._auth_failures = self._auth_failures + 1 if e.status_code == 401 else 0
+                    if _is_retryable(e) and self._auth_failures <= self.max_auth_retries:
+                        self.journal.record_attempt(entry.seq, e.message)
+                        return e
+                    self._auth_failures = 0
+                    self.journal.record_attempt(entry.seq, e.message, failed=True)
+                    self.stats.rejected += 1
+                    logger.error(f"Queued {entry.endpoint} {entry.idempotency_key} rejected: {e.message}")
+                    continue
+
+                self._auth_failures = 0
+                self.journal.ack(entry.seq)
+                self.stats.sent += 1
+                sent += 1
+        return None
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """
+        Try to send pending writes, then stop the worker
+
+        Waits at most `timeout` seconds in total. Writes not sent by then stay
+        journaled for the next start; a request still in flight finishes in
+        the background.
+        """
+        if not self._stop.is_set():
+            deadline = None if timeout is None else time.monotonic() + timeout
+            self.flush(timeout)
+            self._stop.set()
+            self._wake.set()
+            self._worker.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if self._worker.is_alive():
+            # The worker is still waiting on a request; it stops after it, and
+            # the journal stays open so it can record the outcome
+            logger.debug(f"Write-behind worker for {self.user_id} still sending at close")
+            return
+        if self._owns_journal:
+            self.journal.close()
+
+    def __enter__(self) -> 'WriteBehindQueue':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,207 @@
+"""
+Bodyweight Training API - Compact Models
+Slotted, frozen record types, a columnar ExercisePerformance container and raw JSON fragments
+"""
+
+import json
+from array import array
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenBiometricData:
+    """Immutable, slotted BiometricData"""
+    weight: Optional[float] = None
+    body_fat_percentage: Optional[float] = None
+    resting_hr: Optional[int] = None
+    training_hr_avg: Optional[int] = None
+    sleep_hours: Optional[float] = None
+    sleep_quality: Optional[int] = None
+    fatigue_level: Optional[int] = None
+    age: Optional[int] = None
+    last_updated: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary, excluding None values"""
+        return _slots_to_dict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenSessionFeedback:
+    """Immutable, slotted SessionFeedback"""
+    rpe_reported: int
+    completion_rate: float
+    technical_quality: int
+    enjoyment_level: Optional[int] = None
+    recovery_feeling: Optional[int] = None
+    actual_duration: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary, excluding None values"""
+        return _slots_to_dict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenExercisePerformance:
+    """Immutable, slotted ExercisePerformance"""
+    sessionExerciseId: str
+    exerciseId: str
+    setNumber: int
+    repsCompleted: int
+    rpeReported: Optional[int] = None
+    techniqueQuality: Optional[int] = None
+    restTimeActual: Optional[int] = None
+    difficultyPerceived: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary, excluding None values"""
+        return _slots_to_dict(self)
+
+
+def _slots_to_dict(record) -> Dict:
+    result = {}
+    for name in type(record).__slots__:
+        value = getattr(record, name)
+        if value is not None:
+            result[name] = value
+    return result
+
+
+class RawJSON:
+    """
+    Already-encoded JSON placed in a request payload
+
+    JSONCodec.encode_payload splices the bytes in verbatim, so a large value
+    (e.g. ExercisePerformanceColumns.to_json()) is never decoded into
+    Python objects and encoded again.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data: Union[str, bytes]):
+        self.data = data.encode('utf-8') if isinstance(data, str) else data
+
+    def __repr__(self) -> str:
+        return f"RawJSON({len(self.data)} bytes)"
+
+
+# Stand-in for None in the optional integer columns (smallest 32-bit int)
+MISSING = -2 ** 31
+
+_REQUIRED_INT_FIELDS = ('setNumber', 'repsCompleted')
+_OPTIONAL_INT_FIELDS = ('rpeReported', 'techniqueQuality', 'restTimeActual', 'difficultyPerceived')
+
+
+class ExercisePerformanceColumns:
+    """
+    Struct-of-arrays container for large ExercisePerformance sets
+
+    Integer fields are stored in typed arrays (4 bytes per value) and the
+    repetitive ID strings are dictionary-encoded, so millions of rows cost a
+    small fraction of the equivalent list of dataclass instances. Rows
+    serialize straight to the API's exercisePerformance JSON without
+    building a per-row object or dict; feedback_payload sends that JSON as a
+    RawJSON fragment.
+    """
+
+    FIELDS = tuple(f.name for f in fields(FrozenExercisePerformance))
+
+    def __init__(self):
+        self._strings: List[str] = []
+        self._string_codes: Dict[str, int] = {}
+        self.session_exercise_ids = array('I')
+        self.exercise_ids = array('I')
+        self.columns: Dict[str, array] = {
+            name: array('i') for name in _REQUIRED_INT_FIELDS + _OPTIONAL_INT_FIELDS
+        }
+
+    @classmethod
+    def from_records(cls, records: Iterable[Union['FrozenExercisePerformance', object]]) -> 'ExercisePerformanceColumns':
+        """Build a container from ExercisePerformance-like objects (frozen or not)"""
+        columns = cls()
+        for record in records:
+            columns.append(record)
+        return columns
+
+    def _encode(self, value: str) -> int:
+        code = self._string_codes.get(value)
+        if code is None:
+            code = self._string_codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    def add(self, sessionExerciseId: str, exerciseId: str, setNumber: int, repsCompleted: int,
+            rpeReported: Optional[int] = None, techniqueQuality: Optional[int] = None,
+            restTimeActual: Optional[int] = None, difficultyPerceived: Optional[int] = None) -> None:
+        """Append one row from field values"""
+        self.session_exercise_ids.append(self._encode(sessionExerciseId))
+        self.exercise_ids.append(self._encode(exerciseId))
+        self.columns['setNumber'].append(setNumber)
+        self.columns['repsCompleted'].append(repsCompleted)
+        for name, value in zip(_OPTIONAL_INT_FIELDS,
+                               (rpeReported, techniqueQuality, restTimeActual, difficultyPerceived)):
+            self.columns[name].append(MISSING if value is None else value)
+
+    def append(self, record) -> None:
+        """Append one ExercisePerformance-like object"""
+        self.add(*(getattr(record, name) for name in self.FIELDS))
+
+    def extend(self, records: Iterable) -> None:
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self.session_exercise_ids)
+
+    def __getitem__(self, index: int) -> FrozenExercisePerformance:
+        values = [self._strings[self.session_exercise_ids[index]], self._strings[self.exercise_ids[index]]]
+        values.extend(self.columns[name][index] for name in _REQUIRED_INT_FIELDS)
+        values.extend(None if self.columns[name][index] == MISSING else self.columns[name][index]
+                      for name in _OPTIONAL_INT_FIELDS)
+        return FrozenExercisePerformance(*values)
+
+    def __iter__(self) -> Iterator[FrozenExercisePerformance]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the column arrays (excluding the string table)"""
+        arrays = [self.session_exercise_ids, self.exercise_ids, *self.columns.values()]
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def _encoded_strings(self) -> List[str]:
+        """The string table as JSON literals, indexed by string code"""
+        return [json.dumps(s) for s in self._strings]
+
+    def _iter_json_rows(self, encoded: List[str], start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        session_exercise_ids = self.session_exercise_ids
+        exercise_ids = self.exercise_ids
+        set_numbers = self.columns['setNumber']
+        reps = self.columns['repsCompleted']
+        optional = [(f',"{name}":', self.columns[name]) for name in _OPTIONAL_INT_FIELDS]
+
+        for i in range(start, len(self) if stop is None else stop):
+            row = (f'{{"sessionExerciseId":{encoded[session_exercise_ids[i]]},'
+                   f'"exerciseId":{encoded[exercise_ids[i]]},'
+                   f'"setNumber":{set_numbers[i]},"repsCompleted":{reps[i]}')
+            for prefix, column in optional:
+                value = column[i]
+                if value != MISSING:
+                    row += f'{prefix}{value}'
+            yield row + '}'
+
+    def to_json(self) -> str:
+        """Serialize all rows as the API's exercisePerformance JSON array"""
+        return '[' + ','.join(self._iter_json_rows(self._encoded_strings())) + ']'
+
+    def write_json(self, fp: TextIO, chunk_size: int = 10000) -> None:
+        """Stream the JSON array to a text file in chunks of rows"""
+        encoded = self._encoded_strings()
+        fp.write('[')
+        for start in range(0, len(self), chunk_size):
+            if start:
+                fp.write(',')
+            fp.write(','.join(self._iter_json_rows(encoded, start, min(start + chunk_size, len(self)))))
+        fp.write(']')
@@ -0,0 +1,480 @@
+"""
+Bodyweight Training API - Cohort Muscle Balance
+Gym-wide muscle-group imbalance analytics in one NumPy-vectorized pass
+
+analyze-muscle-groups scores one user per call. This module loads the same
+weekly per-muscle-group volumes for a whole cohort (a muscle_group_metrics
+export, or analyze_muscle_groups responses already fetched) into a
+(users × muscle groups) frame and computes, for everyone at once:
+
+- imbalance_scores(): the imbalance_score analyze-muscle-groups assigns
+- muscle_priorities(): the priorities generate-routine derives from those
+  metrics (analyzeMuscleGroupPriorities + enforceMuscleBalance in
+  supabase/functions/_shared/algorithm.ts)
+- cohort_report(): per-group percentiles and the users to flag
+
+Usage:
+    python muscle_balance.py muscle_group_metrics.csv --week-start 2025-06-09
+    python muscle_balance.py --verify-parity
+
+--verify-parity checks muscle_priorities() against priorities captured from
+the TypeScript algorithm by tests/capture-muscle-balance-fixtures.ts.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+# Muscle groups generate-routine balances, in report order
+MUSCLE_GROUPS = ('chest', 'back', 'shoulders', 'quadriceps', 'hamstrings', 'glutes', 'core', 'abs')
+
+LEG_GROUPS = ('quadriceps', 'hamstrings')
+
+# Priorities for users without metrics (no enforced balance, as in the server)
+DEFAULT_PRIORITIES = {
+    'chest': 1.0, 'back': 1.0, 'shoulders': 1.0,
+    'quadriceps': 1.3, 'hamstrings': 1.3, 'glutes': 0.8,
+    'core': 1.0, 'abs': 1.0,
+}
+
+# enforceMuscleBalance: minimums above 1.0 are floors, the rest are caps
+MINIMUM_PRIORITIES = {
+    'quadriceps': 1.5, 'hamstrings': 1.5, 'glutes': 0.6,
+    'chest': 0.8, 'back': 1.1, 'shoulders': 0.8,
+    'core': 1.0, 'abs': 1.0,
+}
+
+# Overrides when the legs' priority is below 60% of the average ("super aggressive" mode)
+AGGRESSIVE_LEG_PRIORITIES = {'quadriceps': 1.8, 'hamstrings': 1.8, 'glutes': 0.5}
+AGGRESSIVE_LEG_RATIO = 0.6
+
+# Priorities deviating more than this from the user's mean are pulled 20% towards it
+CRITICAL_DEVIATION = 0.4
+
+REPORT_PERCENTILES = (25, 50, 75, 90)
+
+
+@dataclass
+class MuscleGroupFrame:
+    """
+    One week of muscle-group volume for a cohort, as (users × groups) matrices
+
+    A NaN cell means the user has no metrics row for that group (the group
+    was not trained in the analyzed window); a 0 means a row with no sets.
+
+    Attributes:
+        user_ids: User ID of each row
+        groups: Muscle group of each column
+        total_sets, total_reps, avg_rpe: Current-week muscle_group_metrics values
+        imbalance_score: Stored imbalance_score (0 where the row has none)
+    """
+    user_ids: List[str]
+    groups: List[str]
+    total_sets: np.ndarray
+    total_reps: np.ndarray
+    avg_rpe: np.ndarray
+    imbalance_score: np.ndarray
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_ids)
+
+    @property
+    def present(self) -> np.ndarray:
+        return ~np.isnan(self.total_sets)
+
+    def column(self, group: str) -> int:
+        return self.groups.index(group)
+
+
+def _number(value: Any, default: float = math.nan) -> float:
+    """Numeric cell from JSON or CSV (None and empty strings become `default`)"""
+    if value is None or value == '':
+        return default
+    return float(value)
+
+
+def _ordered_groups(seen: Iterable[str]) -> List[str]:
+    seen = set(seen)
+    return [g for g in MUSCLE_GROUPS if g in seen] + sorted(seen.difference(MUSCLE_GROUPS))
+
+
+def _build_frame(user_ids: List[str], cells: Dict[tuple, Dict[str, Any]]) -> MuscleGroupFrame:
+    groups = _ordered_groups(group for _, group in cells)
+    user_index = {user_id: i for i, user_id in enumerate(user_ids)}
+    group_index = {group: j for j, group in enumerate(groups)}
+    rows = np.array([user_index[user_id] for user_id, _ in cells], dtype=np.intp)
+    columns = np.array([group_index[group] for _, group in cells], dtype=np.intp)
+
+    # Missing sets and reps count as 0; a null imbalance_score / 100 is 0 in the priority formula
+    defaults = {'total_sets': 0.0, 'total_reps': 0.0, 'avg_rpe': math.nan, 'imbalance_score': 0.0}
+    matrices = {}
+    for name, default in defaults.items():
+        matrix = np.full((len(user_ids), len(groups)), np.nan)
+        matrix[rows, columns] = [_number(cell.get(name), default) for cell in cells.values()]
+        matrices[name] = matrix
+
+    return MuscleGroupFrame(user_ids=user_ids, groups=groups, **matrices)
+
+
+def frame_from_metrics(rows: Iterable[Mapping[str, Any]], week_start: Optional[str] = None,
+                       user_ids: Optional[Sequence[str]] = None) -> MuscleGroupFrame:
+    """
+    Build a frame from muscle_group_metrics rows (a table export or CSV)
+
+    Args:
+        rows: Rows with user_id, muscle_group, total_sets, total_reps, avg_rpe, imbalance_score
+            and week_start; for a repeated (user, group) pair the last row wins
+        week_start: Keep only rows of this week (YYYY-MM-DD); generate-routine reads the current week
+        user_ids: Cohort members in report order, including users without rows
+            (default: users in order of first appearance)
+
+    Returns:
+        MuscleGroupFrame with one row per user
+    """
+    cells: Dict[tuple, Mapping[str, Any]] = {}
+    seen: Dict[str, None] = {}
+    for row in rows:
+        if week_start is not None and str(row.get('week_start', ''))[:10] != week_start:
+            continue
+        user_id = str(row['user_id'])
+        seen.setdefault(user_id)
+        cells[(user_id, row['muscle_group'])] = row
+
+    users = list(user_ids) if user_ids is not None else list(seen)
+    known = set(users)
+    cells = {key: row for key, row in cells.items() if key[0] in known}
+    return _build_frame(users, cells)
+
+
+def frame_from_analyses(responses: Mapping[str, Optional[Dict]]) -> MuscleGroupFrame:
+    """
+    Build a frame from analyze_muscle_groups responses
+
+    Args:
+        responses: {user_id: response}; None (e.g. a failed bulk_analyze call) counts as no data
+
+    Returns:
+        MuscleGroupFrame with the current_week values of every analysis
+    """
+    cells = {}
+    for user_id, response in responses.items():
+        for analysis in (response or {}).get('muscle_group_analyses') or []:
+            current = analysis.get('current_week') or {}
+            cells[(user_id, analysis['muscle_group'])] = {
+                'total_sets': current.get('total_sets'),
+                'total_reps': current.get('total_reps'),
+                'avg_rpe': current.get('avg_rpe'),
+                'imbalance_score': analysis.get('imbalance_score'),
+            }
+    return _build_frame(list(responses), cells)
+
+
+def read_metrics_csv(path: str) -> List[Dict[str, str]]:
+    """Rows of a muscle_group_metrics CSV export (values are converted by frame_from_metrics)"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+# ---------------------------------------------------------------------------
+# Vectorized metrics
+# ---------------------------------------------------------------------------
+
+def _row_nanmean(values: np.ndarray) -> np.ndarray:
+    """Mean of the non-NaN values in each row (NaN for empty rows)"""
+    present = ~np.isnan(values)
+    counts = present.sum(axis=1)
+    totals = np.where(present, values, 0.0).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def imbalance_scores(frame: MuscleGroupFrame) -> np.ndarray:
+    """
+    analyze-muscle-groups imbalance_score for every user and group
+
+    The percentage by which a group's weekly sets deviate from the user's
+    average over the groups they trained (0 when that average is 0).
+
+    Returns:
+        (users × groups) matrix, NaN where the user has no data for the group
+    """
+    average = _row_nanmean(frame.total_sets)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = np.where(average > 0, np.abs(frame.total_sets - average) / average * 100, 0.0)
+    return np.where(frame.present, scores, np.nan)
+
+
+def muscle_priorities(frame: MuscleGroupFrame) -> Dict[str, Any]:
+    """
+    generate-routine muscle-group priorities for every user
+
+    Vectorized analyzeMuscleGroupPriorities over the frame's metrics
+    followed by enforceMuscleBalance. The per-exercise RPE/technique nudges
+    the server applies to the last 20 performance rows need exercise-level
+    data and are not included. Users without metrics get DEFAULT_PRIORITIES.
+
+    Returns:
+        Dict with groups (column names: the frame's groups plus any balanced
+        group it lacks), priorities (users × groups, NaN where not set),
+        leg_priority_ratio and aggressive_legs (per-user arrays)
+    """
+    groups = list(frame.groups) + [g for g in MINIMUM_PRIORITIES if g not in frame.groups]
+    n, k = frame.n_users, len(groups)
+    present = np.zeros((n, k), dtype=bool)
+    present[:, :len(frame.groups)] = frame.present
+    has_data = present.any(axis=1)
+
+    # analyzeMuscleGroupPriorities: more priority for low relative volume and high imbalance
+    sets = np.full((n, k), np.nan)
+    sets[:, :len(frame.groups)] = frame.total_sets
+    imbalance = np.zeros((n, k))
+    imbalance[:, :len(frame.groups)] = np.nan_to_num(frame.imbalance_score)
+    average_volume = np.nansum(sets, axis=1) / np.maximum(1, present.sum(axis=1))
+    volume_ratio = sets / np.maximum(1, average_volume)[:, None]
+    priorities = np.where(present, np.maximum(0.5, 2.0 - volume_ratio + imbalance / 100), np.nan)
+
+    # enforceMuscleBalance
+    leg_columns = [groups.index(g) for g in LEG_GROUPS]
+    leg_average = np.nan_to_num(priorities[:, leg_columns]).sum(axis=1) / len(LEG_GROUPS)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        leg_ratio = leg_average / _row_nanmean(priorities)
+    aggressive = leg_ratio < AGGRESSIVE_LEG_RATIO
+
+    balanced = priorities.copy()
+    for group, minimum in MINIMUM_PRIORITIES.items():
+        j = groups.index(group)
+        target = np.where(aggressive, AGGRESSIVE_LEG_PRIORITIES.get(group, minimum), minimum)
+        limit = np.fmax if minimum > 1.0 else np.fmin
+        balanced[:, j] = np.where(present[:, j], limit(balanced[:, j], target), target)
+
+    average = _row_nanmean(balanced)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        critical = np.abs(balanced - average) / average > CRITICAL_DEVIATION
+    balanced = np.where(critical, balanced * 0.8 + average * 0.2, balanced)
+
+    defaults = np.array([DEFAULT_PRIORITIES.get(g, np.nan) for g in groups])
+    balanced[~has_data] = defaults
+
+    return {
+        'groups': groups,
+        'priorities': balanced,
+        'leg_priority_ratio': np.where(has_data, leg_ratio, np.nan),
+        'aggressive_legs': has_data & aggressive,
+    }
+
+
+def percentile_ranks(values: np.ndarray) -> np.ndarray:
+    """
+    Percentile rank (0-100] of each cell within its column
+
+    The share of users with data in the column whose value is less than or
+    equal to the cell's. NaN cells stay NaN.
+    """
+    ranks = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        present = ~np.isnan(column)
+        if not present.any():
+            continue
+        ordered = np.sort(column[present])
+        ranks[present, j] = np.searchsorted(ordered, column[present], side='right') / len(ordered) * 100
+    return ranks
+
+
+def _distribution(values: np.ndarray) -> Dict[str, Optional[float]]:
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {'mean': None, **{f"p{p}": None for p in REPORT_PERCENTILES}}
+    percentiles = np.percentile(values, REPORT_PERCENTILES)
+    return {'mean': round(float(values.mean()), 2),
+            **{f"p{p}": round(float(v), 2) for p, v in zip(REPORT_PERCENTILES, percentiles)}}
+
+
+def cohort_report(frame: MuscleGroupFrame, imbalance_threshold: float = 30.0,
+                  max_flagged: Optional[int] = 50) -> Dict[str, Any]:
+    """
+    Gym-wide muscle balance summary
+
+    Imbalance scores are recomputed from the sets with the
+    analyze-muscle-groups formula, so rows whose stored score is stale or
+    missing are still scored. A user is flagged when any group exceeds
+    `imbalance_threshold` (the client logs the same threshold per user).
+
+    Args:
+        frame: Cohort frame
+        imbalance_threshold: Imbalance percentage above which a user is flagged
+        max_flagged: Maximum number of flagged users listed (worst first; None lists all)
+
+    Returns:
+        Dict with users, users_with_data, groups (per-group users_training,
+        sets and imbalance distributions, flagged count and mean priority),
+        aggressive_leg_users and flagged_users
+    """
+    scores = imbalance_scores(frame)
+    priorities = muscle_priorities(frame)
+    priority_column = {g: j for j, g in enumerate(priorities['groups'])}
+
+    with np.errstate(invalid='ignore'):
+        over = scores > imbalance_threshold
+    has_data = frame.present.any(axis=1)
+
+    groups = {}
+    for j, group in enumerate(frame.groups):
+        group_priorities = priorities['priorities'][has_data, priority_column[group]]
+        groups[group] = {
+            'users_training': int(frame.present[:, j].sum()),
+            'sets': _distribution(frame.total_sets[:, j]),
+            'imbalance': _distribution(scores[:, j]),
+            'flagged_users': int(over[:, j].sum()),
+            'mean_priority': _distribution(group_priorities)['mean'],
+        }
+
+    # Worst group of every flagged user, worst users first
+    flagged = np.flatnonzero(over.any(axis=1))
+    masked = np.where(frame.present, scores, -np.inf)[flagged]
+    worst_column = masked.argmax(axis=1)
+    worst = masked[np.arange(len(flagged)), worst_column]
+    order = np.argsort(-worst, kind='stable')
+    if max_flagged is not None:
+        order = order[:max_flagged]
+
+    sets_ranks = percentile_ranks(frame.total_sets)
+    flagged_users = []
+    for k in order:
+        i, j = flagged[k], worst_column[k]
+        flagged_users.append({
+            'user_id': frame.user_ids[i],
+            'max_imbalance': round(float(worst[k]), 1),
+            'worst_group': frame.groups[j],
+            'worst_group_sets': float(frame.total_sets[i, j]),
+            'worst_group_sets_percentile': round(float(sets_ranks[i, j]), 1),
+            'imbalanced_groups': [frame.groups[g] for g in np.flatnonzero(over[i])],
+            'aggressive_legs': bool(priorities['aggressive_legs'][i]),
+        })
+
+    return {
+        'users': frame.n_users,
+        'users_with_data': int(has_data.sum()),
+        'groups': groups,
+        'aggressive_leg_users': int(priorities['aggressive_legs'].sum()),
+        'flagged_user_count': int(len(flagged)),
+        'flagged_users': flagged_users,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Parity with the TypeScript implementation
+# ---------------------------------------------------------------------------
+
+DEFAULT_PARITY_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                       'fixtures', 'muscle_balance_parity.json')
+
+
+def load_parity_fixtures(path: str = DEFAULT_PARITY_FIXTURES) -> Dict:
+    """Load fixtures captured by tests/capture-muscle-balance-fixtures.ts"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def verify_parity(path: str = DEFAULT_PARITY_FIXTURES, tolerance: float = 1e-9) -> List[str]:
+    """
+    Check muscle_priorities against the TypeScript analyzeMuscleGroupPriorities outputs
+
+    All fixture users are scored in one frame, as a cohort export would be,
+    so groups only some users train are covered too.
+
+    Args:
+        path: Fixture file with muscle_group_metrics rows and expected priorities per user
+        tolerance: Absolute tolerance for the priorities
+
+    Returns:
+        Human-readable mismatch descriptions (empty when the port matches)
+    """
+    cases = load_parity_fixtures(path)['cases']
+    rows = [row for case in cases for row in case['input']['muscleGroupMetrics']]
+    frame = frame_from_metrics(rows, user_ids=[case['input']['user_id'] for case in cases])
+    result = muscle_priorities(frame)
+
+    mismatches = []
+    for i, case in enumerate(cases):
+        actual = {group: float(value) for group, value in zip(result['groups'], result['priorities'][i])
+                  if not math.isnan(value)}
+        expected = case['expected']
+        if actual.keys() != expected.keys():
+            mismatches.append(f"{case['name']}: groups {sorted(actual)}, expected {sorted(expected)}")
+            continue
+        for group, value in expected.items():
+            if abs(actual[group] - value) > tolerance:
+                mismatches.append(f"{case['name']}: {group} priority {actual[group]!r}, expected {value!r}")
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cohort muscle balance report from a muscle_group_metrics export")
+    parser.add_argument("metrics", nargs='?', help="muscle_group_metrics CSV (or JSON array) export")
+    parser.add_argument("--week-start", help="Only use rows of this week (YYYY-MM-DD)")
+    parser.add_argument("--threshold", type=float, default=30.0, help="Imbalance percentage that flags a user")
+    parser.add_argument("--top", type=int, default=10, help="Flagged users to list")
+    parser.add_argument("--json", dest="json_path", help="Write the full report to this file")
+    parser.add_argument("--verify-parity", action="store_true",
+                        help="Check the priorities against the captured TypeScript outputs and exit")
+    args = parser.parse_args(argv)
+
+    if args.verify_parity:
+        problems = verify_parity()
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            return 1
+        print(f"✅ Priorities match TypeScript on {len(load_parity_fixtures()['cases'])} fixtures")
+        return 0
+    if args.metrics is None:
+        parser.error("the metrics export is required unless --verify-parity is given")
+
+    started = time.perf_counter()
+    if args.metrics.endswith('.json'):
+        with open(args.metrics, encoding='utf-8') as f:
+            rows = json.load(f)
+    else:
+        rows = read_metrics_csv(args.metrics)
+    frame = frame_from_metrics(rows, week_start=args.week_start)
+    report = cohort_report(frame, args.threshold, max_flagged=None if args.json_path else args.top)
+    elapsed = time.perf_counter() - started
+
+    print(f"💪 {report['users_with_data']:,} of {report['users']:,} users with metrics, "
+          f"{len(frame.groups)} muscle groups ({elapsed:.2f}s)")
+    print(f"{'group':<12} {'users':>7} {'sets p50':>9} {'sets p90':>9} {'imb p50':>8} {'imb p90':>8} "
+          f"{'flagged':>8} {'priority':>9}")
+    def fmt(value: Optional[float]) -> str:
+        return '-' if value is None else f"{value:.1f}"
+
+    for group, stats in report['groups'].items():
+        print(f"{group:<12} {stats['users_training']:>7} {fmt(stats['sets']['p50']):>9} "
+              f"{fmt(stats['sets']['p90']):>9} {fmt(stats['imbalance']['p50']):>8} "
+              f"{fmt(stats['imbalance']['p90']):>8} {stats['flagged_users']:>8} "
+              f"{fmt(stats['mean_priority']):>9}")
+
+    print(f"⚠️ {report['flagged_user_count']:,} users above {args.threshold:.0f}% imbalance, "
+          f"{report['aggressive_leg_users']:,} in aggressive leg mode")
+    for user in report['flagged_users'][:args.top]:
+        print(f"   - {user['user_id']}: {user['worst_group']} {user['max_imbalance']:.1f}% "
+              f"({user['worst_group_sets']:.0f} sets, p{user['worst_group_sets_percentile']:.0f})")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Bodyweight Training API - Multi-tenant Client Pool
+Many users' clients over one shared connection pool, with JWT refresh and LRU eviction
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from bodyweight_client import AdvancedBodyweightClient, BodyweightTrainingClient, logger
+from cache import ResponseCache, jwt_claims, token_fingerprint
+from singleflight import SingleFlight
+
+
+class PoolStats:
+    """Counters for a ClientPool"""
+
+    def __init__(self):
+        self.clients_created = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "clients_created": self.clients_created,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
+
+
+class _PoolEntry:
+    __slots__ = ('user_id', 'client', 'token', 'expires_at', 'refreshing', 'retry_at', 'last_used')
+
+    def __init__(self, user_id: str, client: BodyweightTrainingClient, token: str):
+        self.user_id = user_id
+        self.client = client
+        self.token = token
+        self.expires_at = _expiry(token)
+        self.refreshing: Optional[Future] = None
+        self.retry_at = 0.0
+        self.last_used = time.monotonic()
+
+
+def _expiry(jwt_token: str) -> Optional[float]:
+    exp = jwt_claims(jwt_token).get('exp')
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+class ClientPool:
+    """
+    Per-user clients sharing one HTTP connection pool
+
+    Every client uses the pool's requests session, so connections are
+    reused across users; the user's JWT is attached to each request rather
+    than to the session. Tokens within `refresh_margin` seconds of their
+    `exp` claim are refreshed in the background by `token_refresher` while
+    requests keep using the current token; a caller only waits if its token
+    has already expired. At most `max_users` clients are kept, evicting the
+    least recently used (and any idle for longer than `max_idle`).
+
+    Clients are keyed by a fingerprint of the token they were created with,
+    so a caller only ever gets a client holding its own token. Callers that
+    verified the token's user (e.g. with the auth server) can pass that
+    user_id instead, and then share one client across the user's tokens.
+
+    Usage:
+        pool = ClientPool(url, token_refresher=lambda user_id, token: auth.refresh(token))
+        client = pool.client(jwt_token)
+        client.calculate_ica()
+    """
+
+    def __init__(self, supabase_url: str,
+                 token_refresher: Optional[Callable[[str, str], str]] = None,
+                 refresh_margin: float = 60.0,
+                 max_users: int = 1000,
+                 max_idle: Optional[float] = None,
+                 max_connections: int = 32,
+                 refresh_workers: int = 2,
+                 client_class: type = AdvancedBodyweightClient,
+                 **client_kwargs):
+        """
+        Args:
+            supabase_url: Base Supabase URL
+            token_refresher: Called as token_refresher(key, current_token), where key is
+                the client's verified user_id or token fingerprint, and returning a
+                new JWT; None disables refresh
+            refresh_margin: Seconds before expiry at which a refresh starts
+            max_users: Maximum number of clients kept (least recently used are evicted)
+            max_idle: Evict clients unused for this many seconds (None keeps them)
+            max_connections: Keep-alive connections kept per host
+            refresh_workers: Background threads running token_refresher
+            client_class: BodyweightTrainingClient or a subclass
+            **client_kwargs: Extra arguments for every client; a SingleFlight and,
+                for AdvancedBodyweightClient, a ResponseCache are shared by default
+        """
+        self.supabase_url = supabase_url
+        self.token_refresher = token_refresher
+        self.refresh_margin = refresh_margin
+        self.max_users = max_users
+        self.max_idle = max_idle
+        self.client_class = client_class
+        self.stats = PoolStats()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        client_kwargs.setdefault('single_flight', SingleFlight())
+        if issubclass(client_class, AdvancedBodyweightClient):
+            client_kwargs.setdefault('cache', ResponseCache())
+        self.client_kwargs = client_kwargs
+
+        self._entries: 'OrderedDict[str, _PoolEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers,
+                                                    thread_name_prefix='jwt-refresh')
+
+    def client(self, jwt_token: str, user_id: Optional[str] = None) -> BodyweightTrainingClient:
+        """
+        Client for a token, created on first use
+
+        Without user_id the same token (or one the pool refreshed from it)
+        gets the same client. With a verified user_id the user's existing
+        client is reused, and a token that expires later than the one held
+        replaces it.
+
+        Args:
+            jwt_token: The caller's JWT
+            user_id: ID of the token's user, only if it was verified; never
+                the token's own unverified sub claim
+        """
+        if user_id is None:
+            user_id = token_fingerprint(jwt_token)
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                entry.last_used = now
+                expires_at = _expiry(jwt_token)
+                if entry.token != jwt_token and (entry.expires_at is None or
+                                                 (expires_at is not None and expires_at > entry.expires_at)):
+                    entry.token, entry.expires_at = jwt_token, expires_at
+                    entry.client.set_token(jwt_token)
+                return entry.client
+
+            client = self.client_class(self.supabase_url, jwt_token, session=self.session, user_id=user_id,
+                                       **self.client_kwargs)
+            entry = _PoolEntry(user_id, client, jwt_token)
+            client.token_source = lambda: self._current_token(entry)
+            self._entries[user_id] = entry
+            self.stats.clients_created += 1
+
+            while len(self._entries) > self.max_users:
+                self._evict(next(iter(self._entries)))
+            return client
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._entries
+
+    def evict(self, user_id: str) -> None:
+        """Drop a client and its cached responses, by verified user_id or token_fingerprint(token)"""
+        with self._lock:
+            if user_id in self._entries:
+                self._evict(user_id)
+
+    def _evict(self, user_id: str) -> None:
+        entry = self._entries.pop(user_id)
+        self.stats.evictions += 1
+        cache = getattr(entry.client, 'response_cache', None)
+        if cache is not None and cache is self.client_kwargs.get('cache'):
+            cache.backend.delete_prefix(f"{user_id}|")
+        logger.debug(f"🧹 Evicted client for user {user_id}")
+
+    def _evict_idle(self, now: float) -> None:
+        if self.max_idle is None:
+            return
+        while self._entries:
+            user_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_used < self.max_idle:
+                break
+            self._evict(user_id)
+
+    def _current_token(self, entry: _PoolEntry) -> str:
+        """Token for the next request, starting or awaiting a refresh as needed"""
+        if entry.expires_at is None or self.token_refresher is None:
+            return entry.token
+
+        now = time.time()
+        if now >= entry.expires_at - self.refresh_margin:
+            refreshing = self._start_refresh(entry, now)
+            if refreshing is not None and now >= entry.expires_at:
+                # The current token is already unusable; wait for the new one
+                try:
+                    refreshing.result(timeout=entry.client.timeout)
+                except Exception:
+                    pass  # logged by _refresh; send the old token and let the request fail
+        return entry.token
+
+    def _start_refresh(self, entry: _PoolEntry, now: float) -> Optional[Future]:
+        with self._lock:
+            if entry.refreshing is None and now >= entry.retry_at:
+                entry.refreshing = self._refresh_executor.submit(self._refresh, entry)
+            return entry.refreshing
+
+    def _refresh(self, entry: _PoolEntry) -> None:
+        try:
+            token = self.token_refresher(entry.user_id, entry.token)
+        except Exception as e:
+            with self._lock:
+                self.stats.refresh_failures += 1
+                entry.retry_at = time.time() + min(30.0, self.refresh_margin / 4)
+                entry.refreshing = None
+            logger.warning(f"🔑 Token refresh failed for user {entry.user_id}: {e}")
+            raise
+
+        with self._lock:
+            entry.token, entry.expires_at = token, _expiry(token)
+            entry.client.set_token(token)
+            entry.refreshing = None
+            self.stats.refreshes += 1
+        logger.debug(f"🔑 Refreshed token for user {entry.user_id}")
+
+    def close(self) -> None:
+        """Stop background refreshes and close the shared connections"""
+        self._refresh_executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._entries.clear()
+        self.session.close()
+
+    def __enter__(self) -> 'ClientPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
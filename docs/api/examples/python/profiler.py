@@ -0,0 +1,127 @@
+"""
+Bodyweight Training API - Sampling Profiler
+Low-overhead wall-clock profiler for long-running jobs such as bulk exports and simulations
+
+Usage:
+    with SamplingProfiler(interval=0.005) as profiler:
+        run_long_job()
+    profiler.write_folded('profile.folded')   # flamegraph.pl / speedscope input
+    for frame, self_pct, total_pct in profiler.top(15):
+        print(f"{self_pct:5.1f}% {total_pct:5.1f}% {frame}")
+
+A background thread samples the stacks of every other thread every
+`interval` seconds, so the cost is one stack walk per thread per sample and
+nothing is added to the profiled code. Threads blocked on the network are
+sampled too, which shows where a client job waits as well as where it
+computes.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, TextIO, Tuple
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename.replace('\\', '/').rsplit('/', 1)[-1]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples thread stacks on a background thread and aggregates them"""
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        """
+        Args:
+            interval: Seconds between samples
+            max_depth: Innermost frames kept per stack
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> 'SamplingProfiler':
+        if self._thread is None:
+            self._stop.clear()
+            self._started = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.duration += time.perf_counter() - self._started
+
+    def __enter__(self) -> 'SamplingProfiler':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def folded(self) -> str:
+        """Stacks in the collapsed format ("outer;inner count" per line) read by flamegraph tools"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write_folded(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.folded())
+
+    def top(self, limit: int = 20) -> List[Tuple[str, float, float]]:
+        """
+        Frames with the most samples
+
+        Returns:
+            (frame, self %, total %) tuples sorted by self %, where self counts
+            samples with the frame innermost and total counts samples with the
+            frame anywhere on the stack
+        """
+        total_samples = sum(self.stacks.values())
+        if not total_samples:
+            return []
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            if not stack:
+                continue
+            own[stack[-1]] += count
+            for label in set(stack):
+                inclusive[label] += count
+        return [(label, 100.0 * count / total_samples, 100.0 * inclusive[label] / total_samples)
+                for label, count in own.most_common(limit)]
+
+    def print_top(self, limit: int = 15, file: Optional[TextIO] = None) -> None:
+        print(f"\n🔬 Profile: {self.samples} samples over {self.duration:.1f}s", file=file)
+        print(f"{'self %':>7} {'total %':>8}  frame", file=file)
+        for label, self_pct, total_pct in self.top(limit):
+            print(f"{self_pct:7.1f} {total_pct:8.1f}  {label}", file=file)
@@ -0,0 +1,224 @@
+"""
+Bodyweight Training API - Client-side Rate Limiting
+Token-bucket limiter, retry budget and jittered backoff honoring Retry-After
+"""
+
+import math
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so
+    short bursts of up to `capacity` requests are allowed while the long-run
+    rate stays bounded.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held (burst size)
+
+        Raises:
+            ValueError: If rate or capacity is not positive
+        """
+        if not rate > 0:
+            raise ValueError(f"TokenBucket rate must be positive, got {rate}")
+        if not capacity > 0:
+            raise ValueError(f"TokenBucket capacity must be positive, got {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available without waiting"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Block until tokens are available
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the tokens were taken, False on timeout
+
+        Raises:
+            ValueError: If more tokens are requested than the bucket can hold
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None:
+                if now + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """
+    Per-endpoint token-bucket rate limiter
+
+    Share one instance between client instances and threads to enforce a
+    process-wide request rate against the Supabase function quota.
+    """
+
+    def __init__(self, default_rate: float = 10.0, default_burst: float = 20.0,
+                 endpoint_limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Args:
+            default_rate: Requests per second for endpoints without their own limit
+            default_burst: Burst size for endpoints without their own limit
+            endpoint_limits: Optional {endpoint: (rate, burst)} overrides
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.endpoint_limits = dict(endpoint_limits or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, endpoint: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(endpoint)
+            if bucket is None:
+                rate, burst = self.endpoint_limits.get(endpoint, (self.default_rate, self.default_burst))
+                bucket = self._buckets[endpoint] = TokenBucket(rate, burst)
+            return bucket
+
+    def acquire(self, endpoint: str, timeout: Optional[float] = None) -> bool:
+        """Block until a request to endpoint is allowed"""
+        return self.bucket_for(endpoint).acquire(timeout=timeout)
+
+
+class RetryBudget:
+    """
+    Cap retries to a fraction of recent request volume
+
+    During an incident every request fails, and unbounded retries multiply
+    load on the struggling service. The budget allows at most `ratio`
+    retries per original request over a sliding window, plus a small floor
+    so low-traffic clients can still retry.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 1.0, window: float = 10.0):
+        """
+        Args:
+            ratio: Retries allowed per original request
+            min_retries_per_second: Retries always allowed regardless of volume
+            window: Sliding window length in seconds
+        """
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window = window
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._requests and self._requests[0] < cutoff:
+            self._requests.popleft()
+        while self._retries and self._retries[0] < cutoff:
+            self._retries.popleft()
+
+    def record_request(self) -> None:
+        """Record an original (non-retry) request"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._requests.append(now)
+
+    def try_acquire(self) -> bool:
+        """Take permission for one retry, or return False if the budget is spent"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            allowed = self.ratio * len(self._requests) + self.min_retries_per_second * self.window
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into seconds
+
+    Accepts both the delta-seconds and HTTP-date forms; anything else,
+    including "inf" and "nan", gives None.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+    # Deferred: the HTTP-date form is rare and email.utils is slow to import
+    from email.utils import parsedate_to_datetime
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float,
+                  retry_after: Optional[float] = None) -> Optional[float]:
+    """
+    Delay before the next retry
+
+    Uses "full jitter" exponential backoff so clients that failed together
+    do not retry in lockstep. A server Retry-After hint sets the minimum.
+
+    Args:
+        attempt: Zero-based retry attempt
+        base_delay: Initial backoff in seconds
+        max_delay: Upper bound for the delay
+        retry_after: Server-requested delay in seconds, if any
+
+    Returns:
+        Seconds to wait, or None when the server asked for a longer wait
+        than max_delay: retrying earlier would ignore the hint, so the caller
+        should give up (or wait retry_after if it can afford to)
+    """
+    if retry_after is not None:
+        if retry_after > max_delay:
+            return None
+        return min(max_delay, retry_after + random.uniform(0, base_delay))
+    # The exponent is capped so long outages cannot overflow the float
+    return random.uniform(0, min(max_delay, base_delay * (2 ** min(attempt, 64))))
@@ -0,0 +1,788 @@
+"""
+Bodyweight Training API - Offline Training Simulator
+Advances synthetic users through weeks of sessions using a Python port of the
+routine generation in AdaptiveTrainingAlgorithm (supabase/functions/_shared/algorithm.ts)
+
+Usage:
+    python simulator.py --users 5000 --weeks 8 --output sessions.csv
+    python simulator.py --users 20000 --workers 8 --mode single --output sessions.parquet
+    python simulator.py --progression-multiplier 1.2 --output what_if.csv
+    python simulator.py --users 2000 --workers 1 --profile simulate.folded --trace spans.ndjson
+
+Every simulated session regenerates the routine from the user's current ICA
+(ica.calculate_ica), simulates how the user performs it and applies the
+progression rules of save-session-feedback. Users are split into chunks and
+simulated in worker processes; each user draws from its own random stream
+seeded from (seed, user index), so the output is identical for any number of
+workers. Rows are streamed to CSV, or to Parquet when pyarrow is installed.
+--profile samples this process's stacks (run with --workers 1 to profile the
+simulation itself rather than the wait for workers) and --trace records a
+span per chunk and per write as OTLP/JSON.
+"""
+
+import argparse
+import csv
+import math
+import multiprocessing
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ica import _js_round2, calculate_ica
+from profiler import SamplingProfiler
+from tracing import NOOP_TRACER, OTLPFileExporter, Tracer
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+CATEGORIES = ('push', 'pull', 'squat', 'hinge', 'core')
+
+CATEGORY_MUSCLE_GROUPS = {
+    'push': ['chest', 'shoulders'],
+    'pull': ['back'],
+    'squat': ['quadriceps', 'glutes'],
+    'hinge': ['hamstrings', 'glutes'],
+    'core': ['core'],
+}
+
+# Progression ladders, one exercise per level (1-7), as in simulate_algorithm.js
+EXERCISE_LADDERS = {
+    'push': ['Wall Push-ups', 'Incline Push-ups', 'Push-ups', 'Diamond Push-ups', 'Archer Push-ups',
+             'One-arm Push-ups', 'Planche Push-ups'],
+    'pull': ['Assisted Pull-ups', 'Negative Pull-ups', 'Pull-ups', 'Wide Pull-ups', 'L-sit Pull-ups',
+             'One-arm Pull-ups', 'Muscle-ups'],
+    'squat': ['Assisted Squats', 'Bodyweight Squats', 'Jump Squats', 'Pistol Squats (Assisted)', 'Pistol Squats',
+              'Shrimp Squats', 'Pistol Squats Weighted'],
+    'hinge': ['Glute Bridges', 'Single-leg Bridges', 'Good Mornings', 'Single-leg Deadlifts',
+              'Nordic Curls (Eccentric)', 'Nordic Curls', 'Single-leg Nordics'],
+    'core': ['Planks', 'Side Planks', 'Leg Raises', 'Hanging Leg Raises', 'L-sit Hold', 'Dragon Flags',
+             'Human Flag'],
+}
+
+# Priorities analyzeMuscleGroupPriorities returns when there is no performance history
+DEFAULT_MUSCLE_PRIORITIES = {
+    'chest': 1.0, 'back': 1.0, 'shoulders': 1.0,
+    'quadriceps': 1.3, 'hamstrings': 1.3, 'glutes': 0.8,
+    'core': 1.0, 'abs': 1.0,
+}
+
+MAX_PROGRESSION_LEVEL = 7
+RECENT_SESSIONS_WINDOW = 30
+ALGORITHM_HISTORY_WINDOW = 10
+
+
+def _js_round(value: float) -> int:
+    """JavaScript Math.round (rounds half up, not to even)"""
+    return math.floor(value + 0.5)
+
+
+def _slug(name: str) -> str:
+    return '-'.join(name.lower().split())
+
+
+# ---------------------------------------------------------------------------
+# Routine generation port
+# ---------------------------------------------------------------------------
+
+def calculate_reps(difficulty: float, intensity: float, fitness_level: str) -> int:
+    base_reps = {'beginner': 8, 'intermediate': 12, 'advanced': 15}.get(fitness_level, 10)
+    return max(5, _js_round(base_reps * (0.7 + difficulty * 0.3) * intensity))
+
+
+def calculate_sets(category: str, intensity: float) -> int:
+    base_sets = 2 if category == 'core' else 3
+    return max(1, _js_round(base_sets * (0.8 + intensity * 0.4)))
+
+
+def calculate_rest(category: str, intensity: float) -> int:
+    base_rest = {'push': 90, 'pull': 90, 'squat': 120, 'hinge': 120, 'core': 60, 'locomotion': 60}
+    return _js_round(base_rest.get(category, 90) * (0.7 + intensity * 0.6))
+
+
+def calculate_reps_for_progression(progression: Dict, ica_score: float) -> int:
+    base_reps = progression.get('personal_best_reps') or 8
+    ica_multiplier = max(0.6, min(1.4, ica_score / 5))
+    return max(3, _js_round(base_reps * ica_multiplier))
+
+
+def calculate_optimal_timing(total_duration: int) -> Dict[str, int]:
+    """Warm-up / main workout / cool-down minutes for a session length"""
+    warmup_percent, cooldown_percent, main_percent = 0.15, 0.15, 0.70
+    if total_duration <= 20:
+        warmup_percent, cooldown_percent, main_percent = 0.10, 0.10, 0.80
+    elif total_duration >= 60:
+        warmup_percent, cooldown_percent, main_percent = 0.20, 0.15, 0.65
+
+    return {
+        'warmup': _js_round(total_duration * warmup_percent),
+        'main_workout': _js_round(total_duration * main_percent),
+        'cooldown': _js_round(total_duration * cooldown_percent),
+    }
+
+
+def calculate_optimal_exercise_count(available_minutes: int, ica_score: float) -> int:
+    ica_time_multiplier = max(0.8, min(1.3, ica_score / 5))
+    raw_count = math.floor(available_minutes / (4.5 * ica_time_multiplier))
+    return max(2, min(6, raw_count))
+
+
+def calculate_circuit_timing(exercise_count: int, available_minutes: int, ica_score: float) -> Dict[str, int]:
+    rest_between_exercises = _js_round(15 + ica_score * 5)
+    rest_between_circuits = _js_round(60 + ica_score * 15)
+
+    # 10 reps of ~3 seconds per exercise, plus rests
+    time_per_circuit = exercise_count * 10 * 3 + (exercise_count - 1) * rest_between_exercises + rest_between_circuits
+    max_circuits = math.floor(available_minutes * 60 / time_per_circuit)
+
+    return {
+        'circuits': max(2, min(5, max_circuits)),
+        'rest_between_exercises': rest_between_exercises,
+        'rest_between_circuits': rest_between_circuits,
+    }
+
+
+def _active_in_category(progressions: List[Dict], category: str) -> List[Dict]:
+    return [p for p in progressions
+            if p.get('exercises') and p['exercises'].get('category') == category and p.get('is_active')]
+
+
+def select_optimal_categories(progressions: List[Dict], muscle_group_priorities: Dict[str, float],
+                              max_categories: int) -> List[str]:
+    """Categories ranked by the priority of the muscle groups they train, forcing legs when neglected"""
+    avg_leg_priority = (muscle_group_priorities.get('quadriceps', 0) + muscle_group_priorities.get('hamstrings', 0)) / 2
+    all_muscle_avg = sum(muscle_group_priorities.values()) / len(muscle_group_priorities)
+    has_leg_crisis = avg_leg_priority / all_muscle_avg > 1.4 or avg_leg_priority > 1.5
+
+    category_scores = []
+    for category in CATEGORIES:
+        category_progressions = _active_in_category(progressions, category)
+        if not category_progressions:
+            category_scores.append((category, 0))
+            continue
+
+        groups = [g for p in category_progressions for g in (p['exercises'].get('muscle_groups') or [])]
+        avg_score = sum(muscle_group_priorities.get(g) or 1.0 for g in groups) / len(groups) if groups else 1.0
+        if has_leg_crisis and category in ('squat', 'hinge'):
+            avg_score *= 2.0
+        category_scores.append((category, avg_score))
+
+    # sorted() is stable, like Array.prototype.sort
+    category_scores.sort(key=lambda item: -item[1])
+    selected = [category for category, _ in category_scores[:max_categories]]
+
+    if has_leg_crisis and selected and 'squat' not in selected and 'hinge' not in selected:
+        selected[-1] = next(c for c, _ in category_scores if c in ('squat', 'hinge'))
+    return selected
+
+
+def select_best_exercise_for_balance(category_progressions: List[Dict], muscle_group_priorities: Dict[str, float],
+                                     ica_score: float) -> Optional[Dict]:
+    best, highest_score = None, 0
+    for progression in category_progressions:
+        exercise = progression.get('exercises')
+        if not exercise:
+            continue
+
+        groups = exercise.get('muscle_groups') or []
+        avg_muscle_score = (sum(muscle_group_priorities.get(g) or 1.0 for g in groups) / len(groups)
+                            if groups else 1.0)
+
+        consecutive = progression.get('consecutive_completions', 0)
+        progression_factor = 1.2 if consecutive >= 2 else 1.0 if consecutive == 1 else 0.8
+        difficulty_factor = max(0.5, 1.0 - abs(exercise['difficulty_level'] - ica_score) * 0.1)
+
+        total_score = avg_muscle_score * progression_factor * difficulty_factor
+        if total_score > highest_score:
+            best, highest_score = progression, total_score
+    return best
+
+
+def generate_circuit_workout(selected_categories: List[str], progressions: List[Dict],
+                             muscle_group_priorities: Dict[str, float], ica_score: float, available_time: int,
+                             progression_multiplier: Optional[float] = None,
+                             risk_level: Optional[str] = None) -> Dict:
+    """
+    One circuit block per category, sized to the available main-workout minutes
+
+    Args:
+        selected_categories: Categories from select_optimal_categories
+        progressions: Active user_exercise_progressions rows with their `exercises`
+        muscle_group_priorities: Priority per muscle group (1.0 is neutral)
+        ica_score: Current ICA
+        available_time: Main workout minutes
+        progression_multiplier: confidenceData.progressionMultiplier, if any
+        risk_level: earlyWarnings.riskLevel ('medium' / 'high' lower the target RPE)
+
+    Returns:
+        Dict with exercises (ExerciseBlock dicts), circuits and both rest periods
+    """
+    timing = calculate_circuit_timing(len(selected_categories), available_time, ica_score)
+    adjusted_ica = ica_score * progression_multiplier if progression_multiplier is not None else ica_score
+
+    exercises = []
+    for category in selected_categories:
+        selected = select_best_exercise_for_balance(
+            _active_in_category(progressions, category), muscle_group_priorities, ica_score
+        )
+        if not selected:
+            continue
+
+        target_rpe = min(8, _js_round(adjusted_ica + 2))
+        if risk_level == 'medium':
+            target_rpe = max(4, target_rpe - 1)
+        elif risk_level == 'high':
+            target_rpe = max(3, target_rpe - 2)
+
+        exercises.append({
+            'exercise': selected['exercises'],
+            'sets': timing['circuits'],  # one set per exercise per round
+            'reps': calculate_reps_for_progression(selected, adjusted_ica),
+            'rest_seconds': timing['rest_between_exercises'],
+            'progression_level': selected['current_level'],
+            'target_rpe': target_rpe,
+        })
+
+    return {
+        'exercises': exercises,
+        'circuits': timing['circuits'],
+        'rest_between_exercises': timing['rest_between_exercises'],
+        'rest_between_circuits': timing['rest_between_circuits'],
+    }
+
+
+_SINGLE_SESSION_EXERCISES = (
+    # name, category, difficulty per ICA point, progression level offset, muscle groups
+    ('Push-ups', 'push', 3.0, 1, ['chest', 'triceps', 'shoulders']),
+    ('Bodyweight Squats', 'squat', 2.5, 1, ['quadriceps', 'glutes', 'hamstrings']),
+    ('Plank', 'core', 2.0, 0, ['core', 'shoulders']),
+)
+
+_WARM_UP = {
+    'exercise': {'id': 'warmup-mobility', 'name': 'Movilidad articular', 'category': 'locomotion',
+                 'difficulty_level': 1.0, 'progression_level': 1, 'muscle_groups': ['full-body']},
+    'sets': 1, 'reps': 10, 'rest_seconds': 30, 'progression_level': 1, 'target_rpe': 3,
+}
+
+_COOL_DOWN = {
+    'exercise': {'id': 'cooldown-stretch', 'name': 'Estiramientos', 'category': 'locomotion',
+                 'difficulty_level': 1.0, 'progression_level': 1, 'muscle_groups': ['full-body']},
+    'sets': 1, 'reps': 30, 'rest_seconds': 0, 'progression_level': 1, 'target_rpe': 2,
+}
+
+
+def generate_single_session(profile: Dict, ica_score: float, session_number: int, session_date: str) -> Dict:
+    """Fixed push / squat / core session scaled by ICA and preferred intensity"""
+    intensity = max(0.4, min(1.0, profile['preferred_intensity'] + (ica_score - 1) * 0.1))
+
+    exercise_blocks = []
+    for name, category, difficulty_per_ica, level_offset, muscle_groups in _SINGLE_SESSION_EXERCISES:
+        difficulty = difficulty_per_ica * ica_score
+        progression_level = min(MAX_PROGRESSION_LEVEL, math.floor(ica_score) + level_offset)
+        exercise_blocks.append({
+            'exercise': {
+                'id': f'ex-{_slug(name)}',
+                'name': name,
+                'category': category,
+                'difficulty_level': difficulty,
+                'progression_level': progression_level,
+                'muscle_groups': muscle_groups,
+            },
+            'sets': calculate_sets(category, intensity),
+            'reps': calculate_reps(difficulty, intensity, profile.get('fitness_level')),
+            'rest_seconds': calculate_rest(category, intensity),
+            'progression_level': progression_level,
+            'target_rpe': _js_round(intensity * 10),
+        })
+
+    return {
+        'id': f'session-{session_date}-{session_number}',
+        'date': session_date,
+        'duration_minutes': profile['preferred_session_duration'],
+        'intensity': intensity,
+        'exercise_blocks': exercise_blocks,
+        'warm_up': [_WARM_UP],
+        'cool_down': [_COOL_DOWN],
+        'focus_areas': ['strength', 'endurance'],
+    }
+
+
+def generate_session_from_progressions(profile: Dict, progressions: List[Dict], ica_score: float,
+                                       session_number: int, session_date: str,
+                                       progression_multiplier: Optional[float] = None) -> Dict:
+    """Circuit session built from the user's progressions (without warm-up/cool-down timing)"""
+    duration = profile['preferred_session_duration']
+    timing = calculate_optimal_timing(duration)
+    exercise_count = calculate_optimal_exercise_count(timing['main_workout'], ica_score)
+    categories = select_optimal_categories(progressions, DEFAULT_MUSCLE_PRIORITIES, exercise_count)
+    circuit = generate_circuit_workout(categories, progressions, DEFAULT_MUSCLE_PRIORITIES, ica_score,
+                                       timing['main_workout'], progression_multiplier)
+
+    return {
+        'id': f'session-{session_date}-{session_number}',
+        'date': session_date,
+        'duration_minutes': duration,
+        'intensity': ica_score / 10,
+        'exercise_blocks': circuit['exercises'],
+        'focus_areas': categories,
+        'circuit_info': {
+            'total_circuits': circuit['circuits'],
+            'exercises_per_circuit': len(circuit['exercises']),
+            'rest_between_exercises': circuit['rest_between_exercises'],
+            'rest_between_circuits': circuit['rest_between_circuits'],
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Synthetic users
+# ---------------------------------------------------------------------------
+
+BEHAVIOR_PATTERNS = {
+    # pattern: (population share, adherence range)
+    'consistent': (0.35, (0.8, 0.95)),
+    'improving': (0.25, (0.6, 0.85)),
+    'inconsistent': (0.25, (0.4, 0.7)),
+    'declining': (0.15, (0.5, 0.8)),
+}
+
+
+@dataclass
+class SimulationConfig:
+    users: int = 1000
+    weeks: int = 8
+    seed: int = 42
+    mode: str = 'circuit'  # 'circuit' (generateSessionFromProgressions) or 'single' (generateSingleSession)
+    start_date: str = '2025-01-06'
+    progression_multiplier: Optional[float] = None
+    patterns: Dict[str, float] = field(default_factory=lambda: {p: s for p, (s, _) in BEHAVIOR_PATTERNS.items()})
+
+
+@dataclass
+class SyntheticUser:
+    user_id: str
+    pattern: str
+    adherence_rate: float
+    technique_consistency: float
+    trainability: float
+    capacity: float  # level (1-7) the user can currently perform cleanly
+    profile: Dict[str, Any]
+    progressions: List[Dict]
+
+
+def _exercise(category: str, level: int) -> Dict:
+    name = EXERCISE_LADDERS[category][level - 1]
+    return {
+        'id': f'ex-{_slug(name)}',
+        'name': name,
+        'category': category,
+        'difficulty_level': float(level),
+        'muscle_groups': CATEGORY_MUSCLE_GROUPS[category],
+    }
+
+
+def _user_rng(seed: int, index: int) -> random.Random:
+    # String seeds are hashed with SHA-512, independent of PYTHONHASHSEED
+    return random.Random(f'{seed}:{index}')
+
+
+def make_user(config: SimulationConfig, index: int, rng: random.Random) -> SyntheticUser:
+    patterns = list(config.patterns)
+    pattern = rng.choices(patterns, weights=[config.patterns[p] for p in patterns])[0]
+    adherence_low, adherence_high = BEHAVIOR_PATTERNS[pattern][1]
+
+    fitness_level = rng.choices(['beginner', 'intermediate', 'advanced'], weights=[0.5, 0.35, 0.15])[0]
+    start_level = {'beginner': 1, 'intermediate': 2, 'advanced': 4}[fitness_level]
+
+    profile = {
+        'fitness_level': fitness_level,
+        'experience_years': rng.randint(0, 5),
+        'age': rng.randint(18, 65),
+        'preferred_intensity': round(rng.uniform(0.5, 0.9), 2),
+        'preferred_session_duration': rng.choice([20, 30, 45, 60]),
+        'available_days_per_week': rng.randint(2, 5),
+        'sleep_hours': round(rng.uniform(5.5, 8.5), 1),
+        'sleep_quality': rng.randint(2, 5),
+        'fatigue_level': rng.randint(1, 4),
+    }
+
+    progressions = [{
+        'exercise_id': _exercise(category, start_level)['id'],
+        'current_level': start_level,
+        'consecutive_completions': 0,
+        'personal_best_reps': None,
+        'is_active': True,
+        'exercises': _exercise(category, start_level),
+    } for category in CATEGORIES]
+
+    return SyntheticUser(
+        user_id=f'sim-user-{index}',
+        pattern=pattern,
+        adherence_rate=rng.uniform(adherence_low, adherence_high),
+        technique_consistency=rng.uniform(0.5, 0.95),
+        trainability=rng.uniform(0.01, 0.04),
+        capacity=start_level + rng.uniform(0, 1),
+        profile=profile,
+        progressions=progressions,
+    )
+
+
+def _completion_chance(user: SyntheticUser, session_number: int, rng: random.Random) -> float:
+    chance = user.adherence_rate
+    if user.pattern == 'improving':
+        chance += min(0.2, session_number * 0.008)
+    elif user.pattern == 'declining':
+        chance -= min(0.3, session_number * 0.01)
+    elif user.pattern == 'inconsistent':
+        chance += (rng.random() - 0.5) * 0.4
+
+    if user.profile['fatigue_level'] > 3:
+        chance -= 0.1
+    if user.profile['sleep_quality'] < 3:
+        chance -= 0.1
+    return max(0.1, min(0.95, chance))
+
+
+def _exercise_completion(user: SyntheticUser, difficulty: float, session_number: int, rng: random.Random) -> float:
+    completion = 0.85
+    gap = difficulty - user.capacity
+    if gap > 2:
+        completion -= 0.3
+    elif gap > 1:
+        completion -= 0.15
+    elif gap < -1:
+        completion += 0.1
+
+    completion += min(0.15, session_number * 0.008)
+    spread = 0.1 if user.pattern == 'consistent' else 0.3
+    completion += (rng.random() - 0.5) * spread
+    return max(0.2, min(1.0, completion))
+
+
+def _perform_session(user: SyntheticUser, session: Dict, session_number: int, rng: random.Random) -> List[Dict]:
+    """session_exercises rows (planned vs completed) for a session the user attended"""
+    rows = []
+    for block in session['exercise_blocks']:
+        exercise = block['exercise']
+        difficulty = block['progression_level'] if 'circuit_info' in session else exercise['difficulty_level']
+        completion = _exercise_completion(user, difficulty, session_number, rng)
+
+        rpe_noise = (rng.random() - 0.5) * (1 if user.technique_consistency > 0.8 else 2)
+        rpe = block['target_rpe'] + rpe_noise + max(0.0, difficulty - user.capacity)
+        rows.append({
+            'exercise_id': exercise['id'],
+            'category': exercise['category'],
+            'sets_planned': block['sets'],
+            'reps_planned': block['reps'],
+            'sets_completed': max(1, _js_round(block['sets'] * min(1.0, completion + 0.1))),
+            'reps_completed': math.floor(block['reps'] * completion),
+            'rpe_reported': max(1, min(10, _js_round(rpe))),
+            'technical_quality': max(1, min(5, _js_round(user.technique_consistency * 5 + rng.random() - 0.5))),
+        })
+    return rows
+
+
+def _update_progressions(user: SyntheticUser, session_exercises: List[Dict]) -> int:
+    """Apply the save-session-feedback progression rules; returns the number of level changes"""
+    by_category = {p['exercises']['category']: p for p in user.progressions}
+    changes = 0
+    for row in session_exercises:
+        progression = by_category.get(row['category'])
+        if progression is None:
+            continue
+
+        completion_rate = min(1.0, row['reps_completed'] / max(1, row['reps_planned'] or 10))
+        successful = completion_rate >= 0.8 and row['rpe_reported'] <= 8 and row['technical_quality'] >= 3
+        level = progression['current_level']
+
+        if successful:
+            progression['consecutive_completions'] += 1
+            if progression['consecutive_completions'] >= 3 and level < MAX_PROGRESSION_LEVEL:
+                level += 1
+                progression['consecutive_completions'] = 0
+            progression['personal_best_reps'] = max(progression['personal_best_reps'] or 0, row['reps_completed'])
+        else:
+            progression['consecutive_completions'] = 0
+            if (completion_rate < 0.5 or row['rpe_reported'] >= 9) and level > 1:
+                level -= 1
+
+        if level != progression['current_level']:
+            exercise = _exercise(row['category'], level)
+            progression.update(current_level=level, exercise_id=exercise['id'], exercises=exercise,
+                               personal_best_reps=None)
+            changes += 1
+    return changes
+
+
+def _session_days(days_per_week: int) -> List[int]:
+    """Training days within a week, spread as evenly as possible"""
+    return [math.floor(i * 7 / days_per_week) for i in range(days_per_week)]
+
+
+SIMULATION_COLUMNS = (
+    'user_id', 'pattern', 'fitness_level', 'week', 'session_number', 'session_date', 'mode',
+    'ica_score', 'intensity', 'exercise_count', 'total_sets', 'reps_planned', 'reps_completed',
+    'completed', 'completion_rate', 'avg_rpe', 'avg_technical_quality', 'avg_progression_level',
+    'level_changes', 'capacity',
+)
+
+
+def simulate_user(config: SimulationConfig, index: int) -> List[Dict]:
+    """Simulate one user for config.weeks weeks; returns one row per planned session"""
+    rng = _user_rng(config.seed, index)
+    user = make_user(config, index, rng)
+    start = date.fromisoformat(config.start_date)
+
+    recent_sessions: List[Dict] = []  # newest first, as calculate-ica queries them
+    algorithm_history: List[Dict] = []
+    rows = []
+    session_number = 0
+
+    for week in range(config.weeks):
+        for day in _session_days(user.profile['available_days_per_week']):
+            session_number += 1
+            session_date = (start + timedelta(days=week * 7 + day)).isoformat()
+            now = datetime.fromisoformat(session_date).replace(hour=7, tzinfo=timezone.utc)
+
+            ica_score = calculate_ica(user.profile, user.progressions, recent_sessions,
+                                      algorithm_history=algorithm_history, now=now)['ica_score']
+            algorithm_history.insert(0, {'calculation_date': now.isoformat(), 'current_ica': ica_score})
+            del algorithm_history[ALGORITHM_HISTORY_WINDOW:]
+
+            if config.mode == 'single':
+                session = generate_single_session(user.profile, ica_score, session_number, session_date)
+            else:
+                session = generate_session_from_progressions(user.profile, user.progressions, ica_score,
+                                                             session_number, session_date,
+                                                             config.progression_multiplier)
+
+            attended = rng.random() < _completion_chance(user, session_number, rng)
+            session_exercises = _perform_session(user, session, session_number, rng) if attended else []
+            level_changes = _update_progressions(user, session_exercises)
+
+            completion = (sum(min(1.0, e['reps_completed'] / e['reps_planned']) for e in session_exercises)
+                          / len(session_exercises)) if session_exercises else 0.0
+            if attended:
+                user.capacity = min(MAX_PROGRESSION_LEVEL + 1.0, user.capacity + user.trainability * completion)
+            else:
+                user.capacity = max(1.0, user.capacity - user.trainability / 2)
+
+            recent_sessions.insert(0, {
+                'session_date': session_date,
+                'status': 'completed' if attended else 'skipped',
+                'session_exercises': session_exercises,
+            })
+            del recent_sessions[RECENT_SESSIONS_WINDOW:]
+
+            blocks = session['exercise_blocks']
+            rows.append({
+                'user_id': user.user_id,
+                'pattern': user.pattern,
+                'fitness_level': user.profile['fitness_level'],
+                'week': week + 1,
+                'session_number': session_number,
+                'session_date': session_date,
+                'mode': config.mode,
+                'ica_score': ica_score,
+                'intensity': _js_round2(session['intensity']),
+                'exercise_count': len(blocks),
+                'total_sets': sum(b['sets'] for b in blocks),
+                'reps_planned': sum(b['sets'] * b['reps'] for b in blocks),
+                'reps_completed': sum(e['sets_completed'] * e['reps_completed'] for e in session_exercises),
+                'completed': attended,
+                'completion_rate': _js_round2(completion),
+                'avg_rpe': _js_round2(sum(e['rpe_reported'] for e in session_exercises) / len(session_exercises))
+                if session_exercises else None,
+                'avg_technical_quality': _js_round2(sum(e['technical_quality'] for e in session_exercises)
+                                                    / len(session_exercises)) if session_exercises else None,
+                'avg_progression_level': _js_round2(sum(p['current_level'] for p in user.progressions)
+                                                    / len(user.progressions)),
+                'level_changes': level_changes,
+                'capacity': _js_round2(user.capacity),
+            })
+    return rows
+
+
+def _simulate_chunk(args: Tuple[SimulationConfig, int, int]) -> List[Dict]:
+    config, start, stop = args
+    rows = []
+    for index in range(start, stop):
+        rows.extend(simulate_user(config, index))
+    return rows
+
+
+def simulate(config: SimulationConfig, workers: int = 1, chunk_size: int = 50) -> Iterator[List[Dict]]:
+    """
+    Simulate every user, yielding the rows of each chunk of users in user order
+
+    Args:
+        config: Population and algorithm settings
+        workers: Worker processes (1 simulates in this process)
+        chunk_size: Users per task handed to a worker
+
+    Returns:
+        Iterator over lists of rows, so results can be written as they arrive
+    """
+    chunks = [(config, start, min(start + chunk_size, config.users))
+              for start in range(0, config.users, chunk_size)]
+    if workers <= 1:
+        yield from map(_simulate_chunk, chunks)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        # imap keeps chunk order, so the output does not depend on scheduling
+        yield from pool.imap(_simulate_chunk, chunks)
+
+
+# ---------------------------------------------------------------------------
+# Result writers
+# ---------------------------------------------------------------------------
+
+class CSVResultWriter:
+    def __init__(self, path: str, columns: Iterable[str] = SIMULATION_COLUMNS):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=list(columns))
+        self._writer.writeheader()
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetResultWriter(CSVResultWriter):
+    """Writes rows to a Parquet file in row groups of at least `row_group_size` rows"""
+
+    def __init__(self, path: str, columns: Iterable[str] = SIMULATION_COLUMNS, row_group_size: int = 100000):
+        if pyarrow is None:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow); use a .csv output instead")
+        self._path = path
+        self._columns = list(columns)
+        self._row_group_size = row_group_size
+        self._buffer: List[Dict] = []
+        self._writer = None
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        table = pyarrow.Table.from_pylist(self._buffer).select(self._columns)
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+        self._buffer = []
+
+    def close(self) -> None:
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_result_writer(path: str) -> CSVResultWriter:
+    """CSV or Parquet writer, chosen by file extension"""
+    if path.endswith('.parquet'):
+        return ParquetResultWriter(path)
+    return CSVResultWriter(path)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _parse_patterns(value: str) -> Dict[str, float]:
+    patterns = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in BEHAVIOR_PATTERNS:
+            raise argparse.ArgumentTypeError(f"Unknown behavior pattern '{name}' (choose from {', '.join(BEHAVIOR_PATTERNS)})")
+        patterns[name] = float(weight or 1)
+    return patterns
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate synthetic users training for several weeks")
+    parser.add_argument("--users", type=int, default=1000, help="Synthetic users to simulate")
+    parser.add_argument("--weeks", type=int, default=8, help="Weeks of training per user")
+    parser.add_argument("--seed", type=int, default=42, help="Base seed; user i always gets the same stream")
+    parser.add_argument("--mode", choices=["circuit", "single"], default="circuit",
+                        help="Routine generator: progression circuits or the fixed single session")
+    parser.add_argument("--start-date", default="2025-01-06", help="Date of the first training week (YYYY-MM-DD)")
+    parser.add_argument("--progression-multiplier", type=float,
+                        help="What-if: confidence progression multiplier applied to the circuit ICA")
+    parser.add_argument("--patterns", type=_parse_patterns,
+                        help="Behavior mix, e.g. consistent=0.5,declining=0.5 (default: built-in mix)")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Users per worker task")
+    parser.add_argument("--output", default="simulation.csv", help="Output file (.csv or .parquet)")
+    parser.add_argument("--trace", help="Append chunk and write spans to this file as OTLP/JSON lines")
+    parser.add_argument("--profile", help="Sample stacks of this process and write them to this file (folded format)")
+    parser.add_argument("--profile-interval", type=float, default=5.0, help="Milliseconds between profile samples")
+    args = parser.parse_args(argv)
+
+    config = SimulationConfig(users=args.users, weeks=args.weeks, seed=args.seed, mode=args.mode,
+                              start_date=args.start_date, progression_multiplier=args.progression_multiplier)
+    if args.patterns:
+        config.patterns = args.patterns
+
+    print(f"🧪 Simulating {config.users} users × {config.weeks} weeks ({config.mode} routines) "
+          f"with {args.workers} workers → {args.output}")
+
+    tracer = Tracer(OTLPFileExporter(args.trace), service_name='bodyweight-simulator') if args.trace else NOOP_TRACER
+    profiler = SamplingProfiler(interval=args.profile_interval / 1000) if args.profile else None
+    if profiler is not None:
+        profiler.start()
+
+    started = time.perf_counter()
+    sessions = attended = 0
+    weekly_ica: Dict[int, List[float]] = {}
+    with open_result_writer(args.output) as writer, tracer.span('simulate', users=config.users, weeks=config.weeks):
+        chunks = simulate(config, args.workers, args.chunk_size)
+        while True:
+            with tracer.span('simulate.chunk') as span:
+                rows = next(chunks, None)
+                span.set_attribute('rows', len(rows or ()))
+            if rows is None:
+                break
+            with tracer.span('write', rows=len(rows)):
+                writer.write_rows(rows)
+            sessions += len(rows)
+            for row in rows:
+                attended += row['completed']
+                totals = weekly_ica.setdefault(row['week'], [0.0, 0])
+                totals[0] += row['ica_score']
+                totals[1] += 1
+    elapsed = time.perf_counter() - started
+    tracer.shutdown()
+
+    print(f"✅ {sessions:,} sessions in {elapsed:.1f}s ({sessions / elapsed:,.0f} sessions/s), "
+          f"attendance {attended / max(sessions, 1):.0%}")
+    for week, (total, count) in sorted(weekly_ica.items()):
+        print(f"   📅 Week {week}: mean ICA {total / count:.2f}")
+    print(f"💾 Config: {asdict(config)}")
+    if profiler is not None:
+        profiler.stop()
+        profiler.write_folded(args.profile)
+        profiler.print_top()
+        print(f"🔬 Profile written to {args.profile}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
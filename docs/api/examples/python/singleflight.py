@@ -0,0 +1,90 @@
+"""
+Bodyweight Training API - Request Coalescing
+Single-flight deduplication of identical concurrent requests
+"""
+
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+
+class SingleFlightStats:
+    """Counters describing how many calls were coalesced"""
+
+    def __init__(self):
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.coalesced_by_endpoint: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "coalesced_by_endpoint": dict(self.coalesced_by_endpoint),
+        }
+
+
+class SingleFlight:
+    """
+    Deduplicate identical in-flight calls across threads
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive with the same key while it is running wait for it and receive the
+    same exception or their own deep copy of the result. The copies are made
+    from a private snapshot taken before the leader returns, so the leader's
+    caller may mutate its result freely. A SingleFlight instance can be
+    shared by several clients to coalesce across them.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        # key -> (future, number of followers waiting on it)
+        self._in_flight: Dict[Hashable, List] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Tuple[str, ...], fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all concurrent callers sharing key
+
+        Args:
+            key: Tuple identifying the request; key[0] is used as the endpoint label in stats
+            fn: Zero-argument callable performing the request
+
+        Returns:
+            fn's result
+        """
+        with self._lock:
+            self.stats.calls += 1
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = [Future(), 0]
+                self.stats.executed += 1
+            else:
+                flight[1] += 1
+                self.stats.coalesced += 1
+                endpoint = str(key[0])
+                self.stats.coalesced_by_endpoint[endpoint] = self.stats.coalesced_by_endpoint.get(endpoint, 0) + 1
+        future = flight[0]
+
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        # No follower can join once the key is gone, so the snapshot is only
+        # needed (and only paid for) when someone is already waiting
+        with self._lock:
+            del self._in_flight[key]
+            followers = flight[1]
+        future.set_result(copy.deepcopy(result) if followers else None)
+        return result
@@ -0,0 +1,479 @@
+"""
+Bodyweight Training API - Local Edge Function Stub
+In-process stand-in for every endpoint in docs/api/openapi.yaml, for benchmarks
+
+Responses are built from the OpenAPI examples (or synthesized from the
+schemas), with configurable latency, error rates and payload sizes, so the
+clients can be measured without touching a real Supabase project.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+DEFAULT_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'openapi.yaml')
+
+
+@dataclass
+class EndpointBehavior:
+    """
+    Simulated behavior of one endpoint
+
+    Attributes:
+        latency: Base server-side latency in seconds
+        jitter: Extra uniformly distributed latency in seconds
+        error_rate: Probability of answering with error_status instead of 200
+        error_status: Status code of injected errors (429/503 include Retry-After)
+        retry_after: Retry-After seconds sent with 429/503 errors
+        payload_scale: Multiplier applied to the outermost lists in the response body
+            (inside each row for paginated training history)
+        stall_rate: Probability of an extra stall_latency delay (a stalled instance)
+        stall_latency: Extra latency in seconds of stalled requests
+    """
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    retry_after: float = 0.1
+    payload_scale: int = 1
+    stall_rate: float = 0.0
+    stall_latency: float = 0.0
+
+
+@dataclass
+class StubStats:
+    """Requests served by the stub, per endpoint"""
+    requests: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    bytes_sent: int = 0
+
+
+def _resolve(schema: Dict, components: Dict) -> Dict:
+    ref = schema.get('$ref')
+    if ref:
+        return _resolve(components[ref.rsplit('/', 1)[-1]], components)
+    return schema
+
+
+def example_from_schema(schema: Dict, components: Dict, depth: int = 0) -> Any:
+    """Build an example value from an OpenAPI schema, preferring declared examples"""
+    schema = _resolve(schema, components)
+    if 'example' in schema:
+        return schema['example']
+    if depth > 8:
+        return None
+    if 'allOf' in schema:
+        merged: Dict[str, Any] = {}
+        for part in schema['allOf']:
+            value = example_from_schema(part, components, depth + 1)
+            if isinstance(value, dict):
+                merged.update(value)
+        return merged
+    for key in ('oneOf', 'anyOf'):
+        if key in schema:
+            return example_from_schema(schema[key][0], components, depth + 1)
+    if 'enum' in schema:
+        return schema['enum'][0]
+
+    kind = schema.get('type', 'object' if 'properties' in schema else None)
+    if kind == 'object':
+        return {name: example_from_schema(prop, components, depth + 1)
+                for name, prop in schema.get('properties', {}).items()}
+    if kind == 'array':
+        return [example_from_schema(schema.get('items', {}), components, depth + 1)]
+    if kind == 'integer':
+        return int(schema.get('minimum', 1))
+    if kind == 'number':
+        return float(schema.get('minimum', 1.0))
+    if kind == 'boolean':
+        return True
+    if kind == 'string':
+        fmt = schema.get('format')
+        if fmt == 'uuid':
+            return '00000000-0000-4000-8000-000000000000'
+        if fmt == 'date-time':
+            return '2025-01-01T00:00:00Z'
+        if fmt == 'date':
+            return '2025-01-01'
+        return 'string'
+    return None
+
+
+def _properties(schema: Dict, components: Dict) -> Dict:
+    schema = _resolve(schema, components)
+    properties = dict(schema.get('properties', {}))
+    for part in schema.get('allOf', []):
+        properties.update(_properties(part, components))
+    return properties
+
+
+def _fill_empty_lists(value: Any, schema: Dict, components: Dict) -> Any:
+    """Give empty example arrays one schema-derived item so payloads have realistic content"""
+    schema = _resolve(schema, components)
+    if isinstance(value, list):
+        items = schema.get('items')
+        if not items:
+            return value
+        if not value:
+            return [example_from_schema(items, components)]
+        return [_fill_empty_lists(item, items, components) for item in value]
+    if isinstance(value, dict):
+        properties = _properties(schema, components)
+        return {key: _fill_empty_lists(item, properties[key], components) if key in properties else item
+                for key, item in value.items()}
+    return value
+
+
+def load_endpoint_examples(spec_path: str = DEFAULT_SPEC_PATH) -> Dict[str, Any]:
+    """
+    Read the success response example of every endpoint in the OpenAPI spec
+
+    Returns:
+        {endpoint path: example response body}
+    """
+    if yaml is None:
+        raise RuntimeError("The stub server reads openapi.yaml and needs PyYAML (pip install pyyaml)")
+
+    with open(spec_path, encoding='utf-8') as f:
+        spec = yaml.safe_load(f)
+
+    components = spec.get('components', {}).get('schemas', {})
+    examples = {}
+    for path, operations in spec['paths'].items():
+        for operation in operations.values():
+            responses = operation.get('responses', {})
+            ok = responses.get('200') or responses.get('201') or {}
+            content = ok.get('content', {}).get('application/json', {})
+            if 'example' in content:
+                body = content['example']
+            elif content.get('examples'):
+                body = next(iter(content['examples'].values())).get('value')
+            else:
+                body = example_from_schema(content.get('schema', {}), components)
+            examples[path] = _fill_empty_lists(body, content.get('schema', {}), components)
+    return examples
+
+
+def scale_payload(value: Any, factor: int) -> Any:
+    """Repeat the outermost lists of a JSON document factor times (nested lists are not compounded)"""
+    if factor <= 1:
+        return value
+    if isinstance(value, list):
+        return value * factor
+    if isinstance(value, dict):
+        return {key: scale_payload(item, factor) for key, item in value.items()}
+    return value
+
+
+# Endpoints answering If-None-Match with 304, like the edge functions using _shared/etag.ts
+ETAG_ENDPOINTS = ('/get-current-routine', '/get-latest-biometrics')
+
+ROUTINE_SECTIONS = ('warm_up', 'exercise_blocks', 'cool_down')
+
+
+def _tag(data: bytes, size: int) -> str:
+    return base64.urlsafe_b64encode(hashlib.sha256(data).digest()[:size]).rstrip(b'=').decode()
+
+
+def _matches_if_none_match(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(candidate.strip().removeprefix('W/') == etag for candidate in header.split(','))
+
+
+def _routine_delta(body: Dict, known_blocks) -> Dict:
+    """Delta-mode get-current-routine body, as built by _shared/routine_delta.ts"""
+    routine = body.get('routine')
+    if not routine:
+        return dict(body, delta=True)
+    known = set(known_blocks or ())
+    delta = dict(routine)
+    for section in ROUTINE_SECTIONS:
+        if not isinstance(routine.get(section), list):
+            continue
+        blocks = []
+        for block in routine[section]:
+            tag = _tag(json.dumps(block, separators=(',', ':')).encode(), 12)
+            blocks.append({'block_ref': tag} if tag in known else dict(block, block_etag=tag))
+        delta[section] = blocks
+    return {'routine': delta, 'delta': True}
+
+
+# Synthetic history: session i (newest first) is completed on HISTORY_END_DATE - 2i days
+HISTORY_END_DATE = date(2025, 6, 15)
+
+
+def _history_session(index: int) -> Dict:
+    """Deterministic get-training-history fields for the index-th newest session"""
+    return {
+        'id': f"session-{index}",
+        'session_date': (HISTORY_END_DATE - timedelta(days=2 * index)).isoformat(),
+        'status': 'completed',
+        'session_exercises': [{
+            'exercise_id': f"ex-{block}",
+            'sets_planned': 3,
+            'reps_planned': 10,
+            'sets_completed': 3,
+            'reps_completed': 6 + (index * 7 + block) % 5,
+            'rpe_reported': 6 + (index + block) % 3,
+            'technical_quality': 3 + (index * 3 + block) % 3,
+        } for block in range(3)],
+    }
+
+
+def synthetic_token(index: int, prefix: str = 'stub-user') -> str:
+    """Distinct JWT-shaped token for the index-th simulated user; the stub does not check signatures"""
+    payload = base64.urlsafe_b64encode(json.dumps({"sub": f"{prefix}-{index}"}).encode()).rstrip(b'=').decode()
+    return f"eyJhbGciOiJub25lIn0.{payload}.signature"
+
+
+class StubServer:
+    """
+    Threaded HTTP server answering /functions/v1/<endpoint> like the edge functions
+
+    get-training-history is paginated over `history_size` synthetic sessions
+    (honoring limit/offset/start_date) so iterators terminate; every other endpoint
+    returns its OpenAPI example, with empty arrays given one item from the
+    schema.
+    get-current-routine and get-latest-biometrics send ETags and answer a
+    matching If-None-Match with 304, and get-current-routine supports the
+    delta mode, as the edge functions do.
+
+    Usage:
+        with StubServer(default=EndpointBehavior(latency=0.02)) as stub:
+            client = BodyweightTrainingClient(stub.url, "header.payload.signature")
+    """
+
+    def __init__(self, spec_path: str = DEFAULT_SPEC_PATH,
+                 default: Optional[EndpointBehavior] = None,
+                 behaviors: Optional[Dict[str, EndpointBehavior]] = None,
+                 history_size: int = 250,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            spec_path: Path of the OpenAPI spec
+            default: Behavior of endpoints without their own entry
+            behaviors: Optional {endpoint: EndpointBehavior} overrides, e.g. {"/generate-routine": ...}
+            history_size: Number of sessions served by get-training-history
+            seed: Seed for latency jitter and error injection
+        """
+        self.default = default or EndpointBehavior()
+        self.behaviors = dict(behaviors or {})
+        self.history_size = history_size
+        self.stats = StubStats()
+        self._examples = load_endpoint_examples(spec_path)
+        self._encoded: Dict[Tuple[str, int], bytes] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoints(self):
+        return sorted(self._examples)
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to the clients as supabase_url"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def behavior_for(self, endpoint: str) -> EndpointBehavior:
+        return self.behaviors.get(endpoint, self.default)
+
+    def set_response(self, endpoint: str, body: Any) -> None:
+        """Replace an endpoint's response body, e.g. to simulate an updated routine"""
+        with self._lock:
+            self._examples[endpoint] = body
+            self._encoded = {key: value for key, value in self._encoded.items() if key[0] != endpoint}
+
+    def _body_for(self, endpoint: str, payload: Optional[Dict], scale: int) -> bytes:
+        if endpoint == '/get-training-history':
+            # Shaped like the edge function (training_history + pagination); the
+            # spec documents the same rows under "sessions"
+            payload = payload or {}
+            limit = min(int(payload.get('limit') or 10), 100)
+            offset = int(payload.get('offset') or 0)
+            example = self._examples[endpoint]
+            template = (example.get('sessions') or example.get('training_history') or [{}])[0]
+            available = self.history_size
+            if payload.get('start_date'):
+                days = (HISTORY_END_DATE - date.fromisoformat(payload['start_date'])).days
+                available = min(available, max(0, days // 2 + 1))
+            page = [dict(template, **_history_session(i)) for i in range(offset, min(offset + limit, available))]
+            body = {key: item for key, item in example.items() if key != 'sessions'}
+            body['training_history'] = [scale_payload(row, scale) for row in page]
+            body['pagination'] = {'limit': limit, 'offset': offset, 'has_more': len(page) == limit}
+            return json.dumps(body).encode()
+
+        key = (endpoint, scale)
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = self._encoded[key] = json.dumps(scale_payload(self._examples[endpoint], scale)).encode()
+        return encoded
+
+    def _respond(self, handler: BaseHTTPRequestHandler) -> None:
+        endpoint = '/' + handler.path.split('?')[0].rstrip('/').rsplit('/', 1)[-1]
+        length = int(handler.headers.get('Content-Length') or 0)
+        raw = handler.rfile.read(length) if length else b''
+
+        if endpoint not in self._examples:
+            self._send(handler, 404, b'{"error":"Function not found"}')
+            return
+
+        behavior = self.behavior_for(endpoint)
+        with self._lock:
+            delay = behavior.latency + self._random.uniform(0, behavior.jitter)
+            if behavior.stall_rate and self._random.random() < behavior.stall_rate:
+                delay += behavior.stall_latency
+            failed = self._random.random() < behavior.error_rate
+            self.stats.requests[endpoint] = self.stats.requests.get(endpoint, 0) + 1
+            if failed:
+                self.stats.errors[endpoint] = self.stats.errors.get(endpoint, 0) + 1
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            headers = {'Retry-After': str(behavior.retry_after)} if behavior.error_status in (429, 503) else {}
+            self._send(handler, behavior.error_status, b'{"error":"Injected failure"}', headers)
+            return
+
+        try:
+            payload = json.loads(raw) if raw else None
+        except ValueError:
+            self._send(handler, 400, b'{"error":"Invalid JSON"}')
+            return
+        body = self._body_for(endpoint, payload, behavior.payload_scale)
+        if endpoint not in ETAG_ENDPOINTS:
+            self._send(handler, 200, body)
+            return
+
+        # The ETag covers the full body, so it is the same in delta mode
+        etag = f'"{_tag(body, 16)}"'
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if _matches_if_none_match(handler.headers.get('If-None-Match'), etag):
+            self._send(handler, 304, b'', headers)
+            return
+        if endpoint == '/get-current-routine' and isinstance(payload, dict) and payload.get('delta'):
+            body = json.dumps(_routine_delta(json.loads(body), payload.get('known_blocks'))).encode()
+        self._send(handler, 200, body, headers)
+
+    def _send(self, handler: BaseHTTPRequestHandler, status: int, body: bytes,
+              headers: Optional[Dict[str, str]] = None) -> None:
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+        with self._lock:
+            self.stats.bytes_sent += len(body)
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> 'StubServer':
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real gateway
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; without NODELAY,
+                # Nagle + delayed ACK adds ~40ms to every keep-alive response
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_POST(self):
+                stub._respond(self)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 256  # the default backlog of 5 drops connection bursts
+
+        self._server = Server((host, port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def _serve_in_child(connection, kwargs: Dict[str, Any]) -> None:
+    stub = StubServer(**kwargs).start()
+    connection.send(stub.url)
+    connection.recv()  # blocks until the parent asks us to stop
+    stub.stop()
+
+
+class StubProcess:
+    """
+    StubServer running in a child process
+
+    Benchmarks should use this so the stub's request handling does not
+    compete with the measured client for the parent's GIL.
+    """
+
+    def __init__(self, **stub_kwargs):
+        self.stub_kwargs = stub_kwargs
+        self.url: Optional[str] = None
+        self._process = None
+        self._connection = None
+
+    def __enter__(self) -> 'StubProcess':
+        import multiprocessing
+
+        context = multiprocessing.get_context('spawn')
+        self._connection, child = context.Pipe()
+        self._process = context.Process(target=_serve_in_child, args=(child, self.stub_kwargs), daemon=True)
+        self._process.start()
+        self.url = self._connection.recv()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._connection.send('stop')
+        self._process.join(timeout=5)
+
+
+if __name__ == "__main__":
+    import sys
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 54321
+    stub = StubServer().start(port=port)
+    print(f"🧪 Stub edge functions listening on {stub.url}/functions/v1")
+    for endpoint in stub.endpoints:
+        print(f"   POST {endpoint}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,316 @@
+"""
+Bodyweight Training API - Tracing
+Structured spans around the phases of a request, with OpenTelemetry-compatible export
+
+Usage:
+    tracer = Tracer(OTLPFileExporter('spans.ndjson'))
+    client = AdvancedBodyweightClient(url, token, tracer=tracer)
+    ...
+    tracer.shutdown()
+
+Clients trace the request phases (request, encode, send, wait, decode,
+cache.lookup, retry.attempt, retry.backoff) and post-processing
+(postprocess) under the span of whatever the caller has open, so wrapping
+application code in `tracer.span(...)` nests the client's spans under it.
+Spans are exported as OTLP/JSON (the OpenTelemetry protocol's JSON
+encoding), which an OpenTelemetry Collector accepts from a file or over
+HTTP. Without a tracer the clients use NOOP_TRACER, whose spans are a
+shared do-nothing object.
+"""
+
+import contextvars
+import json
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Span open in the current thread or asyncio task
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('bodyweight_span', default=None)
+
+
+class Span:
+    """
+    One timed operation, used as a context manager
+
+    Times are epoch nanoseconds, as OpenTelemetry expects.
+    """
+
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'kind', 'attributes',
+                 'start_ns', 'end_ns', 'status', 'status_message', '_token')
+
+    def __init__(self, tracer: 'Tracer', name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Dict[str, Any], kind: int = SPAN_KIND_INTERNAL):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.status = STATUS_UNSET
+        self.status_message = ''
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> 'Span':
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.status = STATUS_ERROR
+            self.status_message = f"{exc_type.__name__}: {exc}"
+        self.tracer._finish(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class _NoopSpan:
+    """Span stand-in that records nothing; one shared instance serves every call"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledSpan(_NoopSpan):
+    """Marks an unsampled trace so the spans nested in it are dropped too"""
+
+    __slots__ = ('_token',)
+
+    def __enter__(self) -> '_UnsampledSpan':
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+
+
+class NoopTracer:
+    """Tracer that records nothing; the clients' default"""
+
+    enabled = False
+
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> _NoopSpan:
+        return _NOOP_SPAN
+
+    def record_span(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+NOOP_TRACER = NoopTracer()
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to an exporter in batches
+
+    Sampling is decided once per trace, at its root span: with
+    `sample_rate=0.1` one trace in ten is recorded in full and the others
+    cost about as much as the no-op tracer. Thread-safe; spans nest per
+    thread and per asyncio task.
+    """
+
+    enabled = True
+
+    def __init__(self, exporter: Optional['SpanExporter'] = None, service_name: str = 'bodyweight-client',
+                 sample_rate: float = 1.0, batch_size: int = 512):
+        """
+        Args:
+            exporter: Receives finished spans (defaults to an InMemorySpanExporter)
+            service_name: service.name resource attribute of the exported spans
+            sample_rate: Fraction of traces recorded
+            batch_size: Finished spans buffered before they are exported
+        """
+        self.exporter = exporter if exporter is not None else InMemorySpanExporter()
+        self.service_name = service_name
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self._pending: List[Span] = []
+        self._lock = threading.Lock()
+
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any):
+        """Start a span nested under the current one; use it as a context manager"""
+        parent = _current_span.get()
+        if parent is None:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return _UnsampledSpan()
+            return Span(self, name, f"{random.getrandbits(128):032x}", None, attributes, kind)
+        if isinstance(parent, _NoopSpan):
+            return _NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes, kind)
+
+    def record_span(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        """Record an already-finished child of the current span, e.g. one measured by a library"""
+        parent = _current_span.get()
+        if not isinstance(parent, Span):
+            return
+        span = Span(self, name, parent.trace_id, parent.span_id, attributes)
+        span.start_ns = start_ns
+        span.end_ns = end_ns
+        self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self._pending.append(span)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+        self.exporter.export(batch, self.service_name)
+
+    def flush(self) -> None:
+        """Export the buffered spans now"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self.exporter.export(batch, self.service_name)
+
+    def shutdown(self) -> None:
+        self.flush()
+        self.exporter.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: Sequence[Span], service_name: str) -> Dict[str, Any]:
+    """Encode spans as an OTLP/JSON ExportTraceServiceRequest"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+        "scopeSpans": [{
+            "scope": {"name": "bodyweight_client"},
+            "spans": [{
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "kind": span.kind,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+                "status": {"code": span.status, "message": span.status_message},
+            } for span in spans],
+        }],
+    }]}
+
+
+class SpanExporter:
+    """Base class for span exporters"""
+
+    def export(self, spans: Sequence[Span], service_name: str) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps every finished span, e.g. for tests or a per-phase summary"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: Sequence[Span], service_name: str) -> None:
+        self.spans.extend(spans)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, total and mean milliseconds per span name"""
+        totals: Dict[str, List[float]] = {}
+        for span in self.spans:
+            totals.setdefault(span.name, []).append(span.duration_ms)
+        return {name: {"count": len(values), "total_ms": sum(values), "mean_ms": sum(values) / len(values)}
+                for name, values in sorted(totals.items())}
+
+
+class OTLPFileExporter(SpanExporter):
+    """
+    Appends one OTLP/JSON export request per batch to an NDJSON file
+
+    The OpenTelemetry Collector's otlpjsonfile receiver reads this format.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Span], service_name: str) -> None:
+        line = json.dumps(to_otlp(spans, service_name), separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class OTLPHTTPExporter(SpanExporter):
+    """
+    POSTs OTLP/JSON batches to a collector's /v1/traces endpoint
+
+    Export failures are swallowed so tracing never breaks the traced code.
+    """
+
+    def __init__(self, endpoint: str = 'http://localhost:4318/v1/traces', timeout: float = 5.0,
+                 headers: Optional[Dict[str, str]] = None):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+        self.failed_exports = 0
+
+    def export(self, spans: Sequence[Span], service_name: str) -> None:
+        # Deferred: urllib.request is slow to import and only HTTP export needs it
+        import urllib.request
+
+        body = json.dumps(to_otlp(spans, service_name), separators=(',', ':')).encode('utf-8')
+        request = urllib.request.Request(self.endpoint, data=body, headers=self.headers, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        except OSError:
+            self.failed_exports += 1
@@ -0,0 +1,56 @@
+import { corsHeaders } from './cors.ts'
+
+// Content-Encoding values accepted for request bodies
+const SUPPORTED_ENCODINGS = ['gzip', 'deflate']
+
+export class UnsupportedEncodingError extends Error {
+  constructor(public encoding: string) {
+    super(`Unsupported Content-Encoding: ${encoding}`)
+  }
+}
+
+/**
+ * Lee el cuerpo JSON de la petición, descomprimiéndolo si el cliente
+ * lo envió con Content-Encoding gzip/deflate (subidas masivas)
+ */
+export async function readJsonBody<T = any>(req: Request): Promise<T> {
+  const encoding = (req.headers.get('content-encoding') || 'identity').toLowerCase()
+
+  if (encoding === 'identity') {
+    return await req.json()
+  }
+  if (!SUPPORTED_ENCODINGS.includes(encoding) || !req.body) {
+    throw new UnsupportedEncodingError(encoding)
+  }
+
+  const stream = req.body.pipeThrough(new DecompressionStream(encoding as CompressionFormat))
+  return await new Response(stream).json()
+}
+
+/**
+ * Respuesta 415 para que el cliente reintente sin comprimir
+ */
+export function unsupportedEncodingResponse(error: UnsupportedEncodingError): Response {
+  return new Response(
+    JSON.stringify({ error: error.message, supported_encodings: SUPPORTED_ENCODINGS }),
+    { status: 415, headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+  )
+}
+
+/**
+ * Como readJsonBody, pero para endpoints cuyo cuerpo es opcional:
+ * devuelve null si la petición llega sin cuerpo
+ */
+export async function readOptionalJsonBody<T = any>(req: Request): Promise<T | null> {
+  if (!req.body || req.headers.get('content-length') === '0') {
+    return null
+  }
+  try {
+    return await readJsonBody<T>(req)
+  } catch (error) {
+    if (error instanceof SyntaxError) {
+      return null
+    }
+    throw error
+  }
+}
@@ -0,0 +1,57 @@
+import { corsHeaders } from './cors.ts'
+
+/**
+ * Hash SHA-256 truncado en base64url, para ETags y huellas de bloques
+ */
+export async function sha256Tag(text: string, bytes = 16): Promise<string> {
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text))
+  const binary = String.fromCharCode(...new Uint8Array(digest).slice(0, bytes))
+  return btoa(binary).replace(/\+/g, '-').replace(/\//g, '_').replace(/=+$/, '')
+}
+
+/**
+ * ¿Coincide If-None-Match con el ETag actual? (comparación débil, RFC 9110)
+ */
+export function matchesIfNoneMatch(req: Request, etag: string): boolean {
+  const header = req.headers.get('if-none-match')
+  if (!header) {
+    return false
+  }
+  if (header.trim() === '*') {
+    return true
+  }
+  const opaque = etag.replace(/^W\//, '')
+  return header.split(',').some((candidate) => candidate.trim().replace(/^W\//, '') === opaque)
+}
+
+/**
+ * Respuesta JSON con ETag para endpoints consultados por polling.
+ *
+ * El ETag se calcula sobre el payload completo; si el cliente ya tiene esa
+ * versión (If-None-Match) se responde 304 sin cuerpo. `render` permite
+ * enviar otra representación del mismo recurso (p. ej. el modo delta de
+ * get-current-routine) sin que cambie el ETag.
+ */
+export async function conditionalJsonResponse(
+  req: Request,
+  payload: unknown,
+  headers: Record<string, string> = corsHeaders,
+  render: (payload: any) => unknown | Promise<unknown> = (p) => p,
+): Promise<Response> {
+  const etag = `"${await sha256Tag(JSON.stringify(payload))}"`
+  const responseHeaders = {
+    ...headers,
+    'ETag': etag,
+    'Cache-Control': 'private, no-cache',
+    'Access-Control-Expose-Headers': 'ETag',
+  }
+
+  if (matchesIfNoneMatch(req, etag)) {
+    return new Response(null, { status: 304, headers: responseHeaders })
+  }
+
+  return new Response(
+    JSON.stringify(await render(payload)),
+    { headers: { ...responseHeaders, 'Content-Type': 'application/json' } }
+  )
+}
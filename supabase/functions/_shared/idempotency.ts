@@ -0,0 +1,124 @@
+// @ts-ignore - External module import
+import { createClient } from 'https://esm.sh/@supabase/supabase-js@2.38.4'
+import { corsHeaders } from './cors.ts'
+
+export const IDEMPOTENCY_HEADER = 'idempotency-key'
+
+// Una reclamación sin respuesta más antigua que esto se da por abandonada
+// (la función murió a mitad); coincide con el límite de ejecución de las edge functions
+const IN_PROGRESS_TIMEOUT_MS = 150_000
+
+// Violación de la clave primaria en Postgres
+const UNIQUE_VIOLATION = '23505'
+
+type Handler = (req: Request) => Promise<Response>
+
+function jsonResponse(body: unknown, status: number, extra: Record<string, string> = {}): Response {
+  return new Response(
+    JSON.stringify(body),
+    { status, headers: { ...corsHeaders, 'Content-Type': 'application/json', ...extra } }
+  )
+}
+
+/**
+ * Deduplica escrituras reenviadas con la misma cabecera Idempotency-Key.
+ *
+ * La clave se reclama (por usuario) antes de ejecutar el handler y se completa
+ * con su respuesta; un reintento con la misma clave recibe la respuesta
+ * guardada (cabecera Idempotent-Replayed) sin repetir la escritura. Si el
+ * original sigue en curso se responde 409 con Retry-After. Solo se guardan
+ * respuestas 2xx: un error (p. ej. 415 antes de reenviar sin comprimir, o un
+ * 5xx) libera la clave para que el reintento vuelva a ejecutarse.
+ *
+ * Sin cabecera, o sin usuario autenticado, se llama al handler tal cual.
+ */
+export function withIdempotency(endpoint: string, handler: Handler): Handler {
+  return async (req: Request): Promise<Response> => {
+    const key = req.headers.get(IDEMPOTENCY_HEADER)
+    const authHeader = req.headers.get('Authorization')
+    if (req.method !== 'POST' || !key || !authHeader) {
+      return handler(req)
+    }
+
+    const supabase = createClient(
+      Deno.env.get('SUPABASE_URL') ?? '',
+      Deno.env.get('SUPABASE_ANON_KEY') ?? '',
+      { global: { headers: { Authorization: authHeader } } }
+    )
+    const { data: { user } } = await supabase.auth.getUser(authHeader.replace('Bearer ', ''))
+    if (!user) {
+      return handler(req) // el handler responde 401
+    }
+
+    const row = () => supabase.from('idempotency_keys').select('*').eq('user_id', user.id).eq('idempotency_key', key)
+    const release = () => supabase.from('idempotency_keys').delete()
+      .eq('user_id', user.id).eq('idempotency_key', key).is('response_status', null)
+
+    const { error: claimError } = await supabase
+      .from('idempotency_keys')
+      .insert({ user_id: user.id, idempotency_key: key, endpoint })
+
+    if (claimError) {
+      if (claimError.code !== UNIQUE_VIOLATION) {
+        console.error('Error claiming idempotency key:', claimError)
+        return jsonResponse({ error: 'Internal server error', details: claimError.message }, 500)
+      }
+      const { data: existing } = await row().maybeSingle()
+      if (!existing) {
+        // Liberada entre el insert y la lectura: el cliente puede reintentar ya
+        return jsonResponse({ error: 'Idempotency key is being released, retry' }, 409, { 'Retry-After': '1' })
+      }
+      if (existing.endpoint !== endpoint) {
+        return jsonResponse({ error: `Idempotency key already used for ${existing.endpoint}` }, 422)
+      }
+      if (existing.response_status !== null) {
+        return new Response(existing.response_body, {
+          status: existing.response_status,
+          headers: {
+            ...corsHeaders,
+            'Content-Type': 'application/json',
+            'Idempotent-Replayed': 'true',
+            'Access-Control-Expose-Headers': 'Idempotent-Replayed',
+          },
+        })
+      }
+      // En curso: solo se toma el relevo si la reclamación está abandonada
+      const staleBefore = new Date(Date.now() - IN_PROGRESS_TIMEOUT_MS).toISOString()
+      const { data: takenOver } = await supabase
+        .from('idempotency_keys')
+        .update({ created_at: new Date().toISOString() })
+        .eq('user_id', user.id)
+        .eq('idempotency_key', key)
+        .is('response_status', null)
+        .lt('created_at', staleBefore)
+        .select()
+      if (!takenOver || takenOver.length === 0) {
+        return jsonResponse({ error: 'A request with this idempotency key is in progress' }, 409, { 'Retry-After': '1' })
+      }
+    }
+
+    let response: Response
+    try {
+      response = await handler(req)
+    } catch (error) {
+      await release()
+      throw error
+    }
+
+    if (!response.ok) {
+      await release()
+      return response
+    }
+
+    const body = await response.text()
+    const { error: saveError } = await supabase
+      .from('idempotency_keys')
+      .update({ response_status: response.status, response_body: body })
+      .eq('user_id', user.id)
+      .eq('idempotency_key', key)
+    if (saveError) {
+      console.error('Error saving idempotent response:', saveError)
+    }
+    return new Response(body, { status: response.status, headers: response.headers })
+  }
+}
@@ -0,0 +1,31 @@
+import { sha256Tag } from './etag.ts'
+
+// Secciones de una rutina que contienen bloques de ejercicios
+const ROUTINE_SECTIONS = ['warm_up', 'exercise_blocks', 'cool_down']
+
+/**
+ * Modo delta de get-current-routine.
+ *
+ * Cada bloque se identifica por una huella de su contenido (block_etag).
+ * Los bloques cuya huella el cliente ya conoce (known_blocks) se envían
+ * como { block_ref } en lugar del bloque completo; el resto se envía
+ * completo con su block_etag para que el cliente lo guarde.
+ */
+export async function toRoutineDelta(routine: any, knownBlocks: string[] = []): Promise<any> {
+  if (!routine) {
+    return routine
+  }
+
+  const known = new Set(knownBlocks)
+  const delta = { ...routine }
+  for (const section of ROUTINE_SECTIONS) {
+    if (!Array.isArray(routine[section])) {
+      continue
+    }
+    delta[section] = await Promise.all(routine[section].map(async (block: any) => {
+      const tag = await sha256Tag(JSON.stringify(block), 12)
+      return known.has(tag) ? { block_ref: tag } : { ...block, block_etag: tag }
+    }))
+  }
+  return delta
+}
@@ -1,6 +1,15 @@
 import { serve } from "https://deno.land/std@0.168.0/http/server.ts"
 import { createClient } from 'https://esm.sh/@supabase/supabase-js@2.38.4'
 import { corsHeaders } from '../_shared/cors.ts'
+import { readOptionalJsonBody, UnsupportedEncodingError, unsupportedEncodingResponse } from '../_shared/body.ts'
+import { conditionalJsonResponse } from '../_shared/etag.ts'
+import { toRoutineDelta } from '../_shared/routine_delta.ts'
+
+interface CurrentRoutineRequest {
+  // Modo delta: los bloques cuya huella aparece en known_blocks se envían como referencia
+  delta?: boolean
+  known_blocks?: string[]
+}
 
 serve(async (req) => {
   if (req.method === 'OPTIONS') {
@@ -31,6 +40,13 @@ serve(async (req) => {
       )
     }
 
+    const params: CurrentRoutineRequest = await readOptionalJsonBody(req) ?? {}
+
+    // El ETag se calcula sobre la rutina completa, así que un 304 vale para ambos modos
+    const render = params.delta
+      ? async (payload: any) => ({ routine: await toRoutineDelta(payload.routine, params.known_blocks), delta: true })
+      : undefined
+
     const today = new Date().toISOString().split('T')[0]
     
     // Get today's planned session
@@ -56,10 +72,7 @@ serve(async (req) => {
     }
 
     if (!data) {
-      return new Response(
-        JSON.stringify({ routine: null }),
-        { headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
-      )
+      return await conditionalJsonResponse(req, { routine: null }, corsHeaders, render)
     }
 
     // Convert to GeneratedSession format
@@ -108,12 +121,12 @@ serve(async (req) => {
       notes: data.notes || 'Rutina personalizada'
     }
 
-    return new Response(
-      JSON.stringify({ routine }),
-      { headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
-    )
+    return await conditionalJsonResponse(req, { routine }, corsHeaders, render)
 
   } catch (error) {
+    if (error instanceof UnsupportedEncodingError) {
+      return unsupportedEncodingResponse(error)
+    }
     console.error('Error in get-current-routine:', error)
     return new Response(
       JSON.stringify({ 
@@ -1,9 +1,10 @@
 import { serve } from "https://deno.land/std@0.177.0/http/server.ts"
 import { createClient } from 'https://esm.sh/@supabase/supabase-js@2'
+import { conditionalJsonResponse } from '../_shared/etag.ts'
 
 const corsHeaders = {
   'Access-Control-Allow-Origin': '*',
-  'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
+  'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type, if-none-match',
   'Access-Control-Allow-Methods': 'GET, POST, OPTIONS'
 }
 
@@ -59,41 +60,30 @@ serve(async (req) => {
         throw profileError
       }
 
-      return new Response(
-        JSON.stringify({
-          ...profile,
-          last_updated: profile.updated_at
-        }),
-        { 
-          headers: { ...corsHeaders, 'Content-Type': 'application/json' },
-          status: 200 
-        }
-      )
+      return await conditionalJsonResponse(req, {
+        ...profile,
+        last_updated: profile.updated_at
+      }, corsHeaders)
     }
 
     // Return latest biometrics data
     const biometricData = latestBiometrics[0] || {}
     
-    return new Response(
-      JSON.stringify({
-        weight: biometricData.weight,
-        height: biometricData.height,
-        body_fat_percentage: biometricData.body_fat_percentage,
-        resting_hr: biometricData.resting_hr,
-        training_hr_avg: biometricData.training_hr_avg,
-        sleep_hours: biometricData.sleep_hours,
-        sleep_quality: biometricData.sleep_quality,
-        fatigue_level: biometricData.fatigue_level,
-        age: biometricData.age,
-        bmi: biometricData.bmi,
-        last_updated: biometricData.snapshot_date,
-        days_old: biometricData.days_old
-      }),
-      { 
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' },
-        status: 200 
-      }
-    )
+    // Con ETag: las apps consultan este endpoint por polling y casi nunca cambia
+    return await conditionalJsonResponse(req, {
+      weight: biometricData.weight,
+      height: biometricData.height,
+      body_fat_percentage: biometricData.body_fat_percentage,
+      resting_hr: biometricData.resting_hr,
+      training_hr_avg: biometricData.training_hr_avg,
+      sleep_hours: biometricData.sleep_hours,
+      sleep_quality: biometricData.sleep_quality,
+      fatigue_level: biometricData.fatigue_level,
+      age: biometricData.age,
+      bmi: biometricData.bmi,
+      last_updated: biometricData.snapshot_date,
+      days_old: biometricData.days_old
+    }, corsHeaders)
 
   } catch (error) {
     console.error('Error in get-latest-biometrics function:', error)
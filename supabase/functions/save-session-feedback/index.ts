@@ -3,6 +3,8 @@ import { serve } from "https://deno.land/std@0.168.0/http/server.ts"
 // @ts-ignore - External module import
 import { createClient } from 'https://esm.sh/@supabase/supabase-js@2.38.4'
 import { corsHeaders } from '../_shared/cors.ts'
+import { readJsonBody, UnsupportedEncodingError, unsupportedEncodingResponse } from '../_shared/body.ts'
+import { withIdempotency } from '../_shared/idempotency.ts'
 
 // Deno global declarations for TypeScript
 declare const Deno: {
@@ -42,7 +44,7 @@ interface SaveFeedbackRequest {
   }[]
 }
 
-serve(async (req: Request) => {
+serve(withIdempotency('save-session-feedback', async (req: Request) => {
   if (req.method === 'OPTIONS') {
     return new Response('ok', { headers: corsHeaders })
   }
@@ -71,7 +73,7 @@ serve(async (req: Request) => {
       )
     }
 
-    const { sessionId, feedback, exercisePerformance }: SaveFeedbackRequest = await req.json()
+    const { sessionId, feedback, exercisePerformance }: SaveFeedbackRequest = await readJsonBody(req)
 
     if (!sessionId || !feedback) {
       return new Response(
@@ -467,6 +469,9 @@ serve(async (req: Request) => {
     )
 
   } catch (error) {
+    if (error instanceof UnsupportedEncodingError) {
+      return unsupportedEncodingResponse(error)
+    }
     console.error('Error in save-session-feedback:', error)
     return new Response(
       JSON.stringify({ 
@@ -479,4 +484,4 @@ serve(async (req: Request) => {
       }
     )
   }
-})
\ No newline at end of file
+}))
\ No newline at end of file
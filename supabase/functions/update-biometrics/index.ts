@@ -1,9 +1,10 @@
 import { serve } from "https://deno.land/std@0.177.0/http/server.ts"
 import { createClient } from 'https://esm.sh/@supabase/supabase-js@2'
+import { withIdempotency } from '../_shared/idempotency.ts'
 
 const corsHeaders = {
   'Access-Control-Allow-Origin': '*',
-  'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
+  'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type, idempotency-key',
   'Access-Control-Allow-Methods': 'GET, POST, OPTIONS'
 }
 
@@ -20,7 +21,7 @@ interface BiometricUpdateRequest {
   notes?: string
 }
 
-serve(async (req) => {
+serve(withIdempotency('update-biometrics', async (req: Request) => {
   // Handle CORS preflight requests
   if (req.method === 'OPTIONS') {
     return new Response('ok', { headers: corsHeaders })
@@ -242,4 +243,4 @@ serve(async (req) => {
       }
     )
   }
-})
\ No newline at end of file
+}))
\ No newline at end of file
@@ -1,6 +1,8 @@
 import { serve } from "https://deno.land/std@0.168.0/http/server.ts"
 import { createClient } from 'https://esm.sh/@supabase/supabase-js@2.38.4'
 import { corsHeaders } from '../_shared/cors.ts'
+import { readJsonBody, UnsupportedEncodingError, unsupportedEncodingResponse } from '../_shared/body.ts'
+import { withIdempotency } from '../_shared/idempotency.ts'
 
 interface UpdateProgressionsRequest {
   sessionId: string
@@ -15,7 +17,7 @@ interface UpdateProgressionsRequest {
   }>
 }
 
-serve(async (req) => {
+serve(withIdempotency('update-progressions', async (req: Request) => {
   if (req.method === 'OPTIONS') {
     return new Response('ok', { headers: corsHeaders })
   }
@@ -44,7 +46,7 @@ serve(async (req) => {
       )
     }
 
-    const { sessionId, exerciseBlocks }: UpdateProgressionsRequest = await req.json()
+    const { sessionId, exerciseBlocks }: UpdateProgressionsRequest = await readJsonBody(req)
 
     if (!sessionId || !exerciseBlocks || !Array.isArray(exerciseBlocks)) {
       return new Response(
@@ -244,6 +246,9 @@ serve(async (req) => {
     )
 
   } catch (error) {
+    if (error instanceof UnsupportedEncodingError) {
+      return unsupportedEncodingResponse(error)
+    }
     console.error('Error in update-progressions:', error)
     return new Response(
       JSON.stringify({ 
@@ -256,4 +261,4 @@ serve(async (req) => {
       }
     )
   }
-})
\ No newline at end of file
+}))
\ No newline at end of file
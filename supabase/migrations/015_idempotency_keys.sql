@@ -0,0 +1,32 @@
+-- Idempotency keys for replayed writes (save-session-feedback, update-progressions, update-biometrics)
+-- A row is claimed before the write runs (response_status NULL) and completed with the response,
+-- so a retry carrying the same Idempotency-Key gets the stored response instead of a second write
+CREATE TABLE public.idempotency_keys (
+  user_id UUID REFERENCES public.user_profiles(id) ON DELETE CASCADE,
+  idempotency_key TEXT NOT NULL,
+  endpoint TEXT NOT NULL,
+  response_status INTEGER,
+  response_body TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  PRIMARY KEY (user_id, idempotency_key)
+);
+
+-- Old keys can be purged by created_at; clients only replay recent writes
+CREATE INDEX idx_idempotency_keys_created ON public.idempotency_keys(created_at);
+
+-- Enable RLS
+ALTER TABLE public.idempotency_keys ENABLE ROW LEVEL SECURITY;
+
+-- Create RLS policies
+CREATE POLICY "Users can view own idempotency keys" ON public.idempotency_keys
+  FOR SELECT USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own idempotency keys" ON public.idempotency_keys
+  FOR INSERT WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own idempotency keys" ON public.idempotency_keys
+  FOR UPDATE USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own idempotency keys" ON public.idempotency_keys
+  FOR DELETE USING (auth.uid() = user_id);
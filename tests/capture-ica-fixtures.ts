@@ -0,0 +1,98 @@
+// Captura fixtures de paridad para el port Python de calculateICA
+// (docs/api/examples/python/ica.py)
+//
+// Uso:
+//   deno run --allow-write tests/capture-ica-fixtures.ts
+//
+// Genera casos sintéticos deterministas (semilla fija), los evalúa con
+// AdaptiveTrainingAlgorithm.calculateICA usando una fecha "ahora" fija y
+// guarda entradas + salidas esperadas en el archivo de fixtures.
+
+import { AdaptiveTrainingAlgorithm } from '../supabase/functions/_shared/algorithm.ts'
+
+const OUTPUT = 'docs/api/examples/python/fixtures/ica_parity.json'
+const NOW = Date.parse('2025-06-15T12:00:00Z')
+const DAY = 24 * 60 * 60 * 1000
+const CASES = 60
+
+// Congelar el reloj: el algoritmo usa Date.now() y new Date()
+const RealDate = Date
+class FixedDate extends RealDate {
+  constructor(...args: any[]) {
+    if (args.length === 0) super(NOW)
+    else super(...(args as []))
+  }
+  static now() { return NOW }
+}
+;(globalThis as any).Date = FixedDate
+
+// PRNG determinista (mulberry32)
+let seed = 42
+function rand() {
+  seed |= 0; seed = seed + 0x6D2B79F5 | 0
+  let t = Math.imul(seed ^ seed >>> 15, 1 | seed)
+  t = t + Math.imul(t ^ t >>> 7, 61 | t) ^ t
+  return ((t ^ t >>> 14) >>> 0) / 4294967296
+}
+const pick = (values: any[]) => values[Math.floor(rand() * values.length)]
+const int = (lo: number, hi: number) => lo + Math.floor(rand() * (hi - lo + 1))
+const maybe = (value: any, p = 0.8) => rand() < p ? value : null
+const isoDaysAgo = (days: number) => new RealDate(NOW - days * DAY).toISOString()
+
+function makeCase(index: number) {
+  const fitness_level = pick(['beginner', 'intermediate', 'advanced'])
+  const profile = {
+    fitness_level,
+    experience_years: int(0, 6),
+    available_days_per_week: maybe(int(2, 6)),
+    age: maybe(int(18, 65)),
+    current_fitness_score: maybe(Math.round(rand() * 80) / 10 + 2, 0.3),
+    sleep_quality: maybe(int(1, 5)),
+    sleep_hours: maybe(Math.round((4 + rand() * 5) * 10) / 10),
+    fatigue_level: maybe(int(1, 5)),
+    hrv_trend: maybe(Math.round(rand() * 150) / 100, 0.4),
+    resting_hr: maybe(int(45, 80), 0.6),
+    training_hr_avg: maybe(int(110, 185), 0.6),
+  }
+
+  const progressions = Array.from({ length: pick([0, 2, 5, 8]) }, () => ({ current_level: int(1, 7) }))
+
+  const sessionCount = index % 10 === 0 ? 0 : int(1, 14)
+  const recentSessions = Array.from({ length: sessionCount }, () => {
+    const status = pick(['completed', 'completed', 'completed', 'skipped', 'planned'])
+    return {
+      session_date: isoDaysAgo(rand() * 40),
+      status,
+      session_exercises: Array.from({ length: int(0, 5) }, () => ({
+        sets_planned: int(2, 5),
+        reps_planned: int(5, 15),
+        sets_completed: maybe(int(0, 5)),
+        reps_completed: maybe(int(0, 15)),
+        rpe_reported: maybe(int(3, 10)),
+        technical_quality: maybe(int(1, 5)),
+      })),
+    }
+  }).sort((a, b) => Date.parse(b.session_date) - Date.parse(a.session_date))
+
+  const algorithmHistory = Array.from({ length: pick([0, 1, 2, 4, 6, 9]) }, () => ({
+    calculation_date: isoDaysAgo(rand() * (pick([3, 10, 30]))),
+    current_ica: Math.round((0.3 + rand() * 1.5) * 100) / 100,
+  }))
+
+  return { profile, progressions, recentSessions, wellnessLogs: [], algorithmHistory }
+}
+
+const algorithm = new AdaptiveTrainingAlgorithm()
+const cases = Array.from({ length: CASES }, (_, i) => {
+  const input = makeCase(i)
+  return { name: `case-${String(i).padStart(3, '0')}`, input, expected: algorithm.calculateICA(input as any) }
+})
+
+// undefined -> null e Infinity -> literal Infinity (json.loads de Python lo acepta)
+const json = JSON.stringify(
+  { now: new RealDate(NOW).toISOString(), cases },
+  (_key, value) => value === undefined ? null : value === Infinity ? '__INFINITY__' : value
+).replaceAll('"__INFINITY__"', 'Infinity')
+
+await Deno.writeTextFile(OUTPUT, json + '\n')
+console.log(`✅ ${cases.length} casos guardados en ${OUTPUT}`)
@@ -0,0 +1,67 @@
+// Captura fixtures de paridad para el port Python de las prioridades musculares
+// (docs/api/examples/python/muscle_balance.py)
+//
+// Uso:
+//   deno run --allow-write tests/capture-muscle-balance-fixtures.ts
+//
+// Genera métricas semanales sintéticas deterministas (semilla fija), las evalúa
+// con AdaptiveTrainingAlgorithm.analyzeMuscleGroupPriorities (que aplica
+// enforceMuscleBalance) y guarda entradas + prioridades esperadas en el archivo
+// de fixtures.
+
+import { AdaptiveTrainingAlgorithm } from '../supabase/functions/_shared/algorithm.ts'
+
+const OUTPUT = 'docs/api/examples/python/fixtures/muscle_balance_parity.json'
+const WEEK_START = '2025-06-09'
+const CASES = 120
+
+const GROUPS = ['chest', 'back', 'shoulders', 'quadriceps', 'hamstrings', 'glutes', 'core', 'abs']
+const EXTRA_GROUPS = ['calves', 'forearms']
+
+// PRNG determinista (mulberry32)
+let seed = 7
+function rand() {
+  seed |= 0; seed = seed + 0x6D2B79F5 | 0
+  let t = Math.imul(seed ^ seed >>> 15, 1 | seed)
+  t = t + Math.imul(t ^ t >>> 7, 61 | t) ^ t
+  return ((t ^ t >>> 14) >>> 0) / 4294967296
+}
+const pick = (values: any[]) => values[Math.floor(rand() * values.length)]
+const int = (lo: number, hi: number) => lo + Math.floor(rand() * (hi - lo + 1))
+const maybe = (value: any, p = 0.8) => rand() < p ? value : null
+
+function makeCase(index: number) {
+  const user_id = `user-${String(index).padStart(3, '0')}`
+  // Cada 10 usuarios, uno sin métricas (prioridades por defecto)
+  if (index % 10 === 0) return { user_id, muscleGroupMetrics: [] }
+
+  // Piernas muy entrenadas en algunos usuarios para activar el modo agresivo
+  const legHeavy = rand() < 0.25
+  const groups = [...GROUPS, ...EXTRA_GROUPS].filter(group =>
+    rand() < (EXTRA_GROUPS.includes(group) ? 0.15 : 0.8))
+  const muscleGroupMetrics = groups.map(muscle_group => {
+    const isLeg = muscle_group === 'quadriceps' || muscle_group === 'hamstrings'
+    const total_sets = legHeavy && isLeg ? int(20, 40) : pick([0, int(1, 8), int(6, 24)])
+    return {
+      user_id,
+      muscle_group,
+      week_start: WEEK_START,
+      total_sets,
+      total_reps: total_sets * int(6, 15),
+      avg_rpe: maybe(Math.round((4 + rand() * 5) * 10) / 10),
+      imbalance_score: maybe(Math.round(rand() * 12000) / 100, 0.9),
+    }
+  })
+  return { user_id, muscleGroupMetrics }
+}
+
+const algorithm = new AdaptiveTrainingAlgorithm()
+const cases = Array.from({ length: CASES }, (_, i) => {
+  const input = makeCase(i)
+  // Método privado: sin rendimiento por ejercicio, como el port Python
+  const expected = (algorithm as any).analyzeMuscleGroupPriorities(input.muscleGroupMetrics, [])
+  return { name: input.user_id, input, expected }
+})
+
+await Deno.writeTextFile(OUTPUT, JSON.stringify({ week_start: WEEK_START, cases }) + '\n')
+console.log(`✅ ${cases.length} casos guardados en ${OUTPUT}`)